@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Audio decode benchmark
+Times the three ways a recording can reach the model as 16 kHz float32:
+
+  ffmpeg  - convert_ulaw_to_pcm (ffmpeg subprocess, converted_wav copy)
+            then decode the copy again, as the transcribers used to
+  pyav    - faster-whisper decode_audio on the original file
+  native  - scream_audio.load_audio (G.711 lookup + polyphase resample)
+
+and reports files/second and bytes written to disk for each.
+
+Usage:
+    python benchmark_audio_decode.py wav/
+    python benchmark_audio_decode.py wav/ --limit 200 --routes native,pyav
+"""
+
+import io
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+
+from faster_whisper import decode_audio
+
+from convert_ulaw_to_pcm import convert_ulaw_to_pcm
+from scream_audio import load_audio, read_wav_header, SAMPLE_RATE
+
+
+def route_ffmpeg(path: Path, scratch: Path):
+    output = scratch / f"{path.stem}_pcm.wav"
+    # convert_ulaw_to_pcm prints a line per file
+    with contextlib.redirect_stdout(io.StringIO()):
+        converted = convert_ulaw_to_pcm(str(path), str(output))
+    if not converted:
+        raise RuntimeError(f"ffmpeg failed on {path.name}")
+    written = output.stat().st_size
+    samples = decode_audio(converted, sampling_rate=SAMPLE_RATE)
+    output.unlink()
+    return samples, written
+
+
+def route_pyav(path: Path, scratch: Path):
+    return decode_audio(str(path), sampling_rate=SAMPLE_RATE), 0
+
+
+def route_native(path: Path, scratch: Path):
+    return load_audio(path), 0
+
+
+ROUTES = {'ffmpeg': route_ffmpeg, 'pyav': route_pyav, 'native': route_native}
+
+
+def run_route(name: str, files: list) -> dict:
+    scratch = Path(tempfile.mkdtemp(prefix=f"decode_{name}_"))
+    written = 0
+    audio_seconds = 0.0
+    start = time.time()
+    try:
+        for path in files:
+            samples, file_written = ROUTES[name](path, scratch)
+            written += file_written
+            audio_seconds += len(samples) / SAMPLE_RATE
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    elapsed = time.time() - start
+    return {
+        'route': name,
+        'files': len(files),
+        'seconds': elapsed,
+        'files_per_second': len(files) / elapsed if elapsed > 0 else 0,
+        'realtime_factor': audio_seconds / elapsed if elapsed > 0 else 0,
+        'bytes_written': written
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark in-process audio decoding against ffmpeg")
+    parser.add_argument('directory', help='Directory of WAV recordings')
+    parser.add_argument('--limit', type=int, default=100, help='Number of files to decode')
+    parser.add_argument('--routes', default='ffmpeg,pyav,native', help='Routes to time')
+    parser.add_argument('-o', '--output', default='audio_decode_benchmark.json')
+    args = parser.parse_args()
+
+    files = sorted(Path(args.directory).rglob("*.wav"))[:args.limit]
+    if not files:
+        parser.error(f"No .wav files in {args.directory}")
+
+    codecs = {}
+    for path in files:
+        try:
+            codec = read_wav_header(path).codec
+        except ValueError:
+            codec = "other"
+        codecs[codec] = codecs.get(codec, 0) + 1
+
+    print("=" * 70)
+    print(f"AUDIO DECODE BENCHMARK - {len(files)} files "
+          f"({', '.join(f'{n} {c}' for c, n in sorted(codecs.items()))})")
+    print("=" * 70)
+
+    rows = [run_route(name, files) for name in args.routes.split(',')]
+
+    print(f"{'Route':>8} {'Files/s':>9} {'RTF':>9} {'Written(MB)':>12}")
+    for row in rows:
+        print(f"{row['route']:>8} {row['files_per_second']:>9.1f} {row['realtime_factor']:>9.0f} "
+              f"{row['bytes_written'] / 1024 / 1024:>12.1f}")
+
+    with open(args.output, 'w') as f:
+        json.dump({'codecs': codecs, 'results': rows}, f, indent=2)
+    print(f"\nReport saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Batch loan lookup benchmark
+Resolves the same N loan numbers against a running Loan Search API either as
+N GET /search/loan/{n} calls (sequential and with a few concurrent clients)
+or as one POST /search/loans, and reports wall time for each.
+
+Single lookups go through the response cache, so the first round is usually
+cold and later rounds warm; both are reported.
+
+Usage:
+    python benchmark_batch_lookup.py --url http://localhost:8000
+    python benchmark_batch_lookup.py --url http://localhost:8000 --loans 500 --rounds 3
+    python benchmark_batch_lookup.py --url http://localhost:8000 --loan-file loans.txt
+"""
+
+import json
+import time
+import argparse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def get(url: str):
+    with urllib.request.urlopen(url, timeout=300) as response:
+        return json.loads(response.read())
+
+
+def post(url: str, payload: dict):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=300) as response:
+        return json.loads(response.read())
+
+
+def sample_loans(count: int) -> list:
+    """The most-called loans, straight from the index"""
+    from loan_db import get_db_connection
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT loan_number FROM loan_number_index
+        GROUP BY loan_number
+        ORDER BY COUNT(*) DESC
+        LIMIT %s
+    """, (count,))
+    loans = [row['loan_number'] for row in cursor.fetchall()]
+    cursor.close()
+    conn.close()
+    return loans
+
+
+def single_calls(base_url: str, loans: list, clients: int) -> tuple:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = list(executor.map(lambda loan: get(f"{base_url}/search/loan/{loan}"), loans))
+    return (time.perf_counter() - start) * 1000, sum(len(r) for r in results)
+
+
+def batch_call(base_url: str, loans: list) -> tuple:
+    start = time.perf_counter()
+    result = post(f"{base_url}/search/loans", {'loan_numbers': loans})
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, sum(group['call_count'] for group in result['results'].values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare N single loan lookups with one batch lookup")
+    parser.add_argument('--url', required=True, help='Base URL of a running loan_search_api')
+    parser.add_argument('--loans', type=int, default=200, help='Loan numbers to look up')
+    parser.add_argument('--loan-file', help='File with one loan number per line (instead of sampling the DB)')
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent clients for the parallel single run')
+    parser.add_argument('--rounds', type=int, default=2, help='Rounds per method')
+    args = parser.parse_args()
+
+    base_url = args.url.rstrip('/')
+    if args.loan_file:
+        with open(args.loan_file) as f:
+            loans = [line.strip() for line in f if line.strip()][:args.loans]
+    else:
+        loans = sample_loans(args.loans)
+
+    print("=" * 70)
+    print(f"BATCH LOOKUP BENCHMARK - {len(loans)} loans against {base_url}")
+    print("=" * 70)
+
+    methods = [
+        ("batch", lambda: batch_call(base_url, loans)),
+        ("single x1", lambda: single_calls(base_url, loans, 1)),
+        (f"single x{args.clients}", lambda: single_calls(base_url, loans, args.clients))
+    ]
+    for round_number in range(1, args.rounds + 1):
+        print(f"\nRound {round_number}")
+        for name, func in methods:
+            elapsed, calls = func()
+            print(f"{name:>12}: {elapsed:9.1f}ms total | {elapsed / len(loans):7.2f}ms/loan | {calls} calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+CPU farm layout benchmark
+Runs the same set of recordings through CPUFarmEngine with different
+workers x threads-per-worker splits and reports the best layout for this host.
+
+Usage:
+    python benchmark_cpu_farm.py wav/ --model models/faster-whisper-large-v3-turbo-ct2
+    python benchmark_cpu_farm.py wav/ --layouts 1x16,2x8,4x4,8x2 --limit 20
+"""
+
+import os
+import json
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from scream_engine import CPUFarmEngine, DirectorySource
+
+
+def default_layouts(cores: int) -> list:
+    """Every power-of-two worker count that divides the cores evenly"""
+    layouts = []
+    workers = 1
+    while workers <= cores:
+        layouts.append((workers, cores // workers))
+        workers *= 2
+    return layouts
+
+
+def parse_layouts(text: str) -> list:
+    layouts = []
+    for item in text.split(','):
+        workers, threads = item.lower().split('x')
+        layouts.append((int(workers), int(threads)))
+    return layouts
+
+
+def run_layout(audios, model_path, workers, threads, beam_size):
+    engine = CPUFarmEngine(model_path, workers=workers, threads_per_worker=threads,
+                           beam_size=beam_size)
+    start = time.time()
+    failed = 0
+    audio_seconds = 0.0
+    first_result = None
+    try:
+        for result in engine.process_many(audios):
+            if first_result is None:
+                first_result = time.time() - start
+            if result.error:
+                failed += 1
+            audio_seconds += result.duration
+    finally:
+        engine.close()
+    wall = time.time() - start
+    return {
+        'layout': f"{workers}x{threads}",
+        'workers': workers,
+        'threads_per_worker': threads,
+        'files': len(audios),
+        'failed': failed,
+        'wall_seconds': round(wall, 2),
+        'first_result_seconds': round(first_result or 0, 2),
+        'files_per_hour': round(len(audios) / (wall / 3600), 1) if wall > 0 else 0,
+        'realtime_factor': round(audio_seconds / wall, 2) if wall > 0 else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CPU farm worker/thread layouts")
+    parser.add_argument('source', help='Directory of recordings')
+    parser.add_argument('-m', '--model', default='models/faster-whisper-large-v3-turbo-ct2',
+                        help='Model path')
+    parser.add_argument('--layouts', help='Comma separated WORKERSxTHREADS (default: auto)')
+    parser.add_argument('--limit', type=int, default=20, help='Recordings per layout')
+    parser.add_argument('--beam-size', type=int, default=1, help='Beam size')
+    parser.add_argument('-o', '--output', help='JSON report path')
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    layouts = parse_layouts(args.layouts) if args.layouts else default_layouts(cores)
+    audios = list(DirectorySource(args.source, recursive=True).discover())[:args.limit]
+    if not audios:
+        print(f"No recordings found in {args.source}")
+        return
+
+    print("=" * 70)
+    print(f"CPU FARM BENCHMARK - {cores} cores, {len(audios)} files, beam {args.beam_size}")
+    print("=" * 70)
+    print(f"{'Layout':>8} {'Wall(s)':>9} {'First(s)':>9} {'Files/h':>9} {'RTF':>7} {'Failed':>7}")
+
+    rows = []
+    for workers, threads in layouts:
+        row = run_layout(audios, args.model, workers, threads, args.beam_size)
+        rows.append(row)
+        print(f"{row['layout']:>8} {row['wall_seconds']:>9.1f} {row['first_result_seconds']:>9.1f} "
+              f"{row['files_per_hour']:>9.1f} {row['realtime_factor']:>7.2f} {row['failed']:>7}")
+
+    best = max(rows, key=lambda r: r['files_per_hour'])
+    print(f"\nBest layout for this host: {best['layout']} "
+          f"(cpu_workers: {best['workers']}, cpu_threads_per_worker: {best['threads_per_worker']})")
+
+    output = args.output or f"cpu_farm_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump({
+            'host': os.uname().nodename if hasattr(os, 'uname') else '',
+            'cores': cores,
+            'model': args.model,
+            'source': str(Path(args.source)),
+            'results': rows,
+            'best': best['layout']
+        }, f, indent=2)
+    print(f"Report saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Connection pool benchmark
+50 concurrent clients run the same query either with a fresh
+pymysql.connect() per request (old behaviour) or through loan_db's pool.
+Reports p50/p99 request latency for each.
+
+Usage:
+    python benchmark_db_pool.py
+    python benchmark_db_pool.py --clients 50 --requests 20 --query "SELECT COUNT(*) FROM loan_number_index"
+"""
+
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import pymysql
+
+from loan_db import DB_CONFIG, ConnectionPool
+
+DEFAULT_QUERY = "SELECT loan_number, orkuid FROM loan_number_index ORDER BY call_timestamp DESC LIMIT 20"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def per_request(query):
+    start = time.perf_counter()
+    conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+    cursor = conn.cursor()
+    cursor.execute(query)
+    cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return (time.perf_counter() - start) * 1000
+
+
+def pooled(pool, query):
+    start = time.perf_counter()
+    conn = pool.connection()
+    cursor = conn.cursor()
+    cursor.execute(query)
+    cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return (time.perf_counter() - start) * 1000
+
+
+def run(name, func, clients, requests):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        latencies = list(executor.map(lambda _: func(), range(clients * requests)))
+    elapsed = time.perf_counter() - start
+    print(f"{name:>12}: p50 {percentile(latencies, 50):7.1f}ms | "
+          f"p99 {percentile(latencies, 99):7.1f}ms | "
+          f"{len(latencies) / elapsed:7.1f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-request connects with the pool")
+    parser.add_argument('--clients', type=int, default=50, help='Concurrent clients')
+    parser.add_argument('--requests', type=int, default=20, help='Requests per client')
+    parser.add_argument('--pool-size', type=int, default=10, help='Pool size')
+    parser.add_argument('--query', default=DEFAULT_QUERY, help='Query each request runs')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"DB POOL BENCHMARK - {args.clients} clients x {args.requests} requests "
+          f"against {DB_CONFIG['host']}")
+    print("=" * 70)
+
+    run("per-request", lambda: per_request(args.query), args.clients, args.requests)
+
+    pool = ConnectionPool(DB_CONFIG, max_size=args.pool_size, timeout=60)
+    run(f"pool({args.pool_size})", lambda: pooled(pool, args.query), args.clients, args.requests)
+    metrics = pool.metrics()
+    print(f"\nPool: {metrics['connects']} connects for {metrics['checkouts']} checkouts | "
+          f"wait p50 {metrics['wait_ms_p50']}ms p99 {metrics['wait_ms_p99']}ms")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
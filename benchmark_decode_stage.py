@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Decode stage benchmark
+Runs the same recordings through N inference threads two ways:
+  inline  - each thread decodes its file, then runs the model (old layout)
+  staged  - a DecodeStage process pool decodes ahead; threads only run the model
+and reports how much of the inference threads' time was spent in the model.
+
+Usage:
+    python benchmark_decode_stage.py wav/ --model models/faster-whisper-large-v3-turbo-ct2
+    python benchmark_decode_stage.py wav/ --device cpu --threads 2 --decode-workers 4 --limit 40
+"""
+
+import json
+import time
+import queue
+import argparse
+import threading
+from datetime import datetime
+
+from faster_whisper import WhisperModel
+
+from scream_audio import load_audio
+from scream_decode import DecodeStage
+from scream_engine import DirectorySource
+
+
+def transcribe(model, samples):
+    segments, info = model.transcribe(samples, language="en", beam_size=1,
+                                      vad_filter=True, without_timestamps=True)
+    return " ".join(s.text.strip() for s in segments)
+
+
+def run(model, paths, threads, decode_workers):
+    work = queue.Queue()
+    model_time = [0.0] * threads
+    decode_time = [0.0] * threads
+    stage = DecodeStage(decode_workers) if decode_workers else None
+    if stage:
+        # Start every decode process before the clock does
+        for future in [stage.submit(paths[0]) for _ in range(decode_workers)]:
+            future.result().release()
+
+    def feed():
+        items = stage.stream(paths) if stage else ((path, None) for path in paths)
+        for item in items:
+            work.put(item)
+        for _ in range(threads):
+            work.put(None)
+
+    def worker(index):
+        while True:
+            item = work.get()
+            if item is None:
+                return
+            path, decoded = item
+            start = time.time()
+            if decoded is None:
+                samples = load_audio(path)
+            else:
+                audio = decoded.result()
+                samples = audio.samples
+            decode_time[index] += time.time() - start
+
+            start = time.time()
+            transcribe(model, samples)
+            model_time[index] += time.time() - start
+            if decoded is not None:
+                audio.release()
+
+    start = time.time()
+    feeder = threading.Thread(target=feed)
+    feeder.start()
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    feeder.join()
+    wall = time.time() - start
+    if stage:
+        stage.close()
+
+    return {
+        'mode': f"staged ({decode_workers} decode processes)" if decode_workers else "inline",
+        'files': len(paths),
+        'wall_seconds': round(wall, 2),
+        'files_per_hour': round(len(paths) / (wall / 3600), 1) if wall > 0 else 0,
+        'model_seconds': round(sum(model_time), 2),
+        'decode_wait_seconds': round(sum(decode_time), 2),
+        'inference_utilization': round(sum(model_time) / (wall * threads), 3) if wall > 0 else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the process-pool decode stage")
+    parser.add_argument('source', help='Directory of recordings')
+    parser.add_argument('-m', '--model', default='models/faster-whisper-large-v3-turbo-ct2',
+                        help='Model path')
+    parser.add_argument('-d', '--device', default='cuda', choices=['cuda', 'cpu'])
+    parser.add_argument('--threads', type=int, default=4, help='Inference threads')
+    parser.add_argument('--decode-workers', type=int, default=2, help='Decode processes')
+    parser.add_argument('--limit', type=int, default=40, help='Recordings to use')
+    parser.add_argument('-o', '--output', help='JSON report path')
+    args = parser.parse_args()
+
+    paths = [audio.path for audio in DirectorySource(args.source, recursive=True).discover()][:args.limit]
+    if not paths:
+        print(f"No recordings found in {args.source}")
+        return
+
+    compute_type = "int8_float16" if args.device == "cuda" else "int8"
+    model = WhisperModel(args.model, device=args.device, compute_type=compute_type,
+                         num_workers=args.threads)
+
+    print("=" * 70)
+    print(f"DECODE STAGE BENCHMARK - {len(paths)} recordings, {args.threads} inference threads")
+    print("=" * 70)
+
+    # Warm-up so neither run pays for CUDA init / first-call allocation
+    transcribe(model, load_audio(paths[0]))
+
+    results = []
+    for decode_workers in (0, args.decode_workers):
+        result = run(model, paths, args.threads, decode_workers)
+        results.append(result)
+        print(f"{result['mode']:<32} {result['wall_seconds']:>8.1f}s  "
+              f"{result['files_per_hour']:>9.1f} files/h  "
+              f"inference busy {result['inference_utilization']:.1%}  "
+              f"(waiting on decode {result['decode_wait_seconds']:.1f}s)")
+
+    inline, staged = results
+    if staged['wall_seconds'] > 0:
+        print(f"\nSpeedup: {inline['wall_seconds'] / staged['wall_seconds']:.2f}x, "
+              f"utilization {inline['inference_utilization']:.1%} -> "
+              f"{staged['inference_utilization']:.1%}")
+
+    output = args.output or f"decode_stage_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump({'device': args.device, 'threads': args.threads, 'results': results}, f, indent=2)
+    print(f"Report saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Event loop stall load test
+Fires slow-query requests at one route while measuring the latency of a
+fast route. With blocking pymysql calls inside async handlers the fast
+route queues behind every slow query; with loan_db.run_db offloading it
+stays flat.
+
+Usage:
+    python benchmark_event_loop.py                     # built-in demo app, both modes
+    python benchmark_event_loop.py --slow-seconds 3 --slow-clients 8
+    python benchmark_event_loop.py --url http://localhost:8000 \\
+        --slow-path /analytics --fast-path /metrics/db  # a running loan_master_app
+"""
+
+import time
+import socket
+import argparse
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import uvicorn
+from fastapi import FastAPI
+
+from loan_db import get_db_connection, fetch_one, register_pool_routes
+
+
+def build_app(mode: str, slow_seconds: float) -> FastAPI:
+    """Two routes: a slow SELECT SLEEP() and a trivial SELECT 1"""
+    app = FastAPI()
+    register_pool_routes(app)
+
+    def blocking_query(query, params=None):
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        row = cursor.fetchone()
+        cursor.close()
+        conn.close()
+        return row
+
+    @app.get("/slow")
+    async def slow():
+        if mode == "blocking":
+            return blocking_query("SELECT SLEEP(%s) AS s", (slow_seconds,))
+        return await fetch_one("SELECT SLEEP(%s) AS s", (slow_seconds,))
+
+    @app.get("/fast")
+    async def fast():
+        if mode == "blocking":
+            return blocking_query("SELECT 1 AS ok")
+        return await fetch_one("SELECT 1 AS ok")
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(app: FastAPI):
+    """Run the app on a background uvicorn server; returns (server, base_url)"""
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def timed_get(url: str) -> float:
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=300) as response:
+        response.read()
+    return (time.perf_counter() - start) * 1000
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def load_test(base_url: str, slow_path: str, fast_path: str, slow_clients: int,
+              fast_requests: int, fast_interval: float) -> dict:
+    """Slow requests in the background, fast requests probed at a steady rate"""
+    timed_get(base_url + fast_path)     # warm the pool
+
+    with ThreadPoolExecutor(max_workers=slow_clients) as slow_pool:
+        slow_futures = [slow_pool.submit(timed_get, base_url + slow_path)
+                        for _ in range(slow_clients)]
+        time.sleep(0.2)                 # let the slow queries start
+
+        with ThreadPoolExecutor(max_workers=4) as fast_pool:
+            futures = []
+            for _ in range(fast_requests):
+                futures.append(fast_pool.submit(timed_get, base_url + fast_path))
+                time.sleep(fast_interval)
+            fast_latencies = [f.result() for f in futures]
+
+        slow_latencies = [f.result() for f in slow_futures]
+
+    return {
+        'fast_p50': percentile(fast_latencies, 50),
+        'fast_p99': percentile(fast_latencies, 99),
+        'fast_max': max(fast_latencies),
+        'slow_p50': percentile(slow_latencies, 50)
+    }
+
+
+def report(name: str, result: dict):
+    print(f"{name:>10}: fast p50 {result['fast_p50']:8.1f}ms | p99 {result['fast_p99']:8.1f}ms | "
+          f"max {result['fast_max']:8.1f}ms | slow p50 {result['slow_p50']:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show whether slow queries stall other routes")
+    parser.add_argument('--url', help='Test a running app instead of the built-in demo app')
+    parser.add_argument('--slow-path', default='/slow', help='Route with the slow query')
+    parser.add_argument('--fast-path', default='/fast', help='Route whose latency is measured')
+    parser.add_argument('--slow-seconds', type=float, default=2.0, help='SLEEP() in the demo slow route')
+    parser.add_argument('--slow-clients', type=int, default=4, help='Concurrent slow requests')
+    parser.add_argument('--fast-requests', type=int, default=40, help='Fast requests to time')
+    parser.add_argument('--fast-interval', type=float, default=0.05, help='Seconds between fast requests')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"EVENT LOOP LOAD TEST - {args.slow_clients} slow clients, "
+          f"{args.fast_requests} fast probes")
+    print("=" * 70)
+
+    if args.url:
+        report("target", load_test(args.url.rstrip('/'), args.slow_path, args.fast_path,
+                                   args.slow_clients, args.fast_requests, args.fast_interval))
+        return
+
+    for mode in ("blocking", "offloaded"):
+        server, base_url = serve(build_app(mode, args.slow_seconds))
+        try:
+            report(mode, load_test(base_url, "/slow", "/fast", args.slow_clients,
+                                   args.fast_requests, args.fast_interval))
+        finally:
+            server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
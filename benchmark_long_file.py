@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Long-file latency benchmark
+Compares one sequential decode of a long recording against VAD-chunked
+decoding (batched on one model, or parallel workers) to show how latency
+scales with batch size / cores.
+
+Usage:
+    python benchmark_long_file.py conference.wav
+    python benchmark_long_file.py --build wav/ --minutes 90 --device cpu
+"""
+
+import os
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+from faster_whisper import WhisperModel, decode_audio
+
+from scream_chunking import ChunkedTranscriber, SAMPLE_RATE
+
+
+def build_long_audio(source_dir: str, minutes: float) -> np.ndarray:
+    """Concatenate recordings from a directory until the target length"""
+    target = int(minutes * 60 * SAMPLE_RATE)
+    pieces = []
+    total = 0
+    for path in sorted(Path(source_dir).rglob("*.wav")):
+        samples = decode_audio(str(path), sampling_rate=SAMPLE_RATE)
+        pieces.append(samples)
+        total += len(samples)
+        if total >= target:
+            break
+    if not pieces:
+        raise FileNotFoundError(f"No .wav files in {source_dir}")
+    audio = np.concatenate(pieces)
+    # Loop the material if the directory is short
+    while len(audio) < target:
+        audio = np.concatenate([audio, audio[:target - len(audio)]])
+    return audio[:target]
+
+
+def time_sequential(model, audio) -> dict:
+    start = time.time()
+    segments, info = model.transcribe(audio, language="en", beam_size=1,
+                                      condition_on_previous_text=False, vad_filter=True)
+    count = sum(1 for _ in segments)
+    return {'mode': 'sequential', 'setting': 1, 'seconds': time.time() - start,
+            'segments': count}
+
+
+def time_chunked(model, audio, mode: str, setting: int) -> dict:
+    chunker = ChunkedTranscriber(model, mode=mode, workers=setting, batch_size=setting,
+                                 chunk_seconds=30.0 if mode == "batched" else 120.0)
+    start = time.time()
+    segments, info = chunker.transcribe(audio)
+    return {'mode': mode, 'setting': setting, 'seconds': time.time() - start,
+            'segments': len(segments), 'chunks': info.chunks}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark long-file chunked transcription")
+    parser.add_argument('input', nargs='?', help='Long recording to transcribe')
+    parser.add_argument('--build', help='Build a long recording from this directory')
+    parser.add_argument('--minutes', type=float, default=90, help='Length when using --build')
+    parser.add_argument('-m', '--model', default='models/faster-whisper-large-v3-turbo-ct2')
+    parser.add_argument('-d', '--device', default='cuda', choices=['cuda', 'cpu'])
+    parser.add_argument('--settings', default='1,2,4,8',
+                        help='Batch sizes / worker counts to try')
+    parser.add_argument('-o', '--output', default='long_file_benchmark.json')
+    args = parser.parse_args()
+
+    if args.build:
+        audio = build_long_audio(args.build, args.minutes)
+    elif args.input:
+        audio = decode_audio(args.input, sampling_rate=SAMPLE_RATE)
+    else:
+        parser.error("Give a recording or --build DIR")
+
+    settings = [int(s) for s in args.settings.split(',')]
+    compute_type = "int8_float16" if args.device == "cuda" else "int8"
+    model = WhisperModel(args.model, device=args.device, compute_type=compute_type,
+                         num_workers=max(settings),
+                         cpu_threads=max(1, (os.cpu_count() or 1) // max(settings)))
+
+    duration = len(audio) / SAMPLE_RATE
+    print("=" * 70)
+    print(f"LONG FILE BENCHMARK - {duration / 60:.1f} min audio on {args.device}")
+    print("=" * 70)
+
+    rows = [time_sequential(model, audio)]
+    for setting in settings:
+        rows.append(time_chunked(model, audio, "batched", setting))
+    for setting in settings:
+        rows.append(time_chunked(model, audio, "parallel", setting))
+
+    baseline = rows[0]['seconds']
+    print(f"{'Mode':>10} {'Batch/Workers':>14} {'Latency(s)':>11} {'Speedup':>8} {'RTF':>7}")
+    for row in rows:
+        row['speedup'] = baseline / row['seconds'] if row['seconds'] > 0 else 0
+        row['realtime_factor'] = duration / row['seconds'] if row['seconds'] > 0 else 0
+        print(f"{row['mode']:>10} {row['setting']:>14} {row['seconds']:>11.1f} "
+              f"{row['speedup']:>7.2f}x {row['realtime_factor']:>7.1f}")
+
+    with open(args.output, 'w') as f:
+        json.dump({'audio_seconds': duration, 'device': args.device, 'results': rows}, f, indent=2)
+    print(f"\nReport saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark spoken-digit normalization on synthetic transcripts
+Measures loan number recall with/without normalization and throughput.
+No GPU, database or recordings needed.
+
+Usage:
+    python benchmark_number_normalizer.py [--calls 2000] [--seed 7]
+"""
+
+import sys
+import argparse
+import random
+import re
+import time
+
+from scream_numbers import SpokenNumberNormalizer
+
+UNITS = ['zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine']
+TEENS = ['ten', 'eleven', 'twelve', 'thirteen', 'fourteen', 'fifteen',
+         'sixteen', 'seventeen', 'eighteen', 'nineteen']
+TENS = ['', '', 'twenty', 'thirty', 'forty', 'fifty', 'sixty', 'seventy', 'eighty', 'ninety']
+
+# Whisper output is cased and punctuated per segment
+FILLER = [
+    "Thanks for calling underwriting, this is Dana.",
+    "I'm following up on the conditions for the file.",
+    "We still need the appraisal and two bank statements.",
+    "Can you send over the updated pay stubs?",
+    "The borrower closes on the twentieth.",
+    "Let me pull that up real quick.",
+    "Okay, I see it in the system.",
+    "Oh, okay, that makes sense.",
+    "I have two more questions about the title.",
+    "We're waiting on the VOE from the employer.",
+]
+
+# Same loan pattern set the fast extractors use
+LOAN_PATTERNS = [
+    re.compile(r'\b\d{8}\b'),
+    re.compile(r'\b\d{9}\b'),
+    re.compile(r'\b\d{10}\b'),
+    re.compile(r'\b\d{7}\b'),
+    re.compile(r'loan\s*#?\s*(\d{7,10})', re.IGNORECASE),
+    re.compile(r'number\s*#?\s*(\d{7,10})', re.IGNORECASE),
+]
+
+# Inputs the normalizer must not merge: complete digit literals stand alone
+REGRESSIONS = [
+    ("loans 1234567 2345678", "loans 1234567 2345678"),
+    ("loan 1234567, 2345678 and 3456789", "loan 1234567, 2345678 and 3456789"),
+    ("loan 1234567 seven days", "loan 1234567 seven days"),
+    ("seven 1234567", "seven 1234567"),
+    ("1225, 381, 964", "1225, 381, 964"),
+    ("the number is 1225 381 964 thanks", "the number is 1225381964 thanks"),
+    ("it's twelve twenty five, three eight one, nine six four.", "it's 1225381964."),
+]
+
+
+def speak_pair(pair: str) -> str:
+    """Say a two digit group the way people read loan numbers"""
+    value = int(pair)
+    if pair[0] == '0':
+        return f"oh {UNITS[value]}"
+    if value < 10:
+        return UNITS[value]
+    if value < 20:
+        return TEENS[value - 10]
+    if value % 10 == 0:
+        return TENS[value // 10]
+    return f"{TENS[value // 10]} {UNITS[value % 10]}"
+
+
+def speak_loan(loan: str, rng: random.Random) -> str:
+    """Render a loan number in one of the styles Whisper produces"""
+    style = rng.choice(['digits', 'single', 'pairs', 'split', 'commas'])
+    if style == 'digits':
+        return loan
+    if style == 'single':
+        return ' '.join(UNITS[int(d)] for d in loan)
+    if style == 'pairs':
+        pairs = [loan[i:i + 2] for i in range(0, len(loan), 2)]
+        return ' '.join(speak_pair(p) if len(p) == 2 else UNITS[int(p)] for p in pairs)
+    if style == 'split':
+        return f"{loan[:4]} {loan[4:7]} {loan[7:]}"
+    return ', '.join(UNITS[int(d)] for d in loan[:4]) + ', ' + ' '.join(UNITS[int(d)] for d in loan[4:])
+
+
+def make_corpus(calls: int, seed: int):
+    """Build synthetic calls; each has segments plus the loan numbers said in it"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(calls):
+        loans = [str(rng.randint(1_000_000_000, 1_299_999_999))
+                 for _ in range(rng.choice([0, 1, 1, 2]))]
+        segments = [rng.choice(FILLER) for _ in range(rng.randint(8, 30))]
+        for loan in loans:
+            position = rng.randint(0, len(segments))
+            segments.insert(position, f"The loan number is {speak_loan(loan, rng)}.")
+        corpus.append((segments, set(loans)))
+    return corpus
+
+
+def extract(text: str) -> set:
+    found = set()
+    for pattern in LOAN_PATTERNS:
+        for match in pattern.findall(text):
+            if match.isdigit() and 7 <= len(match) <= 10:
+                found.add(match)
+    return found
+
+
+def check_regressions(normalizer: SpokenNumberNormalizer) -> int:
+    """Print and count REGRESSIONS cases whose output differs from the expected text"""
+    failures = 0
+    for text, expected in REGRESSIONS:
+        got = normalizer.normalize(text)
+        if got != expected:
+            failures += 1
+            print(f"REGRESSION {text!r}\n  expected {expected!r}\n  got      {got!r}")
+    return failures
+
+
+def run(calls: int, seed: int) -> int:
+    corpus = make_corpus(calls, seed)
+    normalizer = SpokenNumberNormalizer()
+    total_loans = sum(len(loans) for _, loans in corpus)
+    total_segments = sum(len(segments) for segments, _ in corpus)
+    total_chars = sum(len(s) for segments, _ in corpus for s in segments)
+
+    results = {}
+    for name, normalize in (('regex only', False), ('normalized', True)):
+        hits = 0
+        false_hits = 0
+        start = time.perf_counter()
+        for segments, loans in corpus:
+            text = ' '.join(segments)
+            if normalize:
+                text = normalizer.normalize(text)
+            found = extract(text)
+            hits += len(found & loans)
+            false_hits += len(found - loans)
+        elapsed = time.perf_counter() - start
+        results[name] = (hits, false_hits, elapsed)
+
+    # Normalization cost alone, per segment (what the engine pays)
+    start = time.perf_counter()
+    for segments, _ in corpus:
+        normalizer.normalize_segments({'text': s} for s in segments)
+    segment_time = time.perf_counter() - start
+
+    print("=" * 60)
+    print("SPOKEN NUMBER NORMALIZATION BENCHMARK")
+    print("=" * 60)
+    print(f"Calls: {calls} | Segments: {total_segments} | Loans said: {total_loans}")
+    for name, (hits, false_hits, elapsed) in results.items():
+        recall = hits / total_loans * 100 if total_loans else 0
+        print(f"{name:>12}: recall {hits}/{total_loans} ({recall:.1f}%) | "
+              f"false {false_hits} | {elapsed * 1000:.1f}ms")
+    print(f"Per-segment normalize: {total_segments / segment_time:,.0f} segments/s | "
+          f"{total_chars / segment_time / 1e6:.1f} MB/s")
+
+    failures = check_regressions(normalizer)
+    print(f"Regression cases: {len(REGRESSIONS) - failures}/{len(REGRESSIONS)} passed")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark spoken number normalization")
+    parser.add_argument('--calls', type=int, default=2000, help='Synthetic calls to generate')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed')
+    args = parser.parse_args()
+    return 1 if run(args.calls, args.seed) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
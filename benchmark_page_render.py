@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Page render benchmark
+Renders a synthetic 5,000-call loan timeline three ways and reports render
+time and peak Python memory (tracemalloc):
+  legacy  - the old `timeline_html += f'''...'''` loop embedded in one f-string
+  render  - compiled Jinja template rendered to one string
+  stream  - compiled template streamed in chunks (what the app sends)
+
+Usage:
+    python benchmark_page_render.py
+    python benchmark_page_render.py --calls 5000 --runs 5
+"""
+
+import time
+import random
+import argparse
+import tracemalloc
+
+from loan_templates import env, _chunked
+
+
+def synthetic_view(count: int) -> dict:
+    rng = random.Random(42)
+    calls = []
+    for i in range(count):
+        calls.append({
+            'orkuid': f"{rng.getrandbits(48):012x}",
+            'when': f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2024 {rng.randint(1, 12):02d}:{rng.randint(0, 59):02d} PM",
+            'duration': rng.randint(20, 1800),
+            'localParty': f"1248{rng.randint(1000000, 9999999)}",
+            'remoteParty': f"1947{rng.randint(1000000, 9999999)}",
+            'user_name': rng.choice(["Ann Lee", "Bo Diaz", "Cy Park", "Unknown"]),
+            'is_processor': rng.random() < 0.2,
+            'transcript_path': f"/2024/06/{i % 28 + 1:02d}/12/call_{i}.txt"
+        })
+    return {
+        'loan_number': '1225290972',
+        'calls': calls,
+        'journey_days': 180,
+        'processor_count': sum(1 for c in calls if c['is_processor']),
+        'total_minutes': sum(c['duration'] for c in calls) // 60
+    }
+
+
+def legacy(view: dict) -> int:
+    """The pre-template approach: quadratic string concatenation"""
+    timeline_html = ""
+    for idx, call in enumerate(view['calls'], 1):
+        is_processor = call['is_processor']
+        call_id = call['orkuid']
+        timeline_html += f'''
+            <div class="timeline-item {'processor' if is_processor else ''}" id="call_{call_id}">
+                <div class="timeline-marker">
+                    <div class="marker-dot"></div>
+                    <div class="marker-line"></div>
+                </div>
+                <div class="timeline-content">
+                    <div class="call-header">
+                        <span class="call-number">Call #{idx}</span>
+                        <span class="call-date">{call['when']} EST</span>
+                        <span class="call-duration">{call['duration']}s</span>
+                    </div>
+                    <div class="call-parties">
+                        <div class="party-wrapper">
+                            <span class="party from clickable" onclick="searchBroker('{call['localParty']}')">{call['localParty']}</span>
+                            <span class="user-name">{call['user_name']}</span>
+                        </div>
+                        <span class="arrow">→</span>
+                        <div class="party-wrapper">
+                            <span class="party to clickable" onclick="searchBroker('{call['remoteParty']}')">{call['remoteParty']}</span>
+                        </div>
+                    </div>
+                    {'<div class="processor-tag">PROCESSOR ASSISTANT</div>' if is_processor else ''}
+                    <div style="color: #95a5a6; font-size: 12px; font-family: monospace; margin: 5px 0;">orkuid: {call_id}</div>
+                    <div class="feedback-section">
+                        <div class="feedback-controls">
+                            <button class="thumbs-up" onclick="markGood('{call_id}')" title="Correct loan">👍</button>
+                            <button class="thumbs-down" onclick="markBad('{call_id}')" title="Wrong loan">👎</button>
+                            <div class="loan-correction" id="correction_{call_id}" style="display:none;">
+                                <input type="text" placeholder="Correct loan #" id="correct_loan_{call_id}" class="correction-input">
+                                <button onclick="submitCorrection('{call_id}')" class="btn-submit-small">✓</button>
+                                <button onclick="cancelCorrection('{call_id}')" class="btn-cancel-small">✗</button>
+                            </div>
+                        </div>
+                    </div>
+                    <div class="transcript-path">
+                        <input type="text" value="{call['transcript_path']}" readonly>
+                        <button onclick="copyPath(this)">📋</button>
+                    </div>
+                </div>
+            </div>
+            '''
+    html = f"""
+        <!DOCTYPE html>
+        <html>
+        <head><title>Loan #{view['loan_number']} Timeline</title></head>
+        <body>
+            <div class="stat-value">{len(view['calls'])}</div>
+            <div class="timeline">
+                <h2>Call Timeline</h2>
+                {timeline_html}
+            </div>
+        </body>
+        </html>
+        """
+    return len(html.encode())
+
+
+def render(view: dict) -> int:
+    return len(env.get_template("timeline.html").render(**view).encode())
+
+
+def stream(view: dict) -> int:
+    size = 0
+    for chunk in _chunked(env.get_template("timeline.html").generate(**view)):
+        size += len(chunk.encode())     # stand-in for writing to the socket
+    return size
+
+
+def measure(func, view: dict, runs: int) -> dict:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        size = func(view)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(view)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'best_ms': min(times) * 1000, 'peak_mb': peak / 1024 / 1024, 'bytes': size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark timeline page rendering")
+    parser.add_argument('--calls', type=int, default=5000, help='Calls on the page')
+    parser.add_argument('--runs', type=int, default=5, help='Timed runs per method')
+    args = parser.parse_args()
+
+    view = synthetic_view(args.calls)
+
+    print("=" * 70)
+    print(f"PAGE RENDER BENCHMARK - timeline with {args.calls} calls")
+    print("=" * 70)
+    print(f"{'Method':>8} {'Best(ms)':>10} {'Peak(MB)':>10} {'Page(KB)':>10}")
+    for name, func in (("legacy", legacy), ("render", render), ("stream", stream)):
+        result = measure(func, view, args.runs)
+        print(f"{name:>8} {result['best_ms']:>10.1f} {result['peak_mb']:>10.2f} "
+              f"{result['bytes'] / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Format probe benchmark
+Builds a tree of small recordings in the production layout
+(YYYY/MM/DD/HH/<orkuid>.wav: μ-law stereo, PCM mono, some non-WAV) and
+times the ways of finding out what each file is:
+  ffprobe   - one ffprobe process per file, on a sample (if installed)
+  wave      - wave.open() per file, raw header read when it refuses (μ-law)
+  probe     - scream_probe.probe_file(), header only
+  index     - ProbeIndex on an empty cache (probe + store)
+  cached    - ProbeIndex again: stat() + cache lookup
+
+Usage:
+    python benchmark_probe.py                     # 100k files in a temp dir
+    python benchmark_probe.py --files 20000 --dir /tmp/probe_tree --keep
+"""
+
+import json
+import time
+import wave
+import shutil
+import struct
+import subprocess
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from scream_probe import ProbeIndex, probe_file
+from scream_audio import WAVE_FORMAT_MULAW, WAVE_FORMAT_PCM
+
+
+def wav_header(format_tag: int, channels: int, rate: int, bits: int, data_size: int) -> bytes:
+    block_align = channels * bits // 8
+    return (b'RIFF' + struct.pack('<I', 36 + data_size) + b'WAVE'
+            + b'fmt ' + struct.pack('<IHHIIHH', 16, format_tag, channels, rate,
+                                    rate * block_align, block_align, bits)
+            + b'data' + struct.pack('<I', data_size))
+
+
+def build_tree(root: Path, files: int) -> list:
+    """files recordings spread over hour directories; returns their paths"""
+    ulaw = wav_header(WAVE_FORMAT_MULAW, 2, 8000, 8, 1600) + bytes(1600)
+    pcm = wav_header(WAVE_FORMAT_PCM, 1, 8000, 16, 1600) + bytes(1600)
+    other = b'ID3\x03' + bytes(1600)
+    start = datetime(2024, 6, 1)
+    paths = []
+    for i in range(files):
+        hour = start + timedelta(hours=i // 200)
+        directory = root / hour.strftime("%Y/%m/%d/%H")
+        if i % 200 == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        # Mostly μ-law stereo like the recorder writes, some PCM, a few strays
+        body = other if i % 100 == 99 else pcm if i % 10 == 9 else ulaw
+        path = directory / f"{i:012d}.wav"
+        with open(path, 'wb') as f:
+            f.write(body)
+        paths.append(path)
+    return paths
+
+
+def probe_with_wave(path: Path) -> tuple:
+    """What check_wav_format.py does: wave first, raw header on failure"""
+    try:
+        with wave.open(str(path), 'rb') as wav:
+            return 'pcm', wav.getnchannels(), wav.getframerate()
+    except (wave.Error, EOFError):
+        with open(path, 'rb') as f:
+            head = f.read(36)
+        if head[:4] != b'RIFF':
+            return 'generic', None, None
+        format_tag, channels, rate = struct.unpack('<HHI', head[20:28])
+        return format_tag, channels, rate
+
+
+def probe_with_ffprobe(path: Path):
+    """What the ffmpeg-based scripts pay before they even start converting"""
+    subprocess.run(['ffprobe', '-v', 'error', '-show_streams', '-of', 'json', str(path)],
+                   capture_output=True)
+
+
+def timed(label: str, func, paths: list) -> dict:
+    start = time.perf_counter()
+    for path in paths:
+        func(path)
+    elapsed = time.perf_counter() - start
+    per_file = elapsed / len(paths) * 1e6
+    print(f"{label:<10} {elapsed:>8.2f}s  {per_file:>8.1f} µs/file  "
+          f"{len(paths) / elapsed:>10.0f} files/s")
+    return {'method': label, 'seconds': round(elapsed, 3), 'us_per_file': round(per_file, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark header probing over many files")
+    parser.add_argument('--files', type=int, default=100000, help='Recordings to generate')
+    parser.add_argument('--dir', help='Where to build the tree (default: temp dir)')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated tree')
+    parser.add_argument('-o', '--output', help='JSON report path')
+    args = parser.parse_args()
+
+    root = Path(args.dir or tempfile.mkdtemp(prefix="scream_probe_"))
+    print(f"Building {args.files} recordings under {root}...")
+    paths = build_tree(root, args.files)
+
+    print("=" * 70)
+    print(f"PROBE BENCHMARK - {len(paths)} files")
+    print("=" * 70)
+
+    index_path = str(root / "probe_index.db")
+    results = []
+    if shutil.which('ffprobe'):
+        results.append(timed("ffprobe", probe_with_ffprobe, paths[:500]))
+    results += [
+        timed("wave", probe_with_wave, paths),
+        timed("probe", probe_file, paths),
+    ]
+    index = ProbeIndex(index_path)
+    start = time.perf_counter()
+    probes = list(index.probe_many(paths))
+    elapsed = time.perf_counter() - start
+    print(f"{'index':<10} {elapsed:>8.2f}s  {elapsed / len(paths) * 1e6:>8.1f} µs/file  "
+          f"{len(paths) / elapsed:>10.0f} files/s")
+    results.append({'method': 'index', 'seconds': round(elapsed, 3),
+                    'us_per_file': round(elapsed / len(paths) * 1e6, 1)})
+    results.append(timed("cached", index.probe, paths))
+    print(f"Cache: {index.count()} rows, {index.hits} hits, {index.misses} misses")
+    index.close()
+
+    routes = {}
+    for probe in probes:
+        key = f"{probe.route}/{probe.mode}"
+        routes[key] = routes.get(key, 0) + 1
+    print(f"Routes: {', '.join(f'{n} {r}' for r, n in sorted(routes.items()))}")
+
+    if not args.keep:
+        shutil.rmtree(root)
+
+    output = args.output or f"probe_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump({'files': len(paths), 'routes': routes, 'results': results}, f, indent=2)
+    print(f"Report saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Transcript text search benchmark
+Builds a transcript_index over a synthetic corpus of mortgage-call
+transcripts (default 1M calls, 12 segments each) and reports build time,
+index size and p50/p99 latency for a set of typical queries: a common word,
+a rare phrase, a prefix, and the same phrase limited to one week, each with
+and without the per-day facet counts.
+
+The corpus is deterministic (seeded), so runs are comparable. Building 1M
+transcripts takes a while and several GB of disk; --keep reuses the index.
+
+Usage:
+    python benchmark_text_search.py
+    python benchmark_text_search.py --transcripts 100000 --runs 50
+    python benchmark_text_search.py --index /data/bench_index.db --keep
+"""
+
+import os
+import time
+import random
+import argparse
+from datetime import datetime, timedelta, date
+
+from transcript_index import TranscriptIndex
+
+WORDS = (
+    "loan payment escrow rate lock closing borrower lender refinance balance "
+    "statement insurance taxes principal interest application approval document "
+    "income employment credit score mortgage property title deed transfer fee "
+    "account number verify address phone email call back thanks hello okay yes "
+    "no sure right well so the a to of and we you I it is was for on that this "
+    "have with be can will would just need want let me check see"
+).split()
+
+PHRASES = [
+    "appraisal waiver", "forbearance plan", "loan modification", "rate lock extension",
+    "payoff quote", "hardship letter", "escrow shortage", "closing disclosure"
+]
+
+QUERIES = [
+    ("common word", "payment", {}),
+    ("rare phrase", '"appraisal waiver"', {}),
+    ("prefix", "forbear*", {}),
+    ("two words", "escrow shortage", {}),
+    ("phrase + week", '"appraisal waiver"', {'start': date(2024, 6, 3), 'end': date(2024, 6, 9)})
+]
+
+
+def synthetic_transcript(rng: random.Random, segments: int) -> list:
+    lines = []
+    for seq in range(segments):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 18))]
+        # Each phrase shows up in roughly 1 of 200 segments
+        if rng.random() < 0.04:
+            words.insert(rng.randint(0, len(words)), rng.choice(PHRASES))
+        lines.append((seq * 4.5, " ".join(words)))
+    return lines
+
+
+def build(index: TranscriptIndex, transcripts: int, segments: int):
+    rng = random.Random(42)
+    start_day = datetime(2024, 1, 1)
+    started = time.time()
+    for i in range(transcripts):
+        call_time = start_day + timedelta(seconds=rng.randint(0, 365 * 86400))
+        orkuid = f"{call_time.strftime('%Y%m%d_%H%M%S')}_{i:07d}"
+        index.add(orkuid, synthetic_transcript(rng, segments), call_time,
+                  user_name=f"user{rng.randint(1, 400)}", loan_numbers=[str(1000000000 + rng.randint(0, 99999))],
+                  commit=False)
+        if (i + 1) % 5000 == 0:
+            index.conn.commit()
+        if (i + 1) % 100000 == 0:
+            rate = (i + 1) / (time.time() - started)
+            print(f"  {i + 1:,} transcripts ({rate:,.0f}/s)")
+    index.conn.commit()
+    index.optimize()
+    return time.time() - started
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcript full-text search")
+    parser.add_argument('--transcripts', type=int, default=1000000, help='Synthetic transcripts to index')
+    parser.add_argument('--segments', type=int, default=12, help='Segments per transcript')
+    parser.add_argument('--index', default='bench_transcript_index.db', help='Index file to build')
+    parser.add_argument('--keep', action='store_true', help='Reuse an existing index file')
+    parser.add_argument('--runs', type=int, default=20, help='Timed runs per query')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"TEXT SEARCH BENCHMARK - {args.transcripts:,} transcripts x {args.segments} segments")
+    print("=" * 70)
+
+    if not args.keep:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.index + suffix):
+                os.remove(args.index + suffix)
+
+    index = TranscriptIndex(args.index)
+    if not index.stats()['transcripts']:
+        print("\nBuilding index...")
+        elapsed = build(index, args.transcripts, args.segments)
+        print(f"Built in {elapsed:.0f}s")
+    stats = index.stats()
+    print(f"Index: {stats['transcripts']:,} transcripts, {stats['segments']:,} segments, {stats['size_mb']:,.0f} MB\n")
+
+    print(f"{'Query':>15} {'p50(ms)':>9} {'p99(ms)':>9} {'+facets p50':>12}")
+    for name, query, filters in QUERIES:
+        row = [name]
+        for facets in (False, True):
+            latencies = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                index.search(query, limit=20, facets=facets, **filters)
+                latencies.append((time.perf_counter() - start) * 1000)
+            row.append(latencies)
+        print(f"{name:>15} {percentile(row[1], 50):>9.1f} {percentile(row[1], 99):>9.1f} "
+              f"{percentile(row[2], 50):>12.1f}")
+
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Energy-VAD triage benchmark
+Runs scream_triage over a sample corpus and reports what it would keep
+away from the model: recordings skipped as silence / music, and how much
+of the remaining audio is speech. With --model it also transcribes the
+corpus twice (plain engine vs TriageEngine in front of it) and reports the
+measured fraction of model time saved.
+
+On a scream_synth.py corpus it also scores each verdict against the
+generator's ground truth (manifest.json).
+
+Usage:
+    python benchmark_triage.py wav/
+    python scream_synth.py corpus/ --calls 300 && python benchmark_triage.py corpus/
+    python benchmark_triage.py wav/ --model models/faster-whisper-large-v3-turbo-ct2 --limit 50
+"""
+
+import os
+import json
+import time
+import argparse
+from datetime import datetime
+
+from scream_engine import DirectorySource, TriageEngine, WhisperEngine
+from scream_synth import load_manifest
+from scream_triage import triage_file
+
+
+def triage_corpus(audios, min_speech_seconds: float, min_speech_ratio: float,
+                  expected: dict = None) -> dict:
+    verdicts = {}
+    # (expected, got) -> count, for synthetic corpora
+    confusion = {}
+    audio_seconds = 0.0
+    kept_seconds = 0.0
+    triage_time = 0.0
+    for audio in audios:
+        try:
+            result = triage_file(audio.path, min_speech_seconds, min_speech_ratio)
+        except ValueError:
+            verdicts['unreadable'] = verdicts.get('unreadable', 0) + 1
+            continue
+        verdicts[result.verdict] = verdicts.get(result.verdict, 0) + 1
+        if expected and audio.path.stem in expected:
+            key = f"{expected[audio.path.stem]}->{result.verdict}"
+            confusion[key] = confusion.get(key, 0) + 1
+        audio_seconds += result.duration
+        triage_time += result.triage_time
+        if result.verdict == "speech":
+            kept_seconds += result.speech_seconds
+    scored = sum(confusion.values())
+    agreed = sum(n for key, n in confusion.items() if key.split('->')[0] == key.split('->')[1])
+    return {
+        'verdicts': verdicts,
+        'confusion': confusion,
+        'accuracy': round(agreed / scored, 3) if scored else None,
+        'audio_seconds': round(audio_seconds, 1),
+        'model_seconds': round(kept_seconds, 1),
+        'estimated_saved': round(1 - kept_seconds / audio_seconds, 3) if audio_seconds else 0,
+        'triage_seconds': round(triage_time, 3),
+        'triage_realtime_factor': round(audio_seconds / triage_time, 0) if triage_time else 0
+    }
+
+
+def time_engine(engine, audios) -> float:
+    # Load the model before the clock starts
+    getattr(engine, 'engine', engine).model
+    start = time.time()
+    try:
+        for _ in engine.process_many(audios):
+            pass
+    finally:
+        engine.close()
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark energy-VAD triage")
+    parser.add_argument('source', help='Directory of recordings')
+    parser.add_argument('-m', '--model', help='Also measure real model time with this model')
+    parser.add_argument('-d', '--device', default='cuda', choices=['cuda', 'cpu'])
+    parser.add_argument('--limit', type=int, default=200, help='Recordings to use')
+    parser.add_argument('--min-speech', type=float, default=2.0, help='Minimum speech seconds')
+    parser.add_argument('--min-ratio', type=float, default=0.02, help='Minimum speech fraction')
+    parser.add_argument('-o', '--output', help='JSON report path')
+    args = parser.parse_args()
+
+    audios = list(DirectorySource(args.source, recursive=True).discover())[:args.limit]
+    if not audios:
+        print(f"No recordings found in {args.source}")
+        return
+
+    print("=" * 70)
+    print(f"TRIAGE BENCHMARK - {len(audios)} recordings")
+    print("=" * 70)
+
+    expected = None
+    if os.path.exists(os.path.join(args.source, "manifest.json")):
+        expected = {orkuid: call['expected_verdict']
+                    for orkuid, call in load_manifest(args.source)['by_orkuid'].items()}
+
+    report = triage_corpus(audios, args.min_speech, args.min_ratio, expected)
+    print(f"Verdicts: {', '.join(f'{n} {v}' for v, n in sorted(report['verdicts'].items()))}")
+    if report['accuracy'] is not None:
+        print(f"Against ground truth: {report['accuracy']:.1%} "
+              f"({', '.join(f'{n} {k}' for k, n in sorted(report['confusion'].items()))})")
+    print(f"Audio: {report['audio_seconds'] / 60:.1f} min, sent to model: "
+          f"{report['model_seconds'] / 60:.1f} min")
+    print(f"Estimated model time saved: {report['estimated_saved']:.1%}")
+    print(f"Triage cost: {report['triage_seconds']:.2f}s ({report['triage_realtime_factor']:.0f}x realtime)")
+
+    if args.model:
+        compute_type = "int8_float16" if args.device == "cuda" else "int8"
+        baseline = time_engine(WhisperEngine(args.model, device=args.device, compute_type=compute_type),
+                               list(DirectorySource(args.source, recursive=True).discover())[:args.limit])
+        triaged = time_engine(
+            TriageEngine(WhisperEngine(args.model, device=args.device, compute_type=compute_type),
+                         min_speech_seconds=args.min_speech, min_speech_ratio=args.min_ratio),
+            list(DirectorySource(args.source, recursive=True).discover())[:args.limit]
+        )
+        report['baseline_seconds'] = round(baseline, 1)
+        report['triaged_seconds'] = round(triaged, 1)
+        report['measured_saved'] = round(1 - triaged / baseline, 3) if baseline else 0
+        print(f"\nModel time: {baseline:.1f}s plain vs {triaged:.1f}s with triage "
+              f"({report['measured_saved']:.1%} saved)")
+
+    output = args.output or f"triage_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
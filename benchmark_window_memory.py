@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Windowed reader memory benchmark
+Writes synthetic 8 kHz μ-law stereo recordings of increasing length and
+decodes each one in a fresh process two ways:
+  full     - ChannelSource.stereo(): both channels at 16 kHz in memory
+  windowed - ChannelSource.windows(): one overlapping window at a time
+and reports peak RSS, which for the windowed reader should stay flat.
+
+Usage:
+    python benchmark_window_memory.py
+    python benchmark_window_memory.py --minutes 30,120,240 --window 600 --keep
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+from scream_audio import ChannelSource, WAVE_FORMAT_MULAW
+
+RATE = 8000
+
+
+def write_ulaw_stereo(path: str, minutes: float):
+    """Noise-ish μ-law stereo WAV written in one-minute blocks"""
+    frames = int(minutes * 60 * RATE)
+    rng = np.random.default_rng(0)
+    with open(path, 'wb') as f:
+        data_size = frames * 2
+        f.write(b'RIFF' + (36 + data_size).to_bytes(4, 'little') + b'WAVE')
+        f.write(b'fmt ' + (16).to_bytes(4, 'little'))
+        f.write(WAVE_FORMAT_MULAW.to_bytes(2, 'little') + (2).to_bytes(2, 'little'))
+        f.write(RATE.to_bytes(4, 'little') + (RATE * 2).to_bytes(4, 'little'))
+        f.write((2).to_bytes(2, 'little') + (8).to_bytes(2, 'little'))
+        f.write(b'data' + data_size.to_bytes(4, 'little'))
+        block = rng.integers(0, 256, size=RATE * 60 * 2, dtype=np.uint8)
+        for start in range(0, frames, RATE * 60):
+            f.write(block[:(min(frames, start + RATE * 60) - start) * 2].tobytes())
+
+
+def measure(path: str, mode: str, window: float, overlap: float):
+    """Runs in a child process; prints one JSON line"""
+    start = time.time()
+    samples = 0
+    with ChannelSource(path) as source:
+        if mode == "full":
+            left, right = source.stereo()
+            samples = len(left)
+            del left, right
+        else:
+            for item in source.windows(window, overlap, split_channels=True):
+                samples += len(item.samples)
+    print(json.dumps({
+        'mode': mode,
+        'seconds': round(time.time() - start, 2),
+        'samples': samples,
+        # ru_maxrss is KiB on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS: full decode vs windowed reader")
+    parser.add_argument('--minutes', default='30,60,120,240', help='Comma separated lengths')
+    parser.add_argument('--window', type=float, default=600.0, help='Window seconds')
+    parser.add_argument('--overlap', type=float, default=30.0, help='Overlap seconds')
+    parser.add_argument('--dir', help='Where to write the WAVs (default: temp dir)')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated WAVs')
+    parser.add_argument('-o', '--output', help='JSON report path')
+    parser.add_argument('--measure', nargs=2, metavar=('PATH', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure[0], args.measure[1], args.window, args.overlap)
+        return
+
+    workdir = args.dir or tempfile.mkdtemp(prefix="scream_windows_")
+    os.makedirs(workdir, exist_ok=True)
+
+    print("=" * 70)
+    print(f"WINDOWED READER MEMORY - {args.window:.0f}s windows, {args.overlap:.0f}s overlap")
+    print("=" * 70)
+    print(f"{'Length':>8}  {'Full RSS':>10}  {'Windowed RSS':>13}  {'Full s':>7}  {'Windowed s':>10}")
+
+    results = []
+    for minutes in [float(m) for m in args.minutes.split(',')]:
+        path = os.path.join(workdir, f"bridge_{minutes:g}min.wav")
+        write_ulaw_stereo(path, minutes)
+        row = {'minutes': minutes}
+        for mode in ("full", "windowed"):
+            out = subprocess.run(
+                [sys.executable, __file__, '--measure', path, mode,
+                 '--window', str(args.window), '--overlap', str(args.overlap)],
+                capture_output=True, text=True, check=True
+            )
+            row[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+        results.append(row)
+        print(f"{minutes:>6g}m  {row['full']['peak_rss_mb']:>8.1f}MB  "
+              f"{row['windowed']['peak_rss_mb']:>11.1f}MB  "
+              f"{row['full']['seconds']:>7.1f}  {row['windowed']['seconds']:>10.1f}")
+        if not args.keep:
+            os.remove(path)
+
+    output = args.output or f"window_memory_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump({'window_seconds': args.window, 'overlap_seconds': args.overlap,
+                   'results': results}, f, indent=2)
+    print(f"Report saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
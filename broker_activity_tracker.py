@@ -6,21 +6,15 @@ Click on any phone number to see their full activity
 
 from fastapi import FastAPI
 from fastapi.responses import HTMLResponse, JSONResponse
-import pymysql
+from loan_db import get_db_connection, register_pool_routes, fetch_all, fetch_one
+from loan_paging import (CursorError, keyset_condition, clamp_page_size, paginate,
+                         stream_rows, ndjson_response)
 import json
 from datetime import datetime, timedelta
 import uvicorn
 
 app = FastAPI(title="Broker Activity Tracker")
-
-DB_CONFIG = {
-    'host': 's40vpsoxweb002',
-    'port': 3306,
-    'user': 'root',
-    'password': 'admin',
-    'database': 'oreka',
-    'charset': 'utf8mb4'
-}
+register_pool_routes(app)
 
 @app.get("/", response_class=HTMLResponse)
 async def home():
@@ -43,7 +37,7 @@ async def home():
 async def loan_list():
     """List loans with broker tracking enabled"""
     
-    conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -151,7 +145,7 @@ async def loan_list():
 async def loan_timeline(loan_number: str):
     """Show loan timeline with clickable phone numbers"""
     
-    conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     # Get loan timeline
@@ -387,38 +381,22 @@ async def loan_timeline(loan_number: str):
         </div>
         
         <script>
-            async function searchBroker(phoneNumber, currentLoan, firstDate, lastDate) {{
-                // Show modal
-                document.getElementById('brokerModal').style.display = 'block';
-                document.getElementById('brokerTitle').textContent = 'Activity for ' + phoneNumber;
-                document.getElementById('brokerContent').innerHTML = '<div class="loading">Searching all calls...</div>';
-                
-                // Fetch broker activity
+            let brokerQuery = null;
+            let brokerCallCount = 0;
+            
+            async function fetchBrokerPage(cursor) {{
                 const response = await fetch('/broker-search', {{
                     method: 'POST',
                     headers: {{ 'Content-Type': 'application/json' }},
-                    body: JSON.stringify({{
-                        phone_number: phoneNumber,
-                        current_loan: currentLoan,
-                        first_date: firstDate,
-                        last_date: lastDate
-                    }})
+                    body: JSON.stringify(Object.assign({{ cursor: cursor }}, brokerQuery))
                 }});
-                
-                const data = await response.json();
-                
-                // Display results
-                let html = `
-                    <div class="broker-stats">
-                        <p><strong>Total Calls:</strong> ${{data.total_calls}}</p>
-                        <p><strong>Loan Numbers Discussed:</strong> ${{data.unique_loans.join(', ') || 'None'}}</p>
-                        <p><strong>Period:</strong> ${{data.period}}</p>
-                    </div>
-                    <div class="broker-timeline">
-                        <h3>Call History</h3>
-                `;
-                
-                data.calls.forEach((call, idx) => {{
+                return await response.json();
+            }}
+            
+            function renderBrokerCalls(calls, currentLoan) {{
+                let html = '';
+                calls.forEach((call) => {{
+                    brokerCallCount += 1;
                     let callClass = 'no-loan';
                     let loanInfo = 'No loan mentioned';
                     
@@ -435,7 +413,7 @@ async def loan_timeline(loan_number: str):
                     html += `
                         <div class="broker-call ${{callClass}}">
                             <div style="display: flex; justify-content: space-between;">
-                                <span><strong>#${{idx + 1}}</strong> ${{call.timestamp}}</span>
+                                <span><strong>#${{brokerCallCount}}</strong> ${{call.timestamp}}</span>
                                 <span>${{call.duration}}s</span>
                             </div>
                             <div>${{call.localParty}} → ${{call.remoteParty}}</div>
@@ -446,9 +424,60 @@ async def loan_timeline(loan_number: str):
                         </div>
                     `;
                 }});
+                return html;
+            }}
+            
+            function renderMoreButton(nextCursor) {{
+                const more = document.getElementById('brokerMore');
+                if (!nextCursor) {{
+                    more.innerHTML = '';
+                    return;
+                }}
+                more.innerHTML = '<button onclick="loadMoreBroker()">Load more calls</button>';
+                more.dataset.cursor = nextCursor;
+            }}
+            
+            async function loadMoreBroker() {{
+                const more = document.getElementById('brokerMore');
+                more.innerHTML = '<div class="loading">Loading...</div>';
+                const data = await fetchBrokerPage(more.dataset.cursor);
+                document.getElementById('brokerCalls').insertAdjacentHTML(
+                    'beforeend', renderBrokerCalls(data.calls, brokerQuery.current_loan));
+                renderMoreButton(data.next_cursor);
+            }}
+            
+            async function searchBroker(phoneNumber, currentLoan, firstDate, lastDate) {{
+                // Show modal
+                document.getElementById('brokerModal').style.display = 'block';
+                document.getElementById('brokerTitle').textContent = 'Activity for ' + phoneNumber;
+                document.getElementById('brokerContent').innerHTML = '<div class="loading">Searching all calls...</div>';
+                
+                // Fetch broker activity (first page + totals)
+                brokerQuery = {{
+                    phone_number: phoneNumber,
+                    current_loan: currentLoan,
+                    first_date: firstDate,
+                    last_date: lastDate
+                }};
+                brokerCallCount = 0;
+                const data = await fetchBrokerPage(null);
+                
+                // Display results
+                let html = `
+                    <div class="broker-stats">
+                        <p><strong>Total Calls:</strong> ${{data.total_calls}}</p>
+                        <p><strong>Loan Numbers Discussed:</strong> ${{data.unique_loans.join(', ') || 'None'}}</p>
+                        <p><strong>Period:</strong> ${{data.period}}</p>
+                    </div>
+                    <div class="broker-timeline">
+                        <h3>Call History</h3>
+                        <div id="brokerCalls">${{renderBrokerCalls(data.calls, currentLoan)}}</div>
+                        <div id="brokerMore"></div>
+                    </div>
+                `;
                 
-                html += '</div>';
                 document.getElementById('brokerContent').innerHTML = html;
+                renderMoreButton(data.next_cursor);
             }}
             
             function closeModal() {{
@@ -469,81 +498,123 @@ async def loan_timeline(loan_number: str):
     
     return HTMLResponse(content=html)
 
-@app.post("/broker-search")
-async def broker_search(data: dict):
-    """Search all activity for a phone number during loan lifecycle"""
-    
-    phone_number = data.get('phone_number')
-    current_loan = data.get('current_loan')
-    first_date = data.get('first_date')
-    last_date = data.get('last_date')
+BROKER_CALLS_QUERY = """
+    SELECT 
+        t.orkUid,
+        t.timestamp,
+        t.duration,
+        t.localParty,
+        t.remoteParty,
+        ct.loan_numbers,
+        ct.summary,
+        COALESCE(CONCAT(u.firstname, ' ', u.lastname), 'Unknown') as user_name
+    FROM orktape t
+    LEFT JOIN call_transcripts_v2 ct ON t.orkUid = ct.orkuid
+    -- One segment per tape: (timestamp, orkUid) must stay unique for the keyset
+    LEFT JOIN orksegment s ON s.id = (
+        SELECT MIN(s1.id) FROM orksegment s1 WHERE s1.tape_id = t.id)
+    LEFT JOIN orkuser u ON s.user_id = u.id
+    WHERE (t.localParty = %s OR t.remoteParty = %s)
+    AND t.timestamp >= %s {keyset}
+    ORDER BY t.timestamp, t.orkUid
+"""
+
+def format_call(call):
+    """One call row as returned by /broker-search"""
+    call_data = {
+        'orkuid': call['orkUid'],
+        'timestamp': call['timestamp'].strftime('%m/%d/%Y %I:%M %p'),
+        'duration': call['duration'],
+        'localParty': call['localParty'],
+        'remoteParty': call['remoteParty'],
+        'user': call['user_name'],
+        'summary': call.get('summary'),
+        'loans': []
+    }
     
-    conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
-    cursor = conn.cursor()
+    if call.get('loan_numbers'):
+        try:
+            call_data['loans'] = json.loads(call['loan_numbers'])
+        except:
+            pass
     
-    # Get all calls for this phone number from first mention through entire index
-    cursor.execute("""
-        SELECT 
-            t.orkUid,
-            t.timestamp,
-            t.duration,
-            t.localParty,
-            t.remoteParty,
-            ct.loan_numbers,
-            ct.summary,
-            COALESCE(CONCAT(u.firstname, ' ', u.lastname), 'Unknown') as user_name
+    return call_data
+
+async def broker_summary(phone_number, first_date):
+    """Totals over every call, computed in SQL instead of from the call list"""
+    stats = await fetch_one("""
+        SELECT COUNT(*) as total_calls, MIN(t.timestamp) as first_call, MAX(t.timestamp) as last_call
         FROM orktape t
-        LEFT JOIN call_transcripts_v2 ct ON t.orkUid = ct.orkuid
-        LEFT JOIN orksegment s ON t.id = s.tape_id
-        LEFT JOIN orkuser u ON s.user_id = u.id
         WHERE (t.localParty = %s OR t.remoteParty = %s)
         AND t.timestamp >= %s
-        ORDER BY t.timestamp
     """, (phone_number, phone_number, first_date))
     
-    calls = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    loan_rows = await fetch_all("""
+        SELECT DISTINCT ct.loan_numbers
+        FROM orktape t
+        JOIN call_transcripts_v2 ct ON t.orkUid = ct.orkuid
+        WHERE (t.localParty = %s OR t.remoteParty = %s)
+        AND t.timestamp >= %s
+        AND ct.loan_numbers IS NOT NULL AND ct.loan_numbers != '[]'
+    """, (phone_number, phone_number, first_date))
     
-    # Process results
     unique_loans = set()
-    processed_calls = []
-    
-    for call in calls:
-        call_data = {
-            'orkuid': call['orkUid'],
-            'timestamp': call['timestamp'].strftime('%m/%d/%Y %I:%M %p'),
-            'duration': call['duration'],
-            'localParty': call['localParty'],
-            'remoteParty': call['remoteParty'],
-            'user': call['user_name'],
-            'summary': call.get('summary'),
-            'loans': []
-        }
-        
-        if call.get('loan_numbers'):
-            try:
-                loans = json.loads(call['loan_numbers'])
-                call_data['loans'] = loans
-                unique_loans.update(loans)
-            except:
-                pass
-        
-        processed_calls.append(call_data)
+    for row in loan_rows:
+        try:
+            unique_loans.update(json.loads(row['loan_numbers']))
+        except:
+            pass
     
-    # Calculate period
-    if calls:
-        period = f"{calls[0]['timestamp'].strftime('%m/%d/%Y')} to {calls[-1]['timestamp'].strftime('%m/%d/%Y')}"
+    if stats['total_calls']:
+        period = f"{stats['first_call'].strftime('%m/%d/%Y')} to {stats['last_call'].strftime('%m/%d/%Y')}"
     else:
         period = "No calls found"
     
-    return JSONResponse({
+    return {
+        'total_calls': stats['total_calls'],
+        'unique_loans': sorted(unique_loans),
+        'period': period
+    }
+
+@app.post("/broker-search")
+async def broker_search(data: dict):
+    """Search all activity for a phone number during loan lifecycle
+    
+    Returns one page of calls in (timestamp, orkuid) order plus next_cursor;
+    send it back as "cursor" for the next page. "format": "ndjson" streams
+    every call instead.
+    """
+    
+    phone_number = data.get('phone_number')
+    first_date = data.get('first_date')
+    
+    try:
+        keyset, keyset_params = keyset_condition(("t.timestamp", "t.orkUid"), data.get('cursor'))
+    except CursorError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    
+    # Get all calls for this phone number from first mention through entire index
+    query = BROKER_CALLS_QUERY.format(keyset=keyset)
+    params = [phone_number, phone_number, first_date] + keyset_params
+    
+    if data.get('format') == 'ndjson':
+        return ndjson_response(stream_rows(query, params), format_call)
+    
+    page_size = clamp_page_size(data.get('limit'))
+    calls = await fetch_all(query + " LIMIT %s", params + [page_size + 1])
+    calls, next_cursor = paginate(calls, page_size, ('timestamp', 'orkUid'))
+    
+    result = {
         'phone_number': phone_number,
-        'total_calls': len(calls),
-        'unique_loans': sorted(list(unique_loans)),
-        'period': period,
-        'calls': processed_calls
-    })
+        'calls': [format_call(call) for call in calls],
+        'next_cursor': next_cursor
+    }
+    
+    # Totals only with the first page
+    if not data.get('cursor'):
+        result.update(await broker_summary(phone_number, first_date))
+    
+    return JSONResponse(result)
 
 if __name__ == "__main__":
     print("Starting Broker Activity Tracker...")
@@ -10,6 +10,8 @@ import struct
 import os
 from pathlib import Path
 
+from scream_probe import probe_file
+
 def check_wav_file(filename):
     """Check detailed WAV format info"""
     print(f"\n{'='*60}")
@@ -17,6 +19,11 @@ def check_wav_file(filename):
     print(f"Size: {os.path.getsize(filename):,} bytes")
     print("="*60)
     
+    # Header probe: what SCREAM will do with this file
+    probe = probe_file(filename)
+    print(f"Probe: {probe.codec or 'not a WAV'} {probe.channels or '?'}ch "
+          f"{probe.sample_rate or '?'}Hz -> {probe.route} decoder, {probe.mode} engine mode")
+    
     try:
         # Try with wave module first
         with wave.open(filename, 'rb') as wav:
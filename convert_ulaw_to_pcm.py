@@ -2,6 +2,9 @@
 """
 Convert μ-law (u-law) WAV files to standard PCM WAV
 Specifically for telephony recordings (8kHz, μ-law)
+
+The SCREAM engine no longer needs this: scream_audio.load_audio decodes
+μ-law in-process. Kept for tools that want a PCM copy on disk.
 """
 
 import sys
@@ -7,6 +7,8 @@ Designed for React/Vite/TypeScript frontend on s01vpsromuls001
 import pymysql
 import json
 
+from loan_rollups import ROLLUP_TABLES, CREATED_AT_INDEX, catch_up
+
 print("=" * 80)
 print("LOAN NUMBER INDEX SCHEMA - OPTIMIZED FOR SEARCH")
 print("=" * 80)
@@ -66,7 +68,7 @@ CREATE TABLE IF NOT EXISTS user_loan_mapping (
 CREATE_API_CACHE = """
 CREATE TABLE IF NOT EXISTS loan_search_cache (
     cache_key VARCHAR(255) PRIMARY KEY,
-    result_data TEXT,
+    result_data MEDIUMTEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     expires_at TIMESTAMP NULL,
     
@@ -86,13 +88,18 @@ def create_tables():
             ("loan_number_index", CREATE_LOAN_INDEX),
             ("user_loan_mapping", CREATE_USER_LOANS),
             ("loan_search_cache", CREATE_API_CACHE)
-        ]
+        ] + ROLLUP_TABLES
         
         for table_name, create_sql in tables:
             print(f"\nCreating {table_name}...")
             cursor.execute(create_sql)
             print(f"✓ {table_name} created")
         
+        try:
+            cursor.execute(CREATED_AT_INDEX)
+        except pymysql.err.OperationalError:
+            pass  # index already exists
+        
         connection.commit()
         cursor.close()
         connection.close()
@@ -186,6 +193,11 @@ def populate_loan_index():
         connection.commit()
         print(f"✓ User loan mapping updated")
         
+        # Build analytics rollups from the index
+        print("\nBuilding analytics rollups...")
+        days = catch_up(connection, rebuild=True)
+        print(f"✓ Rollups built for {days} days")
+        
         cursor.close()
         connection.close()
         
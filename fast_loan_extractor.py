@@ -12,6 +12,8 @@ import time
 import pymysql
 import paramiko
 from faster_whisper import WhisperModel
+from scream_numbers import normalize_spoken_numbers
+from loan_rollups import refresh_after_ingest
 from datetime import datetime
 
 # Database configuration
@@ -130,6 +132,7 @@ class FastLoanExtractor:
     def extract_loan_numbers(self, text):
         """Extract loan numbers from transcript"""
         loan_numbers = set()
+        text = normalize_spoken_numbers(text)
         
         for pattern in self.loan_patterns:
             matches = re.findall(pattern, text, re.IGNORECASE)
@@ -219,6 +222,7 @@ class FastLoanExtractor:
                     call_info.get('duration', 0)
                 ))
             
+            refresh_after_ingest(self.cursor, call_info.get('timestamp'), loan_numbers, user_name or None)
             self.db_conn.commit()
             
         except Exception as e:
@@ -12,10 +12,15 @@ import time
 import pymysql
 import subprocess
 from faster_whisper import WhisperModel
+from scream_numbers import normalize_spoken_numbers
+from scream_redecode import TargetedRedecoder
+from scream_chunking import ChunkedTranscriber, wav_duration
+from scream_decode import DecodeStage
+from scream_profile import profiled, span
+from loan_rollups import refresh_after_ingest
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Lock
-import queue
 
 # Database configuration
 DB_CONFIG = {
@@ -30,8 +35,34 @@ DB_CONFIG = {
 # Global lock for database operations
 db_lock = Lock()
 
+# Recordings at least this long are split at silences and batch-decoded
+LONG_FILE_SECONDS = 1800
+SAMPLE_RATE = 16000
+
+def fetch_audio(filename, local_path=None):
+    """Copy one recording to temp_audio/ via scp; module level so decode processes can run it"""
+    remote_path = f"/var/log/orkaudio.prod.nfs/audio/{filename}"
+    local_path = local_path or os.path.join("temp_audio", f"pre_{os.path.basename(filename)}")
+    
+    os.makedirs("temp_audio", exist_ok=True)
+    
+    # Use scp command
+    cmd = [
+        "scp",
+        "-o", "StrictHostKeyChecking=no",
+        "-o", "UserKnownHostsFile=/dev/null",
+        f"estillmane@s40vpsoxweb002:{remote_path}",
+        local_path
+    ]
+    
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    
+    if result.returncode == 0 and os.path.exists(local_path):
+        return local_path
+    return None
+
 class FastWorker:
-    def __init__(self, worker_id):
+    def __init__(self, worker_id, two_pass=False):
         self.worker_id = worker_id
         print(f"[Worker {worker_id}] Initializing...")
         
@@ -45,6 +76,12 @@ class FastWorker:
         )
         print(f"[Worker {worker_id}] ✓ Whisper model loaded")
         
+        # Two-pass mode: greedy pass + beam-5 re-decode around loan mentions
+        self.redecoder = TargetedRedecoder(self.whisper_model) if two_pass else None
+        self.first_pass_time = 0.0
+        self.second_pass_time = 0.0
+        self.inference_time = 0.0
+        
         # Transcript directory
         self.transcript_dir = "C:/transcripts" if sys.platform == "win32" else "transcripts"
         os.makedirs(self.transcript_dir, exist_ok=True)
@@ -62,23 +99,9 @@ class FastWorker:
     def download_audio(self, filename, orkuid):
         """Download audio file via scp subprocess"""
         try:
-            remote_path = f"/var/log/orkaudio.prod.nfs/audio/{filename}"
-            local_path = f"temp_audio/worker{self.worker_id}_{orkuid}.wav"
-            
-            os.makedirs("temp_audio", exist_ok=True)
-            
-            # Use scp command
-            cmd = [
-                "scp",
-                "-o", "StrictHostKeyChecking=no",
-                "-o", "UserKnownHostsFile=/dev/null",
-                f"estillmane@s40vpsoxweb002:{remote_path}",
-                local_path
-            ]
+            local_path = fetch_audio(filename, f"temp_audio/worker{self.worker_id}_{orkuid}.wav")
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0 and os.path.exists(local_path):
+            if local_path:
                 return local_path
             else:
                 print(f"[Worker {self.worker_id}] Download failed for {orkuid}")
@@ -88,31 +111,51 @@ class FastWorker:
             print(f"[Worker {self.worker_id}] Download error: {e}")
             return None
     
-    def transcribe_audio(self, audio_path):
-        """Transcribe audio with Whisper - turbo speed"""
+    def transcribe_audio(self, audio):
+        """Transcribe a file path or decoded 16kHz samples with Whisper - turbo speed"""
         try:
             start_time = time.time()
-            
-            # Transcribe with turbo model
-            segments, info = self.whisper_model.transcribe(
-                audio_path,
-                language="en",
-                task="transcribe",
-                beam_size=1,  # Faster
-                best_of=1,
-                temperature=0.0,
-                condition_on_previous_text=False,
-                vad_filter=True,
-                vad_parameters=dict(
-                    min_silence_duration_ms=500,
-                    speech_pad_ms=100
-                )
+            vad_parameters = dict(
+                min_silence_duration_ms=500,
+                speech_pad_ms=100
             )
             
-            # Combine segments
-            full_text = " ".join([seg.text.strip() for seg in segments])
+            if isinstance(audio, str):
+                duration = wav_duration(audio) or 0
+            else:
+                duration = len(audio) / SAMPLE_RATE
+            
+            if duration >= LONG_FILE_SECONDS:
+                chunker = ChunkedTranscriber(self.whisper_model, mode="batched")
+                segments, info = chunker.transcribe(audio)
+                full_text = " ".join([seg['text'] for seg in segments])
+            elif self.redecoder:
+                segments, info, stats = self.redecoder.transcribe(
+                    audio,
+                    vad_parameters=vad_parameters
+                )
+                self.first_pass_time += stats.first_pass_time
+                self.second_pass_time += stats.second_pass_time
+                full_text = " ".join([seg['text'] for seg in segments])
+            else:
+                # Transcribe with turbo model
+                segments, info = self.whisper_model.transcribe(
+                    audio,
+                    language="en",
+                    task="transcribe",
+                    beam_size=1,  # Faster
+                    best_of=1,
+                    temperature=0.0,
+                    condition_on_previous_text=False,
+                    vad_filter=True,
+                    vad_parameters=vad_parameters
+                )
+                
+                # Combine segments
+                full_text = " ".join([seg.text.strip() for seg in segments])
             
             transcribe_time = time.time() - start_time
+            self.inference_time += transcribe_time
             audio_duration = info.duration
             speed_factor = audio_duration / transcribe_time if transcribe_time > 0 else 0
             
@@ -130,6 +173,7 @@ class FastWorker:
     def extract_loan_numbers(self, text):
         """Extract loan numbers from transcript"""
         loan_numbers = set()
+        text = normalize_spoken_numbers(text)
         
         for pattern in self.loan_patterns:
             matches = re.findall(pattern, text, re.IGNORECASE)
@@ -223,6 +267,7 @@ class FastWorker:
                         call_info.get('duration', 0)
                     ))
                 
+                refresh_after_ingest(cursor, call_info.get('timestamp'), loan_numbers, user_name or None)
                 conn.commit()
                 cursor.close()
                 conn.close()
@@ -230,36 +275,59 @@ class FastWorker:
             except Exception as e:
                 print(f"[Worker {self.worker_id}] Failed to update loan index: {e}")
     
-    def process_recording(self, recording_info):
-        """Process a single recording"""
+    @profiled("process_recording",
+              orkuid=lambda self, recording_info, decoded=None: recording_info['orkUid'])
+    def process_recording(self, recording_info, decoded=None):
+        """Process a single recording (decoded: Future from a DecodeStage, already fetched)"""
         orkuid = recording_info['orkUid']
+        audio_path = None
         
         try:
-            # Download audio
-            audio_path = self.download_audio(recording_info['filename'], orkuid)
-            if not audio_path:
-                return False, orkuid, []
-            
-            # Transcribe
-            result = self.transcribe_audio(audio_path)
+            if decoded is not None:
+                # Download and decode ran ahead in the decode processes
+                try:
+                    with span("decode_wait"):
+                        audio = decoded.result()
+                except Exception as e:
+                    print(f"[Worker {self.worker_id}] Decode failed for {orkuid}: {e}")
+                    return False, orkuid, []
+                try:
+                    with span("transcribe", audio_seconds=round(audio.duration, 1)):
+                        result = self.transcribe_audio(audio.samples)
+                finally:
+                    audio.release()
+            else:
+                # Download audio
+                with span("download"):
+                    audio_path = self.download_audio(recording_info['filename'], orkuid)
+                if not audio_path:
+                    return False, orkuid, []
+                
+                # Transcribe
+                with span("transcribe"):
+                    result = self.transcribe_audio(audio_path)
             if not result:
                 return False, orkuid, []
             
             # Extract loan numbers
-            loan_numbers = self.extract_loan_numbers(result['text'])
+            with span("extract_loans"):
+                loan_numbers = self.extract_loan_numbers(result['text'])
             
             # Save transcript
-            transcript_path = self.save_transcript(orkuid, result['text'], recording_info['timestamp'])
+            with span("save_transcript"):
+                transcript_path = self.save_transcript(orkuid, result['text'], recording_info['timestamp'])
             
-            # Save to database
+            # Save to database (includes waiting for db_lock)
             processing_time_ms = int(result['transcribe_time'] * 1000)
-            self.save_to_database(orkuid, loan_numbers, transcript_path, processing_time_ms)
+            with span("save_db"):
+                self.save_to_database(orkuid, loan_numbers, transcript_path, processing_time_ms)
             
             # Update loan index
-            self.update_loan_index(orkuid, loan_numbers, recording_info)
+            with span("update_loan_index", loans=len(loan_numbers)):
+                self.update_loan_index(orkuid, loan_numbers, recording_info)
             
             # Clean up
-            if os.path.exists(audio_path):
+            if audio_path and os.path.exists(audio_path):
                 os.remove(audio_path)
             
             return True, orkuid, loan_numbers
@@ -268,10 +336,19 @@ class FastWorker:
             print(f"[Worker {self.worker_id}] Processing failed for {orkuid}: {e}")
             return False, orkuid, []
 
-def process_batch_parallel(recordings, num_workers=4):
-    """Process recordings in parallel with multiple workers"""
+def process_batch_parallel(recordings, num_workers=4, two_pass=False, decode_workers=2):
+    """Process recordings in parallel with multiple workers
+    
+    decode_workers > 0 downloads and decodes in a process pool ahead of the
+    Whisper workers, which then only see 16kHz arrays; 0 keeps the old
+    download + transcribe(path) inside each worker.
+    """
     
     print(f"\nStarting parallel processing with {num_workers} workers...")
+    if two_pass:
+        print("Two-pass mode: beam-5 re-decode around loan mentions")
+    if decode_workers:
+        print(f"Decode stage: {decode_workers} processes")
     
     # Stats
     total = len(recordings)
@@ -280,71 +357,82 @@ def process_batch_parallel(recordings, num_workers=4):
     loans_found = 0
     start_time = time.time()
     
-    # Create work queue
-    work_queue = queue.Queue()
-    for rec in recordings:
-        work_queue.put(rec)
+    # Create work queue: (recording, decode future or None)
+    decoder = DecodeStage(decode_workers, fetch=fetch_audio) if decode_workers else None
+    if decoder:
+        work_queue = decoder.stream(recordings, source=lambda rec: rec['filename'],
+                                    depth=num_workers * 2)
+    else:
+        work_queue = ((rec, None) for rec in recordings)
     
-    # Process with thread pool
-    with ThreadPoolExecutor(max_workers=num_workers) as executor:
-        # Create workers
-        workers = [FastWorker(i) for i in range(num_workers)]
+    # Closing the stage unlinks any decoded block a worker never got to
+    try:
+        # Process with thread pool
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            # Create workers
+            workers = [FastWorker(i, two_pass=two_pass) for i in range(num_workers)]
         
-        # Submit initial batch
-        futures = {}
-        for i in range(min(num_workers * 2, total)):  # Start with 2x workers
-            if not work_queue.empty():
-                rec = work_queue.get()
-                future = executor.submit(workers[i % num_workers].process_recording, rec)
-                futures[future] = rec
+            # Submit initial batch
+            futures = {}
+            for i in range(min(num_workers * 2, total)):  # Start with 2x workers
+                work = next(work_queue, None)
+                if work:
+                    rec, decoded = work
+                    future = executor.submit(workers[i % num_workers].process_recording, rec, decoded)
+                    futures[future] = rec
         
-        # Process results and submit new work
-        while futures:
-            # Wait for any future to complete
-            done, pending = as_completed(futures), []
+            # Process results and submit new work
+            while futures:
+                # Wait for any future to complete
+                done, pending = as_completed(futures), []
             
-            for future in done:
-                rec = futures[future]
-                try:
-                    success, orkuid, loan_numbers = future.result()
+                for future in done:
+                    rec = futures[future]
+                    try:
+                        success, orkuid, loan_numbers = future.result()
                     
-                    if success:
-                        processed += 1
-                        if loan_numbers:
-                            loans_found += 1
-                            print(f"[{processed}/{total}] ✓ {rec['target_user']} - {orkuid} - Loans: {loan_numbers}")
+                        if success:
+                            processed += 1
+                            if loan_numbers:
+                                loans_found += 1
+                                print(f"[{processed}/{total}] ✓ {rec['target_user']} - {orkuid} - Loans: {loan_numbers}")
+                            else:
+                                print(f"[{processed}/{total}] ✓ {rec['target_user']} - {orkuid} - No loans")
                         else:
-                            print(f"[{processed}/{total}] ✓ {rec['target_user']} - {orkuid} - No loans")
-                    else:
-                        failed += 1
-                        print(f"[{processed + failed}/{total}] ✗ {rec['target_user']} - {orkuid} - Failed")
+                            failed += 1
+                            print(f"[{processed + failed}/{total}] ✗ {rec['target_user']} - {orkuid} - Failed")
                     
-                    # Progress stats
-                    completed = processed + failed
-                    elapsed = time.time() - start_time
-                    rate = completed / (elapsed / 3600) if elapsed > 0 else 0
-                    remaining = (total - completed) / rate if rate > 0 else 0
+                        # Progress stats
+                        completed = processed + failed
+                        elapsed = time.time() - start_time
+                        rate = completed / (elapsed / 3600) if elapsed > 0 else 0
+                        remaining = (total - completed) / rate if rate > 0 else 0
                     
-                    if completed % 10 == 0:  # Every 10 recordings
-                        print(f"\n--- Progress: {completed}/{total} ({completed/total*100:.1f}%) ---")
-                        print(f"Success rate: {processed}/{completed} ({processed/completed*100:.1f}%)")
-                        print(f"Loans found: {loans_found}/{processed} recordings")
-                        print(f"Rate: {rate:.1f} recordings/hour")
-                        print(f"Est. remaining: {remaining:.1f} hours\n")
+                        if completed % 10 == 0:  # Every 10 recordings
+                            print(f"\n--- Progress: {completed}/{total} ({completed/total*100:.1f}%) ---")
+                            print(f"Success rate: {processed}/{completed} ({processed/completed*100:.1f}%)")
+                            print(f"Loans found: {loans_found}/{processed} recordings")
+                            print(f"Rate: {rate:.1f} recordings/hour")
+                            print(f"Est. remaining: {remaining:.1f} hours\n")
                     
-                except Exception as e:
-                    failed += 1
-                    print(f"Future failed: {e}")
+                    except Exception as e:
+                        failed += 1
+                        print(f"Future failed: {e}")
                 
-                # Remove completed future
-                del futures[future]
+                    # Remove completed future
+                    del futures[future]
                 
-                # Submit new work
-                if not work_queue.empty():
-                    rec = work_queue.get()
-                    worker_id = (processed + failed) % num_workers
-                    future = executor.submit(workers[worker_id].process_recording, rec)
-                    futures[future] = rec
+                    # Submit new work
+                    work = next(work_queue, None)
+                    if work:
+                        rec, decoded = work
+                        worker_id = (processed + failed) % num_workers
+                        future = executor.submit(workers[worker_id].process_recording, rec, decoded)
+                        futures[future] = rec
+    finally:
+        if decoder:
+            decoder.close()
+    
     
     # Final stats
     total_time = time.time() - start_time
@@ -357,6 +445,14 @@ def process_batch_parallel(recordings, num_workers=4):
     print(f"- Total time: {total_time/60:.1f} minutes")
     print(f"- Average speed: {(processed + failed) / (total_time / 3600):.1f} recordings/hour")
     print(f"- Per worker: {(processed + failed) / num_workers / (total_time / 3600):.1f} recordings/hour")
+    inference_time = sum(w.inference_time for w in workers)
+    print(f"- Inference busy: {inference_time / (total_time * num_workers) * 100:.1f}% of worker time")
+    if two_pass:
+        first_pass = sum(w.first_pass_time for w in workers)
+        second_pass = sum(w.second_pass_time for w in workers)
+        total_compute = first_pass + second_pass
+        added = second_pass / total_compute * 100 if total_compute > 0 else 0
+        print(f"- Re-decode compute: {second_pass:.1f}s of {total_compute:.1f}s ({added:.1f}% added)")
     print("=" * 80)
 
 # For testing
@@ -12,6 +12,8 @@ import time
 import pymysql
 import subprocess
 from faster_whisper import WhisperModel
+from scream_numbers import normalize_spoken_numbers
+from loan_rollups import refresh_after_ingest
 from datetime import datetime
 
 # Copy user finding code
@@ -77,10 +79,11 @@ class OptimizedProcessor:
             text = " ".join([s.text.strip() for s in segments])
             speed = info.duration / (time.time() - start)
             
-            # 3. Extract loans
+            # 3. Extract loans (spoken digits collapsed first)
             loans = set()
+            loan_text = normalize_spoken_numbers(text)
             for pattern in self.loan_patterns:
-                for match in pattern.findall(text):
+                for match in pattern.findall(loan_text):
                     if isinstance(match, tuple):
                         match = match[0]
                     if match.isdigit() and 7 <= len(match) <= 10:
@@ -123,6 +126,7 @@ class OptimizedProcessor:
                         rec.get('user_lastname'), rec['timestamp'], 
                         rec['timestamp'], rec['duration']
                     ))
+                refresh_after_ingest(self.cursor, rec['timestamp'], loans, user_name or None)
             
             # Cleanup
             os.remove(local_path)
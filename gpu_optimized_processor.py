@@ -2,17 +2,24 @@
 """
 GPU-optimized processor - maximize RTX 4090 usage
 - Pre-download files to minimize I/O wait
+- Decode/resample in a process pool so GPU workers only see 16kHz arrays
 - Batch processing on GPU
 - Multiple models if needed
 """
 
 import os
 import sys
+import argparse
 import json
 import time
 import subprocess
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from faster_whisper import WhisperModel, BatchedInferencePipeline
+from scream_numbers import normalize_spoken_numbers
+from scream_redecode import TargetedRedecoder
+from scream_decode import DecodeStage
+from fast_parallel_loan_extractor import fetch_audio
+from loan_rollups import refresh_after_ingest
 import queue
 import threading
 from datetime import datetime
@@ -29,8 +36,12 @@ DB_CONFIG = {
 }
 
 class GPUOptimizedProcessor:
-    def __init__(self, num_models=2):
-        """Initialize with multiple models to use more VRAM"""
+    def __init__(self, num_models=2, two_pass=False, decode_workers=2):
+        """Initialize with multiple models to use more VRAM
+        
+        decode_workers > 0 downloads and decodes in a process pool; 0 keeps
+        the downloader thread and transcribe(path) in the GPU workers.
+        """
         print(f"Initializing {num_models} Whisper models for better GPU usage...")
         
         self.models = []
@@ -45,13 +56,21 @@ class GPUOptimizedProcessor:
             self.models.append(model)
             print(f"  Model {i+1} loaded")
         
-        # Pre-download queue
-        self.download_queue = queue.Queue(maxsize=100)
+        # Pre-download queue; decoded audio sits in RAM, so keep that one short
+        self.decode_workers = decode_workers
+        self.download_queue = queue.Queue(maxsize=decode_workers * 4 if decode_workers else 100)
         self.process_queue = queue.Queue(maxsize=50)
         
         # Database pool
         self.db_lock = threading.Lock()
         
+        # Two-pass mode: greedy pass + beam-5 re-decode around loan mentions
+        self.two_pass = two_pass
+        self.stats_lock = threading.Lock()
+        self.first_pass_time = 0.0
+        self.second_pass_time = 0.0
+        self.gpu_time = 0.0
+        
         # Loan patterns
         self.loan_patterns = [
             re.compile(r'\b\d{8}\b'),
@@ -81,35 +100,77 @@ class GPUOptimizedProcessor:
             else:
                 print(f"Download failed: {rec['orkuid']}")
     
+    def decoder_thread(self, recordings, decoder):
+        """Download + decode in worker processes; queue (rec, decode future)
+        
+        The stage is closed by process_batch once the GPU workers have drained
+        the queue, so queued decodes are never cancelled.
+        """
+        print(f"Starting decode stage ({self.decode_workers} processes)...")
+        
+        for rec, decoded in decoder.stream(recordings, source=lambda rec: rec['filename']):
+            self.download_queue.put((rec, decoded))
+    
     def gpu_worker(self, worker_id, model):
         """GPU worker - processes files continuously"""
         print(f"GPU Worker {worker_id} started")
+        redecoder = TargetedRedecoder(model) if self.two_pass else None
         
         while True:
             try:
-                # Get pre-downloaded file
+                # Get pre-downloaded file or pre-decoded samples
                 rec, audio_path = self.download_queue.get(timeout=5)
+            except queue.Empty:
+                break
+            
+            # Every item taken off the queue is marked done, or process_batch never returns
+            try:
+                decoded = None
+                if not isinstance(audio_path, str):
+                    try:
+                        decoded = audio_path.result()
+                    except Exception as e:
+                        print(f"Decode failed: {rec['orkuid']} ({e})")
+                        continue
+                    audio = decoded.samples
+                else:
+                    audio = audio_path
                 
-                # Process on GPU
-                start = time.time()
-                segments, info = model.transcribe(
-                    audio_path,
-                    language="en",
-                    beam_size=1,
-                    best_of=1,
-                    temperature=0.0,
-                    vad_filter=True,
-                    without_timestamps=True  # Faster
-                )
-                
-                # Combine text
-                text = " ".join([s.text.strip() for s in segments])
-                gpu_time = time.time() - start
+                try:
+                    # Process on GPU
+                    start = time.time()
+                    if redecoder:
+                        segments, info, stats = redecoder.transcribe(audio)
+                        text = " ".join([s['text'] for s in segments])
+                        with self.stats_lock:
+                            self.first_pass_time += stats.first_pass_time
+                            self.second_pass_time += stats.second_pass_time
+                    else:
+                        segments, info = model.transcribe(
+                            audio,
+                            language="en",
+                            beam_size=1,
+                            best_of=1,
+                            temperature=0.0,
+                            vad_filter=True,
+                            without_timestamps=True  # Faster
+                        )
+                    
+                        # Combine text
+                        text = " ".join([s.text.strip() for s in segments])
+                    gpu_time = time.time() - start
+                finally:
+                    # Samples are no longer needed once decoded to text
+                    if decoded:
+                        decoded.release()
+                with self.stats_lock:
+                    self.gpu_time += gpu_time
                 
                 # Extract loans
                 loans = []
+                loan_text = normalize_spoken_numbers(text)
                 for pattern in self.loan_patterns:
-                    for match in pattern.findall(text):
+                    for match in pattern.findall(loan_text):
                         if match.isdigit() and 7 <= len(match) <= 10:
                             loans.append(match)
                 
@@ -117,19 +178,18 @@ class GPUOptimizedProcessor:
                 self.save_results(rec, text, loans, gpu_time)
                 
                 # Cleanup
-                os.remove(audio_path)
+                if not decoded:
+                    os.remove(audio_path)
                 
                 # Report
                 speed = info.duration / gpu_time if gpu_time > 0 else 0
                 status = f"Loans: {loans}" if loans else "No loans"
                 print(f"[Worker {worker_id}] {rec['orkuid']} - {speed:.1f}x - {status}")
                 
-                self.download_queue.task_done()
-                
-            except queue.Empty:
-                break
             except Exception as e:
                 print(f"Worker {worker_id} error: {e}")
+            finally:
+                self.download_queue.task_done()
     
     def save_results(self, rec, text, loans, gpu_time):
         """Save to database and filesystem"""
@@ -172,6 +232,7 @@ class GPUOptimizedProcessor:
                             loan, rec['orkuid'], rec.get('target_user'),
                             rec['timestamp'], rec['timestamp'], rec['duration']
                         ))
+                    refresh_after_ingest(cursor, rec['timestamp'], loans, rec.get('target_user'))
                 
                 conn.commit()
                 cursor.close()
@@ -185,8 +246,12 @@ class GPUOptimizedProcessor:
         total = len(recordings)
         print(f"\nProcessing {total} recordings with GPU optimization...")
         
-        # Start downloader thread
-        dl_thread = threading.Thread(target=self.downloader_thread, args=(recordings,))
+        # Start downloader (or download + decode) thread
+        decoder = DecodeStage(self.decode_workers, fetch=fetch_audio) if self.decode_workers else None
+        if decoder:
+            dl_thread = threading.Thread(target=self.decoder_thread, args=(recordings, decoder))
+        else:
+            dl_thread = threading.Thread(target=self.downloader_thread, args=(recordings,))
         dl_thread.start()
         
         # Start GPU workers
@@ -217,10 +282,23 @@ class GPUOptimizedProcessor:
         
         for t in gpu_threads:
             t.join()
+        if decoder:
+            decoder.close()
         
-        print(f"\n\nComplete! Processed {total} recordings in {(time.time()-start_time)/60:.1f} minutes")
+        wall = time.time() - start_time
+        print(f"\n\nComplete! Processed {total} recordings in {wall/60:.1f} minutes")
+        print(f"GPU workers busy: {self.gpu_time / (wall * len(gpu_threads)) * 100:.1f}% of worker time")
+        if self.two_pass:
+            total_compute = self.first_pass_time + self.second_pass_time
+            added = self.second_pass_time / total_compute * 100 if total_compute > 0 else 0
+            print(f"Re-decode compute: {self.second_pass_time:.1f}s of {total_compute:.1f}s ({added:.1f}% added)")
 
 def main():
+    parser = argparse.ArgumentParser(description="GPU-optimized batch transcription")
+    parser.add_argument('--two-pass', action='store_true',
+                        help='Beam-5 re-decode around loan mentions (targeted second pass)')
+    args = parser.parse_args()
+    
     # Load recordings
     if not os.path.exists('recordings_to_transcribe.json'):
         print("Run smart_loan_network_finder.py first!")
@@ -252,10 +330,13 @@ def main():
     print("- 2 Whisper models (use more VRAM)")
     print("- 4 GPU workers total")
     print("- Pre-download queue")
+    print("- 2 decode processes (shared-memory handoff)")
     print("- Batch processing")
+    if args.two_pass:
+        print("- Two-pass: beam-5 re-decode around loan mentions")
     
     if input("\nProcess with GPU optimization? (yes/no): ").lower() == 'yes':
-        processor = GPUOptimizedProcessor(num_models=2)
+        processor = GPUOptimizedProcessor(num_models=2, two_pass=args.two_pass)
         processor.process_batch(recordings)
 
 if __name__ == "__main__":
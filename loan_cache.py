@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Two-tier response cache for the loan APIs
+Tier 1 is an in-process LRU, tier 2 the shared loan_search_cache table, so a
+result computed by one API process (or before a restart) serves the others.
+
+Keys are "<scope>|<route>|<params hash>". The scope is "loan:<number>" for
+results about a single loan and "global" for anything aggregated across
+loans. When the pipeline writes calls it calls invalidate_loans(), which
+deletes the entries of exactly those loans plus the global ones.
+
+Usage:
+    cache = get_cache()
+    rows = cache.get_or_compute("search_loan", {}, lambda: query(n), loan=n)
+    html = await cache.aget_or_compute("timeline", {}, lambda: render(n), loan=n)
+
+    # in the ingest transaction, after writing the calls
+    invalidate_loans(cursor, loan_numbers)
+
+    # results that are cheap to version but expensive to compute
+    memo = VersionedMemo()
+    timeline = memo.get_or_compute(loan, version, lambda: build(loan))
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from loan_db import get_db_connection, run_db
+
+logger = logging.getLogger("loan_cache")
+
+CACHE_TTL = int(os.environ.get('LOAN_CACHE_TTL', 600))
+# Ingest in another process only clears the shared table, so local entries
+# live briefly to bound how stale a process can be
+LOCAL_TTL = float(os.environ.get('LOAN_CACHE_LOCAL_TTL', 30))
+LOCAL_SIZE = int(os.environ.get('LOAN_CACHE_LOCAL_SIZE', 1000))
+# Larger results stay local only (result_data is MEDIUMTEXT in new schemas,
+# TEXT in older ones)
+MAX_SHARED_BYTES = int(os.environ.get('LOAN_CACHE_MAX_SHARED_BYTES', 65535))
+
+GLOBAL_SCOPE = "global"
+
+
+def cache_key(route: str, params: Optional[Dict[str, Any]] = None,
+              loan: Optional[str] = None) -> str:
+    """Key for one route + params, scoped to a loan or global"""
+    scope = f"loan:{loan}" if loan else GLOBAL_SCOPE
+    encoded = json.dumps(params or {}, sort_keys=True, default=str)
+    digest = hashlib.sha1(encoded.encode()).hexdigest()[:16]
+    return f"{scope}|{route}|{digest}"
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _scope_prefixes(loan_numbers: Iterable) -> list:
+    loans = sorted({str(loan) for loan in loan_numbers if loan})
+    if not loans:
+        return []
+    return [f"loan:{loan}|" for loan in loans] + [f"{GLOBAL_SCOPE}|"]
+
+
+class ResponseCache:
+    """In-process LRU in front of the shared loan_search_cache table"""
+
+    def __init__(self, ttl: int = CACHE_TTL, local_ttl: float = LOCAL_TTL,
+                 local_size: int = LOCAL_SIZE):
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.local_size = local_size
+
+        self._local = OrderedDict()     # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.counters = {
+            'local_hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'invalidations': 0,
+            'errors': 0
+        }
+
+    # Tier 1
+    def _local_get(self, key: str):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return entry[1]
+
+    def _local_put(self, key: str, value, ttl: float):
+        with self._lock:
+            self._local[key] = (time.monotonic() + min(ttl, self.local_ttl), value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def invalidate_local(self, loan_numbers: Iterable) -> int:
+        """Drop local entries for these loans and all global entries"""
+        prefixes = tuple(_scope_prefixes(loan_numbers))
+        if not prefixes:
+            return 0
+        with self._lock:
+            stale = [key for key in self._local if key.startswith(prefixes)]
+            for key in stale:
+                del self._local[key]
+        self.counters['invalidations'] += len(stale)
+        return len(stale)
+
+    # Tier 2
+    def _shared_get(self, key: str):
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT result_data FROM loan_search_cache
+                WHERE cache_key = %s AND expires_at > NOW()
+            """, (key,))
+            row = cursor.fetchone()
+            cursor.close()
+        finally:
+            conn.close()
+        return json.loads(row['result_data']) if row else None
+
+    def _shared_put(self, key: str, encoded: str, ttl: int):
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                REPLACE INTO loan_search_cache (cache_key, result_data, created_at, expires_at)
+                VALUES (%s, %s, NOW(), NOW() + INTERVAL %s SECOND)
+            """, (key, encoded, int(ttl)))
+            conn.commit()
+            cursor.close()
+        finally:
+            conn.close()
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from the shared table"""
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM loan_search_cache WHERE expires_at <= NOW()")
+            deleted = cursor.rowcount
+            conn.commit()
+            cursor.close()
+        finally:
+            conn.close()
+        return deleted
+
+    # Lookups
+    def get(self, key: str):
+        """Cached value or None; a failing table is treated as a miss"""
+        value = self._local_get(key)
+        if value is not None:
+            self.counters['local_hits'] += 1
+            return value
+        try:
+            value = self._shared_get(key)
+        except Exception as e:
+            self.counters['errors'] += 1
+            logger.warning(f"Cache read failed for {key}: {e}")
+            value = None
+        if value is None:
+            self.counters['misses'] += 1
+            return None
+        self.counters['shared_hits'] += 1
+        self._local_put(key, value, self.local_ttl)
+        return value
+
+    def put(self, key: str, value, ttl: Optional[int] = None):
+        ttl = ttl or self.ttl
+        self._local_put(key, value, ttl)
+        self.counters['stores'] += 1
+        encoded = json.dumps(value, default=_json_default)
+        if len(encoded.encode()) > MAX_SHARED_BYTES:
+            return
+        try:
+            self._shared_put(key, encoded, ttl)
+            if self.counters['stores'] % 500 == 0:
+                self.purge_expired()
+        except Exception as e:
+            self.counters['errors'] += 1
+            logger.warning(f"Cache write failed for {key}: {e}")
+
+    def get_or_compute(self, route: str, params: Optional[Dict[str, Any]], compute: Callable,
+                       loan: Optional[str] = None, ttl: Optional[int] = None):
+        """Cached result for route+params, calling compute() on a miss"""
+        key = cache_key(route, params, loan)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value, ttl)
+        return value
+
+    async def aget_or_compute(self, route: str, params: Optional[Dict[str, Any]],
+                              compute: Callable, loan: Optional[str] = None,
+                              ttl: Optional[int] = None):
+        """Async variant: table access runs off the event loop, compute() is awaited"""
+        key = cache_key(route, params, loan)
+        value = self._local_get(key)
+        if value is not None:
+            self.counters['local_hits'] += 1
+            return value
+        value = await run_db(self.get, key)
+        if value is None:
+            value = await compute()
+            await run_db(self.put, key, value, ttl)
+        return value
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit rates per tier and counters"""
+        lookups = self.counters['local_hits'] + self.counters['shared_hits'] + self.counters['misses']
+        hits = self.counters['local_hits'] + self.counters['shared_hits']
+        with self._lock:
+            local_entries = len(self._local)
+        return {
+            **self.counters,
+            'lookups': lookups,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'local_hit_rate': round(self.counters['local_hits'] / lookups, 4) if lookups else 0.0,
+            'local_entries': local_entries,
+            'ttl': self.ttl,
+            'local_ttl': self.local_ttl
+        }
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache:
+    """Process-wide cache, created on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
+
+
+def invalidate_loans(cursor, loan_numbers: Iterable) -> int:
+    """Drop cached results for these loans plus every global result.
+
+    Call with the ingest cursor after writing a call's loan numbers so the
+    delete commits with them. Returns the number of shared rows removed.
+    """
+    loan_numbers = list(loan_numbers)
+    prefixes = _scope_prefixes(loan_numbers)
+    if not prefixes:
+        return 0
+    clauses = " OR ".join(["cache_key LIKE %s"] * len(prefixes))
+    cursor.execute(f"DELETE FROM loan_search_cache WHERE {clauses}",
+                   [prefix + '%' for prefix in prefixes])
+    if _cache is not None:
+        _cache.invalidate_local(loan_numbers)
+    return cursor.rowcount
+
+
+def register_cache_routes(app):
+    """Expose cache hit rates at /metrics/cache on a FastAPI app"""
+    @app.get("/metrics/cache")
+    def response_cache_metrics():
+        return get_cache().metrics()
+
+
+class VersionedMemo:
+    """In-process LRU of computed results, valid while their version matches.
+
+    Each key keeps only its latest version, so a changed loan simply
+    replaces its stale entry. No TTL: the version query decides freshness.
+    """
+
+    def __init__(self, size: int = LOCAL_SIZE):
+        self.size = size
+        self._entries = OrderedDict()   # key -> (version, value)
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0}
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters['hits'] += 1
+            return entry[1]
+
+    def put(self, key, version, value):
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, version, compute: Callable):
+        value = self.get(key, version)
+        if value is None:
+            value = compute()
+            self.put(key, version, value)
+        return value
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag for a resource version"""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header covers this ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return etag in tags or f"W/{etag}" in tags
@@ -5,7 +5,9 @@ LOAN COMMAND CENTER - All loan features in one web interface
 
 from fastapi import FastAPI
 from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
-import pymysql
+from loan_db import get_db_connection, register_pool_routes
+from loan_cache import invalidate_loans
+from scream_profile import register_profile_routes
 import json
 from datetime import datetime
 import os
@@ -13,15 +15,8 @@ import uvicorn
 import subprocess
 
 app = FastAPI(title="Loan Command Center")
-
-DB_CONFIG = {
-    'host': 's40vpsoxweb002',
-    'port': 3306,
-    'user': 'root',
-    'password': 'admin',
-    'database': 'oreka',
-    'charset': 'utf8mb4'
-}
+register_pool_routes(app)
+register_profile_routes(app)
 
 @app.get("/", response_class=HTMLResponse)
 async def home():
@@ -445,7 +440,7 @@ async def download_brief(loan_number: str):
 @app.get("/api/untranscribed/{loan_number}")
 async def api_untranscribed_loan(loan_number: str):
     """Find untranscribed calls for a loan"""
-    conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -482,7 +477,7 @@ async def api_untranscribed_loan(loan_number: str):
 @app.get("/api/untranscribed-summary")
 async def api_untranscribed_summary():
     """System-wide untranscribed summary"""
-    conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     # Total count
@@ -534,7 +529,7 @@ async def api_add_call(data: dict):
     loan_number = data.get('loan_number')
     orkuid = data.get('orkuid')
     
-    conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
@@ -567,6 +562,7 @@ async def api_add_call(data: dict):
                     VALUES (%s, %s, NOW(), NOW())
                 """, (orkuid, new_json))
             
+            invalidate_loans(cursor, [loan_number])
             conn.commit()
         
         cursor.close()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Shared database access for the loan FastAPI apps
+One bounded pymysql connection pool per process instead of a TCP connect +
+auth handshake on every request.
+
+Usage (drop-in for the old per-request connect):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    ...
+    conn.close()          # returns the connection to the pool
+
+From async route handlers, keep the event loop free by running the
+blocking query in a worker thread:
+    rows = await fetch_all("SELECT ... WHERE x = %s", (x,))
+    result = await run_db(some_sync_function, arg)
+"""
+
+import os
+import time
+import threading
+import logging
+import functools
+from collections import deque
+from typing import Dict, Any, Optional, Callable, List
+
+import pymysql
+
+logger = logging.getLogger("loan_db")
+
+# Database configuration (env overrides for other environments)
+DB_CONFIG = {
+    'host': os.environ.get('LOAN_DB_HOST', 's40vpsoxweb002'),
+    'port': int(os.environ.get('LOAN_DB_PORT', 3306)),
+    'user': os.environ.get('LOAN_DB_USER', 'root'),
+    'password': os.environ.get('LOAN_DB_PASSWORD', 'admin'),
+    'database': os.environ.get('LOAN_DB_NAME', 'oreka'),
+    'charset': 'utf8mb4'
+}
+
+# Pool settings
+POOL_SIZE = int(os.environ.get('LOAN_DB_POOL_SIZE', 10))
+POOL_TIMEOUT = float(os.environ.get('LOAN_DB_POOL_TIMEOUT', 10))
+RECYCLE_SECONDS = float(os.environ.get('LOAN_DB_RECYCLE_SECONDS', 3600))
+HEALTH_CHECK_SECONDS = float(os.environ.get('LOAN_DB_HEALTH_CHECK_SECONDS', 30))
+
+# Max blocking DB calls in flight from async handlers; more than the pool
+# size would only park threads inside connection()
+DB_CONCURRENCY = int(os.environ.get('LOAN_DB_CONCURRENCY', POOL_SIZE))
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the checkout timeout"""
+    pass
+
+
+class PooledConnection:
+    """Wraps a pymysql connection; close() hands it back to the pool"""
+
+    def __init__(self, pool: 'ConnectionPool', raw, cursorclass):
+        self._pool = pool
+        self._raw = raw
+        self._cursorclass = cursorclass
+        self._checked_out = time.monotonic()
+        self._released = False
+
+    def cursor(self, cursor=None):
+        return self._raw.cursor(cursor or self._cursorclass)
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool._release(self._raw, time.monotonic() - self._checked_out)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            try:
+                self._raw.rollback()
+            except Exception:
+                pass
+        self.close()
+
+    def __del__(self):
+        # Handlers that raise before conn.close() must not leak pool slots
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class ConnectionPool:
+    """Bounded pool with health checks, recycle age and checkout metrics"""
+
+    def __init__(self, config: Dict[str, Any], max_size: int = POOL_SIZE,
+                 timeout: float = POOL_TIMEOUT, recycle_seconds: float = RECYCLE_SECONDS,
+                 health_check_seconds: float = HEALTH_CHECK_SECONDS):
+        self.config = dict(config)
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle_seconds = recycle_seconds
+        self.health_check_seconds = health_check_seconds
+
+        self._idle = deque()        # (raw, created_at, last_used)
+        self._created = {}          # id(raw) -> created_at
+        self._size = 0
+        self._lock = threading.Condition()
+
+        # Metrics (recent samples for percentiles)
+        self._wait_ms = deque(maxlen=2000)
+        self._hold_ms = deque(maxlen=2000)
+        self.counters = {
+            'checkouts': 0,
+            'connects': 0,
+            'recycled': 0,
+            'health_check_failures': 0,
+            'timeouts': 0
+        }
+
+    def _connect(self):
+        raw = pymysql.connect(**self.config)
+        self.counters['connects'] += 1
+        return raw
+
+    def _discard(self, raw):
+        self._created.pop(id(raw), None)
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def connection(self, dict_cursor: bool = True) -> PooledConnection:
+        """Check out a connection, waiting up to the pool timeout"""
+        cursorclass = pymysql.cursors.DictCursor if dict_cursor else pymysql.cursors.Cursor
+        started = time.monotonic()
+        deadline = started + self.timeout
+
+        while True:
+            raw = None
+            with self._lock:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.counters['timeouts'] += 1
+                        raise PoolTimeout(f"No database connection free after {self.timeout}s "
+                                          f"(pool size {self.max_size})")
+                    self._lock.wait(remaining)
+                if self._idle:
+                    raw, created_at, last_used = self._idle.pop()
+                else:
+                    # Reserve the slot, connect outside the lock
+                    self._size += 1
+                    created_at = last_used = None
+
+            if raw is None:
+                try:
+                    raw = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+                self._created[id(raw)] = time.monotonic()
+                break
+
+            now = time.monotonic()
+            if now - created_at > self.recycle_seconds:
+                self.counters['recycled'] += 1
+                self._replace(raw)
+                continue
+            if now - last_used > self.health_check_seconds:
+                try:
+                    raw.ping(reconnect=False)
+                except Exception:
+                    self.counters['health_check_failures'] += 1
+                    self._replace(raw)
+                    continue
+            break
+
+        self.counters['checkouts'] += 1
+        self._wait_ms.append((time.monotonic() - started) * 1000)
+        return PooledConnection(self, raw, cursorclass)
+
+    def _replace(self, raw):
+        """Drop a stale connection and free its slot"""
+        self._discard(raw)
+        with self._lock:
+            self._size -= 1
+            self._lock.notify()
+
+    def _release(self, raw, held_seconds: float):
+        self._hold_ms.append(held_seconds * 1000)
+        try:
+            # Never hand the next request an open transaction
+            raw.rollback()
+        except Exception:
+            self._replace(raw)
+            return
+        with self._lock:
+            created_at = self._created.get(id(raw), time.monotonic())
+            self._idle.append((raw, created_at, time.monotonic()))
+            self._lock.notify()
+
+    def close(self):
+        """Close idle connections (shutdown)"""
+        with self._lock:
+            while self._idle:
+                raw, _, _ = self._idle.pop()
+                self._discard(raw)
+                self._size -= 1
+
+    @staticmethod
+    def _percentile(samples, pct: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))], 3)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Pool state and checkout latency percentiles"""
+        with self._lock:
+            idle = len(self._idle)
+            size = self._size
+        return {
+            'max_size': self.max_size,
+            'size': size,
+            'idle': idle,
+            'in_use': size - idle,
+            **self.counters,
+            'wait_ms_p50': self._percentile(self._wait_ms, 50),
+            'wait_ms_p99': self._percentile(self._wait_ms, 99),
+            'hold_ms_p50': self._percentile(self._hold_ms, 50),
+            'hold_ms_p99': self._percentile(self._hold_ms, 99)
+        }
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Process-wide pool, created on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_CONFIG)
+    return _pool
+
+
+def get_db_connection(dict_cursor: bool = True) -> PooledConnection:
+    """Pooled replacement for pymysql.connect(**DB_CONFIG, cursorclass=DictCursor)"""
+    return get_pool().connection(dict_cursor=dict_cursor)
+
+
+_limiter = None
+
+
+def _get_limiter():
+    # Created lazily: anyio needs a running event loop, and only the
+    # FastAPI apps (not the pipeline scripts) have it installed
+    global _limiter
+    if _limiter is None:
+        import anyio
+        _limiter = anyio.CapacityLimiter(DB_CONCURRENCY)
+    return _limiter
+
+
+async def run_db(func: Callable, *args, **kwargs):
+    """Run blocking DB work in a worker thread, at most DB_CONCURRENCY at once.
+
+    Requests beyond the limit wait on the event loop, not in a thread, so a
+    slow query on one route never stalls the loop for the others.
+    """
+    import anyio.to_thread
+    return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs),
+                                          limiter=_get_limiter())
+
+
+def _execute(query: str, params, fetch: str, dict_cursor: bool):
+    conn = get_db_connection(dict_cursor=dict_cursor)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        if fetch == 'all':
+            result = cursor.fetchall()
+        elif fetch == 'one':
+            result = cursor.fetchone()
+        else:
+            conn.commit()
+            result = cursor.rowcount
+        cursor.close()
+        return result
+    finally:
+        conn.close()
+
+
+async def fetch_all(query: str, params=None, dict_cursor: bool = True) -> List:
+    """Run a query off the event loop and return all rows"""
+    return await run_db(_execute, query, params, 'all', dict_cursor)
+
+
+async def fetch_one(query: str, params=None, dict_cursor: bool = True):
+    """Run a query off the event loop and return the first row (or None)"""
+    return await run_db(_execute, query, params, 'one', dict_cursor)
+
+
+async def execute(query: str, params=None) -> int:
+    """Run a write off the event loop, commit, and return the row count"""
+    return await run_db(_execute, query, params, 'write', True)
+
+
+def register_pool_routes(app):
+    """Expose pool metrics at /metrics/db on a FastAPI app"""
+    @app.get("/metrics/db")
+    def db_pool_metrics():
+        metrics = get_pool().metrics()
+        metrics['async_limit'] = DB_CONCURRENCY
+        if _limiter is not None:
+            metrics['async_in_flight'] = _limiter.borrowed_tokens
+            metrics['async_waiting'] = _limiter.statistics().tasks_waiting
+        return metrics
+
+    @app.on_event("shutdown")
+    def close_db_pool():
+        if _pool is not None:
+            _pool.close()
@@ -5,9 +5,13 @@ API endpoint for processing loan feedback
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import pymysql
+from loan_db import get_db_connection, register_pool_routes
+from scream_profile import register_profile_routes
 from datetime import datetime
 
 app = FastAPI()
+register_pool_routes(app)
+register_profile_routes(app)
 
 class LoanFeedback(BaseModel):
     orkuid: str
@@ -15,20 +19,11 @@ class LoanFeedback(BaseModel):
     loan_number: str = None
     user_id: str = "default_user"
 
-DB_CONFIG = {
-    'host': 's40vpsoxweb002',
-    'port': 3306,
-    'user': 'root',
-    'password': 'admin',
-    'database': 'oreka',
-    'charset': 'utf8mb4'
-}
-
 @app.post("/api/loan-feedback")
 async def submit_feedback(feedback: LoanFeedback):
     """Process user feedback on loan relevance"""
     
-    conn = pymysql.connect(**DB_CONFIG)
+    conn = get_db_connection(dict_cursor=False)
     cursor = conn.cursor()
     
     try:
@@ -96,7 +91,7 @@ async def submit_feedback(feedback: LoanFeedback):
 async def get_loan_officer_accuracy(phone_number: str):
     """Get accuracy stats for a loan officer"""
     
-    conn = pymysql.connect(**DB_CONFIG)
+    conn = get_db_connection(dict_cursor=False)
     cursor = conn.cursor(pymysql.cursors.DictCursor)
     
     cursor.execute("""
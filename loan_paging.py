@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Keyset pagination and NDJSON streaming for the loan APIs
+Pages are addressed by an opaque cursor holding the sort key of the last row
+returned (e.g. (timestamp, orkuid)), so page N costs the same as page 1 and
+rows inserted meanwhile never shift the pages. For full exports, rows are
+streamed as NDJSON, CSV or Parquet from a server-side cursor instead of
+built into one list.
+
+Usage:
+    condition, params = keyset_condition(("t.timestamp", "t.orkUid"), cursor)
+    rows = fetch(... WHERE ... {condition} ORDER BY t.timestamp, t.orkUid LIMIT page_size + 1)
+    page, next_cursor = paginate(rows, page_size, ("timestamp", "orkUid"))
+
+    return ndjson_response(stream_rows(query, params), transform)
+    return csv_response(stream_rows(query, params), columns, "export.csv")
+"""
+
+import io
+import os
+import csv
+import json
+import base64
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pymysql
+from fastapi.responses import StreamingResponse
+
+from loan_db import get_db_connection
+
+PAGE_SIZE = int(os.environ.get('LOAN_PAGE_SIZE', 500))
+MAX_PAGE_SIZE = int(os.environ.get('LOAN_MAX_PAGE_SIZE', 5000))
+STREAM_BATCH = int(os.environ.get('LOAN_STREAM_BATCH', 1000))
+
+
+class CursorError(ValueError):
+    """Malformed or tampered pagination cursor"""
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+        raise CursorError("Unknown cursor value")
+    return value
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Opaque URL-safe token for a row's sort key"""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str, width: int) -> list:
+    """Sort key from a token; raises CursorError on anything malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except Exception:
+        raise CursorError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != width:
+        raise CursorError("Invalid cursor")
+    return [_decode_value(v) for v in values]
+
+
+def keyset_condition(columns: Sequence[str], token: Optional[str],
+                     descending: bool = False) -> Tuple[str, list]:
+    """SQL fragment ("AND ...") selecting rows after the cursor.
+
+    Written as expanded OR terms rather than a row comparison, which older
+    MariaDB versions cannot serve from an index.
+    """
+    if not token:
+        return "", []
+    values = decode_cursor(token, len(columns))
+    op = '<' if descending else '>'
+    terms = []
+    params = []
+    for i, column in enumerate(columns):
+        equal = [f"{columns[j]} = %s" for j in range(i)]
+        terms.append("(" + " AND ".join(equal + [f"{column} {op} %s"]) + ")")
+        params.extend(values[:i] + [values[i]])
+    return " AND (" + " OR ".join(terms) + ")", params
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return PAGE_SIZE
+    return min(int(limit), MAX_PAGE_SIZE)
+
+
+def paginate(rows: list, page_size: int, keys: Sequence[str]) -> Tuple[list, Optional[str]]:
+    """Split a LIMIT page_size + 1 result into (page, next_cursor)"""
+    if len(rows) <= page_size:
+        return rows, None
+    page = rows[:page_size]
+    return page, encode_cursor([page[-1][key] for key in keys])
+
+
+def stream_rows(query: str, params=None, batch_size: int = STREAM_BATCH) -> Iterator[dict]:
+    """Yield rows from a server-side cursor, batch_size at a time"""
+    conn = get_db_connection()
+    cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+    try:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        # Closing drains any unread rows so the connection is reusable
+        cursor.close()
+        conn.close()
+
+
+def _ndjson_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def ndjson_response(rows: Iterable[dict], transform: Optional[Callable] = None) -> StreamingResponse:
+    """Stream rows as newline-delimited JSON (one object per line)"""
+    def lines():
+        for row in rows:
+            item = transform(row) if transform else row
+            if item is not None:
+                yield json.dumps(item, default=_ndjson_default) + "\n"
+
+    # A sync generator: Starlette iterates it in a worker thread
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def _batched(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _attachment(filename: Optional[str]) -> dict:
+    return {'Content-Disposition': f'attachment; filename="{filename}"'} if filename else {}
+
+
+def csv_response(rows: Iterable[dict], columns: Sequence[str], filename: Optional[str] = None,
+                 batch_size: int = STREAM_BATCH) -> StreamingResponse:
+    """Stream rows as CSV with a header line, one chunk per batch of rows"""
+    def chunks():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for batch in _batched(rows, batch_size):
+            for row in batch:
+                writer.writerow([_csv_value(row.get(column)) for column in columns])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    return StreamingResponse(chunks(), media_type="text/csv; charset=utf-8",
+                             headers=_attachment(filename))
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after each row group"""
+
+    def __init__(self):
+        super().__init__()
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def parquet_response(rows: Iterable[dict], schema, filename: Optional[str] = None,
+                     batch_size: int = STREAM_BATCH) -> StreamingResponse:
+    """Stream rows as a Parquet file, one row group per batch (needs pyarrow).
+
+    schema is a pyarrow.Schema; column values are taken from the row keys
+    of the same names.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    def chunks():
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression='snappy')
+        try:
+            for batch in _batched(rows, batch_size):
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                yield sink.drain()
+        finally:
+            writer.close()
+        # The footer is written on close
+        yield sink.drain()
+
+    return StreamingResponse(chunks(), media_type="application/vnd.apache.parquet",
+                             headers=_attachment(filename))
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained analytics rollups over loan_number_index
+The analytics endpoints read these small tables instead of running
+GROUP BY / COUNT(DISTINCT) over the whole call history on every request.
+
+    loan_daily_rollup   (loan_number, day)  calls, duration, first/last call
+    user_daily_rollup   (user_name, day)    calls, loan mentions, duration
+    call_daily_rollup   (day)               distinct calls, loan mentions
+    loan_rollup         (loan_number)       lifetime totals per loan
+    user_rollup         (user_name)         lifetime totals per user
+
+Every refresh recomputes the affected rows from loan_number_index, so it is
+idempotent: the ingest path refreshes the (loan, day) and (user, day) rows
+it just touched, and the catch-up job refreshes whole days that gained rows
+since its last run (or everything with --rebuild).
+
+Usage:
+    refresh_after_ingest(cursor, call_timestamp, loan_numbers, user_name)   # ingest
+    python loan_rollups.py --create
+    python loan_rollups.py                  # catch up since last run
+    python loan_rollups.py --days 7         # refresh the last 7 days
+    python loan_rollups.py --rebuild
+"""
+
+import sys
+import time
+import logging
+import argparse
+from datetime import date, timedelta
+from typing import Iterable, List, Optional
+
+import pymysql
+
+from loan_cache import invalidate_loans
+from loan_db import get_db_connection
+
+logger = logging.getLogger("loan_rollups")
+
+ROLLUP_TABLES = [
+    ("loan_daily_rollup", """
+CREATE TABLE IF NOT EXISTS loan_daily_rollup (
+    loan_number VARCHAR(20) NOT NULL,
+    day DATE NOT NULL,
+    calls INT NOT NULL DEFAULT 0,
+    total_duration INT NOT NULL DEFAULT 0,
+    first_call TIMESTAMP NULL,
+    last_call TIMESTAMP NULL,
+
+    PRIMARY KEY (loan_number, day),
+    INDEX idx_day (day)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='Calls per loan per day';
+"""),
+    ("user_daily_rollup", """
+CREATE TABLE IF NOT EXISTS user_daily_rollup (
+    user_name VARCHAR(100) NOT NULL,
+    day DATE NOT NULL,
+    calls INT NOT NULL DEFAULT 0,
+    loan_mentions INT NOT NULL DEFAULT 0,
+    total_duration INT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (user_name, day),
+    INDEX idx_day (day)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='Loan calls per user per day';
+"""),
+    ("call_daily_rollup", """
+CREATE TABLE IF NOT EXISTS call_daily_rollup (
+    day DATE NOT NULL PRIMARY KEY,
+    calls INT NOT NULL DEFAULT 0,
+    loan_mentions INT NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='Distinct loan calls per day';
+"""),
+    ("loan_rollup", """
+CREATE TABLE IF NOT EXISTS loan_rollup (
+    loan_number VARCHAR(20) NOT NULL PRIMARY KEY,
+    calls INT NOT NULL DEFAULT 0,
+    total_duration INT NOT NULL DEFAULT 0,
+    active_days INT NOT NULL DEFAULT 0,
+    first_call TIMESTAMP NULL,
+    last_call TIMESTAMP NULL,
+
+    INDEX idx_calls (calls)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='Lifetime totals per loan';
+"""),
+    ("user_rollup", """
+CREATE TABLE IF NOT EXISTS user_rollup (
+    user_name VARCHAR(100) NOT NULL PRIMARY KEY,
+    calls INT NOT NULL DEFAULT 0,
+    total_duration INT NOT NULL DEFAULT 0,
+    first_day DATE NULL,
+    last_day DATE NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='Lifetime totals per user';
+"""),
+    ("rollup_state", """
+CREATE TABLE IF NOT EXISTS rollup_state (
+    name VARCHAR(50) NOT NULL PRIMARY KEY,
+    watermark TIMESTAMP NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='Catch-up job progress';
+""")
+]
+
+# Catch-up finds new index rows by created_at
+CREATED_AT_INDEX = "ALTER TABLE loan_number_index ADD INDEX idx_created_at (created_at)"
+
+
+def _in_clause(column: str, values: Optional[list]):
+    if values is None:
+        return "", []
+    return f" AND {column} IN ({', '.join(['%s'] * len(values))})", list(values)
+
+
+def refresh_loan_days(cursor, day, loans: Optional[List[str]] = None):
+    """Recompute loan_daily_rollup for one day (optionally only some loans)"""
+    clause, params = _in_clause("loan_number", loans)
+    cursor.execute(f"DELETE FROM loan_daily_rollup WHERE day = DATE(%s){clause}", [day] + params)
+    cursor.execute(f"""
+        INSERT INTO loan_daily_rollup (loan_number, day, calls, total_duration, first_call, last_call)
+        SELECT loan_number, call_date, COUNT(*), COALESCE(SUM(duration), 0),
+               MIN(call_timestamp), MAX(call_timestamp)
+        FROM loan_number_index
+        WHERE call_date = DATE(%s){clause}
+        GROUP BY loan_number, call_date
+    """, [day] + params)
+
+
+def refresh_user_days(cursor, day, users: Optional[List[str]] = None):
+    """Recompute user_daily_rollup for one day (optionally only some users)"""
+    clause, params = _in_clause("user_name", users)
+    cursor.execute(f"DELETE FROM user_daily_rollup WHERE day = DATE(%s){clause}", [day] + params)
+    cursor.execute(f"""
+        INSERT INTO user_daily_rollup (user_name, day, calls, loan_mentions, total_duration)
+        SELECT user_name, call_date, COUNT(*), SUM(mentions), COALESCE(SUM(duration), 0)
+        FROM (
+            SELECT user_name, call_date, orkuid, COUNT(*) as mentions, MAX(duration) as duration
+            FROM loan_number_index
+            WHERE call_date = DATE(%s) AND user_name IS NOT NULL{clause}
+            GROUP BY user_name, call_date, orkuid
+        ) as calls
+        GROUP BY user_name, call_date
+    """, [day] + params)
+
+
+def refresh_call_day(cursor, day):
+    """Recompute call_daily_rollup for one day"""
+    cursor.execute("""
+        REPLACE INTO call_daily_rollup (day, calls, loan_mentions)
+        SELECT DATE(%s), COUNT(DISTINCT orkuid), COUNT(*)
+        FROM loan_number_index
+        WHERE call_date = DATE(%s)
+    """, (day, day))
+
+
+def refresh_loan_totals(cursor, loans: Optional[List[str]] = None):
+    """Fold loan_daily_rollup into loan_rollup (all loans when loans is None)"""
+    clause, params = _in_clause("loan_number", loans)
+    if loans is None:
+        cursor.execute("DELETE FROM loan_rollup")
+    else:
+        cursor.execute(f"DELETE FROM loan_rollup WHERE 1=1{clause}", params)
+    cursor.execute(f"""
+        INSERT INTO loan_rollup (loan_number, calls, total_duration, active_days, first_call, last_call)
+        SELECT loan_number, SUM(calls), SUM(total_duration), COUNT(*), MIN(first_call), MAX(last_call)
+        FROM loan_daily_rollup
+        WHERE 1=1{clause}
+        GROUP BY loan_number
+    """, params)
+
+
+def refresh_user_totals(cursor, users: Optional[List[str]] = None):
+    """Fold user_daily_rollup into user_rollup (all users when users is None)"""
+    clause, params = _in_clause("user_name", users)
+    if users is None:
+        cursor.execute("DELETE FROM user_rollup")
+    else:
+        cursor.execute(f"DELETE FROM user_rollup WHERE 1=1{clause}", params)
+    cursor.execute(f"""
+        INSERT INTO user_rollup (user_name, calls, total_duration, first_day, last_day)
+        SELECT user_name, SUM(calls), SUM(total_duration), MIN(day), MAX(day)
+        FROM user_daily_rollup
+        WHERE 1=1{clause}
+        GROUP BY user_name
+    """, params)
+
+
+def update_rollups(cursor, call_timestamp, loan_numbers: Iterable, user_name: Optional[str] = None):
+    """Ingest hook: refresh the rollup rows one call touched.
+
+    Call with the ingest cursor after the loan_number_index inserts so the
+    rollups commit together with them.
+    """
+    loans = sorted({str(loan) for loan in loan_numbers if loan})
+    if not loans or not call_timestamp:
+        return
+    refresh_loan_days(cursor, call_timestamp, loans)
+    refresh_call_day(cursor, call_timestamp)
+    refresh_loan_totals(cursor, loans)
+    if user_name:
+        refresh_user_days(cursor, call_timestamp, [user_name])
+        refresh_user_totals(cursor, [user_name])
+
+
+def refresh_after_ingest(cursor, call_timestamp, loan_numbers: Iterable,
+                         user_name: Optional[str] = None) -> bool:
+    """Ingest hook: invalidate_loans + update_rollups behind a savepoint.
+
+    A failure here (say the cache or rollup tables were never created) is
+    logged and rolled back to the savepoint, so the loan_number_index rows
+    written before it still commit; the catch-up job fills the rollups in
+    later. Returns False when the refresh was skipped.
+    """
+    loan_numbers = list(loan_numbers)
+    cursor.execute("SAVEPOINT ingest_refresh")
+    try:
+        invalidate_loans(cursor, loan_numbers)
+        update_rollups(cursor, call_timestamp, loan_numbers, user_name)
+    except pymysql.MySQLError as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT ingest_refresh")
+        logger.warning(f"Cache/rollup refresh skipped for {len(loan_numbers)} loan(s): {e}")
+        return False
+    cursor.execute("RELEASE SAVEPOINT ingest_refresh")
+    return True
+
+
+def refresh_days(cursor, days: Iterable) -> int:
+    """Recompute every daily rollup row for these days, then the totals they feed"""
+    days = sorted(set(days))
+    for day in days:
+        refresh_loan_days(cursor, day)
+        refresh_user_days(cursor, day)
+        refresh_call_day(cursor, day)
+
+    # Lifetime totals only for the loans and users seen on those days
+    for start in range(0, len(days), 100):
+        batch = days[start:start + 100]
+        clause, params = _in_clause("call_date", batch)
+        cursor.execute(f"SELECT DISTINCT loan_number FROM loan_number_index WHERE 1=1{clause}", params)
+        loans = [row['loan_number'] for row in cursor.fetchall()]
+        cursor.execute(f"""
+            SELECT DISTINCT user_name FROM loan_number_index
+            WHERE user_name IS NOT NULL{clause}
+        """, params)
+        users = [row['user_name'] for row in cursor.fetchall()]
+        if loans:
+            refresh_loan_totals(cursor, loans)
+        if users:
+            refresh_user_totals(cursor, users)
+    return len(days)
+
+
+def create_tables(cursor):
+    for table_name, create_sql in ROLLUP_TABLES:
+        cursor.execute(create_sql)
+    try:
+        cursor.execute(CREATED_AT_INDEX)
+    except pymysql.err.OperationalError:
+        pass    # index already exists
+
+
+def catch_up(conn, since_days: Optional[int] = None, rebuild: bool = False) -> int:
+    """Refresh days that gained index rows since the last run; returns days refreshed"""
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    cursor.execute("SELECT NOW() as now")
+    started = cursor.fetchone()['now']
+
+    if rebuild:
+        cursor.execute("SELECT DISTINCT call_date FROM loan_number_index WHERE call_date IS NOT NULL")
+    elif since_days is not None:
+        cursor.execute("""
+            SELECT DISTINCT call_date FROM loan_number_index
+            WHERE call_date >= %s
+        """, (date.today() - timedelta(days=since_days),))
+    else:
+        cursor.execute("SELECT watermark FROM rollup_state WHERE name = 'catch_up'")
+        row = cursor.fetchone()
+        if row and row['watermark']:
+            # Margin for ingest transactions that committed after we read NOW()
+            cursor.execute("""
+                SELECT DISTINCT call_date FROM loan_number_index
+                WHERE created_at >= %s - INTERVAL 5 MINUTE AND call_date IS NOT NULL
+            """, (row['watermark'],))
+        else:
+            cursor.execute("SELECT DISTINCT call_date FROM loan_number_index WHERE call_date IS NOT NULL")
+    days = [row['call_date'] for row in cursor.fetchall()]
+
+    if rebuild:
+        cursor.execute("DELETE FROM loan_daily_rollup")
+        cursor.execute("DELETE FROM user_daily_rollup")
+        cursor.execute("DELETE FROM call_daily_rollup")
+        refreshed = len(days)
+        for day in days:
+            refresh_loan_days(cursor, day)
+            refresh_user_days(cursor, day)
+            refresh_call_day(cursor, day)
+        refresh_loan_totals(cursor)
+        refresh_user_totals(cursor)
+    else:
+        refreshed = refresh_days(cursor, days)
+    cursor.execute("""
+        REPLACE INTO rollup_state (name, watermark) VALUES ('catch_up', %s)
+    """, (started,))
+    conn.commit()
+    cursor.close()
+    return refreshed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the analytics rollup tables")
+    parser.add_argument('--create', action='store_true', help='Create the rollup tables')
+    parser.add_argument('--days', type=int, help='Refresh the last N days instead of catching up')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild every rollup from scratch')
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        if args.create:
+            cursor = conn.cursor()
+            create_tables(cursor)
+            conn.commit()
+            cursor.close()
+            print("✓ Rollup tables created")
+
+        start = time.time()
+        refreshed = catch_up(conn, since_days=args.days, rebuild=args.rebuild)
+        print(f"✓ Refreshed {refreshed} day(s) of rollups in {time.time() - start:.1f}s")
+    except Exception as e:
+        print(f"❌ Rollup refresh failed: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
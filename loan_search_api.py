@@ -4,16 +4,24 @@ FastAPI server for loan number search
 Designed for React/Vite/TypeScript frontend
 """
 
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional, Dict
-import pymysql
+from loan_db import get_db_connection, register_pool_routes
+from loan_cache import get_cache, register_cache_routes
+from scream_profile import register_profile_routes
+from transcript_index import get_index
+from loan_paging import (CursorError, MAX_PAGE_SIZE, keyset_condition, paginate,
+                         stream_rows, ndjson_response)
 import json
 from datetime import datetime, date
 import uvicorn
 
 app = FastAPI(title="Loan Search API", version="1.0.0")
+register_pool_routes(app)
+register_cache_routes(app)
+register_profile_routes(app)
 
 # Enable CORS for React frontend on s01vpsromuls001
 app.add_middleware(
@@ -24,16 +32,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Database configuration
-DB_CONFIG = {
-    'host': 's40vpsoxweb002',
-    'port': 3306,
-    'user': 'root',
-    'password': 'admin',
-    'database': 'oreka',
-    'charset': 'utf8mb4'
-}
-
 # Pydantic models for TypeScript generation
 class LoanSearchResult(BaseModel):
     loan_number: str
@@ -55,6 +53,22 @@ class UserLoanSummary(BaseModel):
     first_call_date: Optional[date]
     last_call_date: Optional[date]
 
+class LoanBatchRequest(BaseModel):
+    loan_numbers: List[str]
+    include_calls: bool = True
+
+class LoanBatchResult(BaseModel):
+    loan_number: str
+    call_count: int
+    first_call: datetime
+    last_call: datetime
+    total_duration: int
+    calls: List[LoanSearchResult] = []
+
+class LoanBatchResponse(BaseModel):
+    results: Dict[str, LoanBatchResult]
+    not_found: List[str]
+
 class LoanAnalytics(BaseModel):
     total_loans: int
     total_calls: int
@@ -62,10 +76,6 @@ class LoanAnalytics(BaseModel):
     average_calls_per_loan: float
     date_range: Dict[str, str]
 
-def get_db_connection():
-    """Get database connection"""
-    return pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
-
 @app.get("/")
 def root():
     """API root"""
@@ -74,6 +84,8 @@ def root():
         "endpoints": [
             "/docs",
             "/search/loan/{loan_number}",
+            "/search/loans",
+            "/search/text",
             "/search/user/{user_name}",
             "/users/summary",
             "/analytics"
@@ -83,7 +95,7 @@ def root():
 @app.get("/search/loan/{loan_number}", response_model=List[LoanSearchResult])
 def search_by_loan_number(loan_number: str):
     """Search for all calls containing a specific loan number"""
-    try:
+    def compute():
         conn = get_db_connection()
         cursor = conn.cursor()
         
@@ -110,10 +122,107 @@ def search_by_loan_number(loan_number: str):
         conn.close()
         
         return results
+    
+    try:
+        return get_cache().get_or_compute("search_loan", {}, compute, loan=loan_number)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+MAX_BATCH_LOANS = 1000
+
+@app.post("/search/loans", response_model=LoanBatchResponse)
+def search_by_loan_numbers(request: LoanBatchRequest):
+    """Look up many loan numbers with one set-based query"""
+    loans = list(dict.fromkeys(loan.strip() for loan in request.loan_numbers if loan and loan.strip()))
+    if not loans:
+        raise HTTPException(status_code=400, detail="loan_numbers is empty")
+    if len(loans) > MAX_BATCH_LOANS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_LOANS} loan numbers per request")
+    
+    placeholders = ', '.join(['%s'] * len(loans))
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        if request.include_calls:
+            cursor.execute(f"""
+                SELECT 
+                    l.loan_number,
+                    l.orkuid,
+                    l.user_name,
+                    l.call_date,
+                    l.call_timestamp,
+                    l.duration,
+                    ct.summary,
+                    ct.transcript_path
+                FROM loan_number_index l
+                LEFT JOIN call_transcripts_v2 ct ON l.orkuid = ct.orkuid
+                WHERE l.loan_number IN ({placeholders})
+                ORDER BY l.loan_number, l.call_timestamp DESC
+            """, loans)
+            
+            results = {}
+            for row in cursor.fetchall():
+                group = results.get(row['loan_number'])
+                if group is None:
+                    group = results[row['loan_number']] = {
+                        'loan_number': row['loan_number'],
+                        'call_count': 0,
+                        'first_call': row['call_timestamp'],
+                        'last_call': row['call_timestamp'],
+                        'total_duration': 0,
+                        'calls': []
+                    }
+                group['calls'].append(row)
+                group['call_count'] += 1
+                group['total_duration'] += row['duration'] or 0
+                group['first_call'] = row['call_timestamp']     # rows are newest first
+        else:
+            cursor.execute(f"""
+                SELECT 
+                    loan_number,
+                    COUNT(*) as call_count,
+                    MIN(call_timestamp) as first_call,
+                    MAX(call_timestamp) as last_call,
+                    COALESCE(SUM(duration), 0) as total_duration
+                FROM loan_number_index
+                WHERE loan_number IN ({placeholders})
+                GROUP BY loan_number
+            """, loans)
+            results = {row['loan_number']: row for row in cursor.fetchall()}
+        
+        cursor.close()
+        conn.close()
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        'results': results,
+        'not_found': [loan for loan in loans if loan not in results]
+    }
+
+@app.get("/search/text")
+def search_transcript_text(
+    q: str = Query(..., min_length=2, description='Words, or FTS5 syntax such as "appraisal waiver" or apprais*'),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    orkuid: Optional[str] = Query(None),
+    user_name: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    facets: bool = Query(False, description="Add hits per day (scans every match)")
+):
+    """Ranked full-text search over transcript segments, with highlighted snippets"""
+    try:
+        return get_index().search(q, start=start_date, end=end_date, orkuid=orkuid,
+                                  user_name=user_name, limit=limit, offset=offset, facets=facets)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/search/user/{user_name}", response_model=UserLoanSummary)
 def search_by_user(user_name: str):
     """Get loan summary for a specific user"""
@@ -160,58 +269,88 @@ def search_by_user(user_name: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def parse_user_loans(result):
+    """Decode the all_loan_numbers JSON column in place"""
+    if result['all_loan_numbers']:
+        try:
+            result['all_loan_numbers'] = json.loads(result['all_loan_numbers'])
+        except:
+            result['all_loan_numbers'] = []
+    else:
+        result['all_loan_numbers'] = []
+    return result
+
 @app.get("/users/summary", response_model=List[UserLoanSummary])
 def get_all_users_summary(
+    response: Response,
     firstname: Optional[str] = Query(None, description="Filter by first name"),
     lastname: Optional[str] = Query(None, description="Filter by last name"),
-    limit: int = Query(100, description="Limit results")
+    limit: int = Query(100, description="Limit results"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    format: Optional[str] = Query(None, description="ndjson to stream every matching user")
 ):
-    """Get loan summary for all users or filtered users"""
+    """Get loan summary for all users or filtered users
+    
+    Paged by keyset on (total_calls, id); the cursor for the next page is
+    returned in the X-Next-Cursor header.
+    """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        query = """
-        SELECT 
-            u.*,
-            COUNT(DISTINCT l.orkuid) as call_count
-        FROM user_loan_mapping u
-        LEFT JOIN loan_number_index l ON u.user_name = l.user_name
-        WHERE 1=1
-        """
-        params = []
-        
-        if firstname:
-            query += " AND u.user_firstname LIKE %s"
-            params.append(f'%{firstname}%')
-            
-        if lastname:
-            query += " AND u.user_lastname LIKE %s"
-            params.append(f'%{lastname}%')
-            
-        query += " GROUP BY u.id ORDER BY u.total_calls DESC LIMIT %s"
-        params.append(limit)
+        keyset, keyset_params = keyset_condition(("u.total_calls", "u.id"), cursor, descending=True)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    query = """
+    SELECT 
+        u.*,
+        COUNT(DISTINCT l.orkuid) as call_count
+    FROM user_loan_mapping u
+    LEFT JOIN loan_number_index l ON u.user_name = l.user_name
+    WHERE 1=1
+    """
+    params = []
+    
+    if firstname:
+        query += " AND u.user_firstname LIKE %s"
+        params.append(f'%{firstname}%')
         
-        cursor.execute(query, params)
-        results = cursor.fetchall()
+    if lastname:
+        query += " AND u.user_lastname LIKE %s"
+        params.append(f'%{lastname}%')
+    
+    query += keyset + " GROUP BY u.id ORDER BY u.total_calls DESC, u.id DESC"
+    params += keyset_params
+    
+    if format == 'ndjson':
+        return ndjson_response(stream_rows(query, params), parse_user_loans)
+    
+    page_size = min(limit, MAX_PAGE_SIZE)
+    
+    def compute():
+        conn = get_db_connection()
+        db_cursor = conn.cursor()
         
-        # Parse JSON fields
-        for result in results:
-            if result['all_loan_numbers']:
-                try:
-                    result['all_loan_numbers'] = json.loads(result['all_loan_numbers'])
-                except:
-                    result['all_loan_numbers'] = []
-            else:
-                result['all_loan_numbers'] = []
+        db_cursor.execute(query + " LIMIT %s", params + [page_size + 1])
+        results = [parse_user_loans(result) for result in db_cursor.fetchall()]
         
-        cursor.close()
+        db_cursor.close()
         conn.close()
         
         return results
+    
+    try:
+        results = get_cache().get_or_compute(
+            "users_summary",
+            {"firstname": firstname, "lastname": lastname, "limit": page_size, "cursor": cursor},
+            compute
+        )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    page, next_cursor = paginate(results, page_size, ('total_calls', 'id'))
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return page
 
 @app.get("/analytics", response_model=LoanAnalytics)
 def get_analytics(
@@ -219,36 +358,46 @@ def get_analytics(
     end_date: Optional[date] = Query(None)
 ):
     """Get loan analytics"""
-    try:
+    def compute():
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Build date filter
+        # Read the rollups (loan_rollups.py) instead of scanning loan_number_index
         date_filter = ""
         params = []
         
         if start_date:
-            date_filter += " AND call_date >= %s"
+            date_filter += " AND day >= %s"
             params.append(start_date)
         if end_date:
-            date_filter += " AND call_date <= %s"
+            date_filter += " AND day <= %s"
             params.append(end_date)
         
-        # Get analytics
-        query = f"""
-        SELECT 
-            COUNT(DISTINCT loan_number) as total_loans,
-            COUNT(DISTINCT orkuid) as total_calls,
-            COUNT(DISTINCT user_name) as users_with_loans,
-            MIN(call_date) as min_date,
-            MAX(call_date) as max_date
-        FROM loan_number_index
-        WHERE 1=1 {date_filter}
-        """
-        
-        cursor.execute(query, params)
+        cursor.execute(f"""
+            SELECT COALESCE(SUM(calls), 0) as total_calls, MIN(day) as min_date, MAX(day) as max_date
+            FROM call_daily_rollup
+            WHERE calls > 0 {date_filter}
+        """, params)
         result = cursor.fetchone()
         
+        if date_filter:
+            cursor.execute(f"""
+                SELECT COUNT(DISTINCT loan_number) as total_loans
+                FROM loan_daily_rollup WHERE 1=1 {date_filter}
+            """, params)
+            result['total_loans'] = cursor.fetchone()['total_loans']
+            cursor.execute(f"""
+                SELECT COUNT(DISTINCT user_name) as users_with_loans
+                FROM user_daily_rollup WHERE 1=1 {date_filter}
+            """, params)
+            result['users_with_loans'] = cursor.fetchone()['users_with_loans']
+        else:
+            cursor.execute("SELECT COUNT(*) as total_loans FROM loan_rollup")
+            result['total_loans'] = cursor.fetchone()['total_loans']
+            cursor.execute("SELECT COUNT(*) as users_with_loans FROM user_rollup")
+            result['users_with_loans'] = cursor.fetchone()['users_with_loans']
+        result['total_calls'] = int(result['total_calls'])
+        
         # Calculate average
         avg_calls = result['total_calls'] / result['total_loans'] if result['total_loans'] > 0 else 0
         
@@ -267,6 +416,11 @@ def get_analytics(
         conn.close()
         
         return analytics
+    
+    try:
+        return get_cache().get_or_compute(
+            "analytics", {"start_date": start_date, "end_date": end_date}, compute
+        )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
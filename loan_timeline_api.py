@@ -2,19 +2,29 @@
 """
 Loan Timeline API - Aggregates all transcripts for a loan number
 Creates a comprehensive timeline with AI-powered summary
+Timelines and insights carry an ETag derived from the loan's version
+(call count, last change); unchanged loans cost one small version query.
+/export/timelines streams many loans (or a date range) as CSV, NDJSON or
+Parquet straight from a server-side cursor.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional, Dict
-import pymysql
+from loan_db import get_db_connection, register_pool_routes, run_db
+from loan_cache import VersionedMemo, make_etag, etag_matches
+from scream_profile import register_profile_routes
+from loan_paging import stream_rows, ndjson_response, csv_response, parquet_response
+import os
 import json
 from datetime import datetime, date
 import re
 from collections import defaultdict
 
 app = FastAPI(title="Loan Timeline API", version="1.0.0")
+register_pool_routes(app)
+register_profile_routes(app)
 
 # Enable CORS
 app.add_middleware(
@@ -25,16 +35,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Database configuration
-DB_CONFIG = {
-    'host': 's40vpsoxweb002',
-    'port': 3306,
-    'user': 'root',
-    'password': 'admin',
-    'database': 'oreka',
-    'charset': 'utf8mb4'
-}
-
 # Pydantic models
 class TimelineEvent(BaseModel):
     orkuid: str
@@ -66,126 +66,195 @@ class LoanInsights(BaseModel):
     risk_indicators: List[str]
     compliance_notes: List[str]
 
-def get_db_connection():
-    """Get database connection"""
-    return pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+# Computed timelines/insights, reused until the loan's version changes
+memo = VersionedMemo()
 
-@app.get("/timeline/{loan_number}", response_model=LoanTimeline)
-async def get_loan_timeline(loan_number: str):
-    """Get complete timeline for a loan number"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+def timeline_version(cursor, loan_number: str) -> Optional[str]:
+    """Cheap version of a loan's timeline: (call count, last change)"""
+    cursor.execute("""
+        SELECT 
+            COUNT(*) as calls,
+            MAX(ct.updated_at) as updated,
+            MAX(l.created_at) as indexed
+        FROM loan_number_index l
+        JOIN call_transcripts_v2 ct ON l.orkuid = ct.orkuid
+        WHERE l.loan_number = %s
+    """, (loan_number,))
+    row = cursor.fetchone()
+    if not row['calls']:
+        return None
+    return f"{row['calls']}:{row['updated']}:{row['indexed']}"
+
+def build_timeline(cursor, loan_number: str) -> LoanTimeline:
+    """Compute the full timeline for a loan"""
+    # Get all calls for this loan
+    cursor.execute("""
+        SELECT 
+            l.orkuid,
+            l.call_timestamp as timestamp,
+            l.duration,
+            l.user_name,
+            ct.summary,
+            ct.key_facts,
+            ct.sentiment,
+            ct.loan_numbers,
+            t.localParty,
+            t.remoteParty
+        FROM loan_number_index l
+        JOIN call_transcripts_v2 ct ON l.orkuid = ct.orkuid
+        JOIN orktape t ON l.orkuid = t.orkUid
+        WHERE l.loan_number = %s
+        ORDER BY l.call_timestamp ASC
+    """, (loan_number,))
+    
+    calls = cursor.fetchall()
+    
+    if not calls:
+        raise HTTPException(status_code=404, detail="No calls found for this loan number")
+    
+    # Process timeline events
+    timeline_events = []
+    sentiment_counts = defaultdict(int)
+    all_summaries = []
+    total_duration = 0
+    
+    for call in calls:
+        # Parse JSON fields
+        key_facts = json.loads(call['key_facts']) if call['key_facts'] else {}
+        loan_numbers = json.loads(call['loan_numbers']) if call['loan_numbers'] else []
         
-        # Get all calls for this loan
-        cursor.execute("""
-            SELECT 
-                l.orkuid,
-                l.call_timestamp as timestamp,
-                l.duration,
-                l.user_name,
-                ct.summary,
-                ct.key_facts,
-                ct.sentiment,
-                ct.loan_numbers,
-                t.localParty,
-                t.remoteParty
-            FROM loan_number_index l
-            JOIN call_transcripts_v2 ct ON l.orkuid = ct.orkuid
-            JOIN orktape t ON l.orkuid = t.orkUid
-            WHERE l.loan_number = %s
-            ORDER BY l.call_timestamp ASC
-        """, (loan_number,))
+        # Count loan mentions
+        loan_mentions = loan_numbers.count(loan_number) if loan_numbers else 0
         
-        calls = cursor.fetchall()
+        # Create timeline event
+        event = TimelineEvent(
+            orkuid=call['orkuid'],
+            timestamp=call['timestamp'],
+            duration=call['duration'],
+            user_name=call['user_name'],
+            summary=call['summary'] or "No summary available",
+            key_facts=key_facts,
+            sentiment=call['sentiment'],
+            loan_mentions=loan_mentions
+        )
+        timeline_events.append(event)
         
-        if not calls:
+        # Aggregate data
+        if call['sentiment']:
+            sentiment_counts[call['sentiment']] += 1
+        all_summaries.append(call['summary'] or "")
+        total_duration += call['duration']
+    
+    # Determine primary user (most frequent)
+    user_counts = defaultdict(int)
+    for call in calls:
+        if call['user_name']:
+            user_counts[call['user_name']] += 1
+    primary_user = max(user_counts, key=user_counts.get) if user_counts else None
+    
+    # Generate aggregated summary
+    aggregated_summary = generate_timeline_summary(
+        loan_number, 
+        timeline_events,
+        all_summaries
+    )
+    
+    # Extract key milestones
+    key_milestones = extract_milestones(timeline_events, all_summaries)
+    
+    # Create timeline response
+    timeline = LoanTimeline(
+        loan_number=loan_number,
+        total_calls=len(calls),
+        total_duration_minutes=total_duration // 60,
+        first_contact=calls[0]['timestamp'],
+        last_contact=calls[-1]['timestamp'],
+        primary_user=primary_user,
+        timeline_events=timeline_events,
+        aggregated_summary=aggregated_summary,
+        key_milestones=key_milestones,
+        sentiment_trend=dict(sentiment_counts)
+    )
+    
+    return timeline
+
+def load_timeline(loan_number: str, with_insights: bool = False):
+    """(version, timeline[, insights]) for a loan, from the memo when unchanged"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        version = timeline_version(cursor, loan_number)
+        if version is None:
             raise HTTPException(status_code=404, detail="No calls found for this loan number")
         
-        # Process timeline events
-        timeline_events = []
-        sentiment_counts = defaultdict(int)
-        all_summaries = []
-        total_duration = 0
-        
-        for call in calls:
-            # Parse JSON fields
-            key_facts = json.loads(call['key_facts']) if call['key_facts'] else {}
-            loan_numbers = json.loads(call['loan_numbers']) if call['loan_numbers'] else []
-            
-            # Count loan mentions
-            loan_mentions = loan_numbers.count(loan_number) if loan_numbers else 0
-            
-            # Create timeline event
-            event = TimelineEvent(
-                orkuid=call['orkuid'],
-                timestamp=call['timestamp'],
-                duration=call['duration'],
-                user_name=call['user_name'],
-                summary=call['summary'] or "No summary available",
-                key_facts=key_facts,
-                sentiment=call['sentiment'],
-                loan_mentions=loan_mentions
-            )
-            timeline_events.append(event)
-            
-            # Aggregate data
-            if call['sentiment']:
-                sentiment_counts[call['sentiment']] += 1
-            all_summaries.append(call['summary'] or "")
-            total_duration += call['duration']
-        
-        # Determine primary user (most frequent)
-        user_counts = defaultdict(int)
-        for call in calls:
-            if call['user_name']:
-                user_counts[call['user_name']] += 1
-        primary_user = max(user_counts, key=user_counts.get) if user_counts else None
-        
-        # Generate aggregated summary
-        aggregated_summary = generate_timeline_summary(
-            loan_number, 
-            timeline_events,
-            all_summaries
+        timeline = memo.get_or_compute(
+            ("timeline", loan_number), version, lambda: build_timeline(cursor, loan_number)
         )
+        if not with_insights:
+            return version, timeline
         
-        # Extract key milestones
-        key_milestones = extract_milestones(timeline_events, all_summaries)
-        
-        # Create timeline response
-        timeline = LoanTimeline(
-            loan_number=loan_number,
-            total_calls=len(calls),
-            total_duration_minutes=total_duration // 60,
-            first_contact=calls[0]['timestamp'],
-            last_contact=calls[-1]['timestamp'],
-            primary_user=primary_user,
-            timeline_events=timeline_events,
-            aggregated_summary=aggregated_summary,
-            key_milestones=key_milestones,
-            sentiment_trend=dict(sentiment_counts)
+        insights = memo.get_or_compute(
+            ("insights", loan_number), version, lambda: analyze_loan_timeline(timeline)
         )
-        
+        return version, timeline, insights
+    finally:
+        cursor.close()
+        conn.close()
+
+def check_version(loan_number: str) -> Optional[str]:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        return timeline_version(cursor, loan_number)
+    finally:
         cursor.close()
         conn.close()
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """304 when the client already has this version; otherwise tag the response"""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+@app.get("/timeline/{loan_number}", response_model=LoanTimeline)
+async def get_loan_timeline(loan_number: str, request: Request, response: Response):
+    """Get complete timeline for a loan number"""
+    try:
+        # A revalidating client only costs the version query
+        if request.headers.get("if-none-match"):
+            version = await run_db(check_version, loan_number)
+            if version is not None:
+                cached = not_modified(request, response, make_etag("timeline", loan_number, version))
+                if cached:
+                    return cached
         
-        return timeline
+        version, timeline = await run_db(load_timeline, loan_number)
+        return not_modified(request, response, make_etag("timeline", loan_number, version)) or timeline
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/insights/{loan_number}", response_model=LoanInsights)
-async def get_loan_insights(loan_number: str):
+async def get_loan_insights(loan_number: str, request: Request, response: Response):
     """Get AI-powered insights for a loan"""
     try:
-        # First get the timeline
-        timeline = await get_loan_timeline(loan_number)
-        
-        # Analyze for insights
-        insights = analyze_loan_timeline(timeline)
+        if request.headers.get("if-none-match"):
+            version = await run_db(check_version, loan_number)
+            if version is not None:
+                cached = not_modified(request, response, make_etag("insights", loan_number, version))
+                if cached:
+                    return cached
         
-        return insights
+        # Timeline and insights come from the memo when the loan is unchanged
+        version, _, insights = await run_db(load_timeline, loan_number, True)
+        return not_modified(request, response, make_etag("insights", loan_number, version)) or insights
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -360,7 +429,7 @@ def analyze_loan_timeline(timeline: LoanTimeline) -> LoanInsights:
 @app.get("/timeline/{loan_number}/export")
 async def export_timeline(loan_number: str, format: str = "json"):
     """Export timeline in various formats"""
-    timeline = await get_loan_timeline(loan_number)
+    _, timeline = await run_db(load_timeline, loan_number)
     
     if format == "csv":
         # Convert to CSV format
@@ -372,6 +441,104 @@ async def export_timeline(loan_number: str, format: str = "json"):
     
     return timeline
 
+# Bulk export: many loans or a date range, streamed from a server-side cursor
+EXPORT_COLUMNS = [
+    'loan_number', 'orkuid', 'timestamp', 'duration', 'user_name',
+    'local_party', 'remote_party', 'sentiment', 'summary', 'key_facts'
+]
+MAX_EXPORT_LOANS = int(os.environ.get('LOAN_MAX_EXPORT_LOANS', 10000))
+
+class TimelineExportRequest(BaseModel):
+    loan_numbers: Optional[List[str]] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    format: str = "csv"
+
+def export_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ('loan_number', pa.string()),
+        ('orkuid', pa.string()),
+        ('timestamp', pa.timestamp('s')),
+        ('duration', pa.int32()),
+        ('user_name', pa.string()),
+        ('local_party', pa.string()),
+        ('remote_party', pa.string()),
+        ('sentiment', pa.string()),
+        ('summary', pa.string()),
+        ('key_facts', pa.string())
+    ])
+
+def export_response(loan_numbers: Optional[List[str]], start_date: Optional[date],
+                    end_date: Optional[date], format: str):
+    """Stream every call of the selected loans, ordered by loan then time"""
+    loan_numbers = [loan.strip() for loan in loan_numbers or [] if loan and loan.strip()]
+    if not loan_numbers and not start_date and not end_date:
+        raise HTTPException(status_code=400, detail="Give loan_numbers or a date range")
+    if len(loan_numbers) > MAX_EXPORT_LOANS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_EXPORT_LOANS} loans per export")
+    if format not in ("csv", "ndjson", "parquet"):
+        raise HTTPException(status_code=400, detail="format must be csv, ndjson or parquet")
+    
+    query = """
+        SELECT 
+            l.loan_number,
+            l.orkuid,
+            l.call_timestamp as timestamp,
+            l.duration,
+            l.user_name,
+            t.localParty as local_party,
+            t.remoteParty as remote_party,
+            ct.sentiment,
+            ct.summary,
+            ct.key_facts
+        FROM loan_number_index l
+        JOIN call_transcripts_v2 ct ON l.orkuid = ct.orkuid
+        JOIN orktape t ON l.orkuid = t.orkUid
+        WHERE 1=1
+    """
+    params = []
+    
+    if loan_numbers:
+        query += f" AND l.loan_number IN ({', '.join(['%s'] * len(loan_numbers))})"
+        params.extend(loan_numbers)
+    if start_date:
+        query += " AND l.call_date >= %s"
+        params.append(start_date)
+    if end_date:
+        query += " AND l.call_date <= %s"
+        params.append(end_date)
+    
+    query += " ORDER BY l.loan_number, l.call_timestamp"
+    
+    rows = stream_rows(query, params)
+    filename = f"loan_timelines_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    
+    if format == "ndjson":
+        return ndjson_response(rows)
+    if format == "parquet":
+        try:
+            schema = export_schema()
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Parquet export needs pyarrow (pip install pyarrow)")
+        return parquet_response(rows, schema, filename)
+    return csv_response(rows, EXPORT_COLUMNS, filename)
+
+@app.get("/export/timelines")
+def export_timelines(
+    loans: Optional[str] = Query(None, description="Comma-separated loan numbers"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    format: str = "csv"
+):
+    """Bulk export of loan timelines as CSV, NDJSON or Parquet"""
+    return export_response(loans.split(",") if loans else None, start_date, end_date, format)
+
+@app.post("/export/timelines")
+def export_timelines_bulk(request: TimelineExportRequest):
+    """Bulk export for loan lists too long for a URL"""
+    return export_response(request.loan_numbers, request.start_date, request.end_date, request.format)
+
 @app.get("/search/timeline")
 async def search_timelines(
     start_date: Optional[date] = None,
@@ -24,6 +24,8 @@ from pathlib import Path
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 
+from scream_numbers import normalize_spoken_numbers
+
 try:
     from faster_whisper import WhisperModel
     from tqdm import tqdm
@@ -292,6 +294,8 @@ class TranscriptionProcessor:
         """Extract metadata from transcript"""
         import re
         
+        text = normalize_spoken_numbers(text)
+        
         # Extract loan number
         loan_pattern = r'\b\d{7,10}\b'
         loan_matches = re.findall(loan_pattern, text)
@@ -7,12 +7,13 @@ Uses subprocess for SCP like the working parallel processor
 import json
 import os
 import sys
+import argparse
 import time
 from datetime import datetime
 from fast_parallel_loan_extractor import process_batch_parallel, FastWorker
 from smart_loan_network_finder import find_loan_officer_networks
 
-def main():
+def main(two_pass=False):
     print("="*80)
     print("LOAN NETWORK PARALLEL PROCESSOR")
     print("4 Workers | No Paramiko | Process ALL loan officer calls")
@@ -63,7 +64,7 @@ def main():
     
     # Process with 4 workers!
     print("\nStarting parallel processing...")
-    process_batch_parallel(recordings, num_workers=4)
+    process_batch_parallel(recordings, num_workers=4, two_pass=two_pass)
     
     # Show results
     print("\n" + "="*60)
@@ -105,6 +106,11 @@ def main():
     print("✓ Run loan_search_api.py to start searching!")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process loan officer networks with 4 workers")
+    parser.add_argument('--two-pass', action='store_true',
+                        help='Beam-5 re-decode around loan mentions (targeted second pass)')
+    args = parser.parse_args()
+    
     # First check if we have the JSON file
     if os.path.exists('recordings_to_transcribe.json'):
         print("Loading recordings from recordings_to_transcribe.json...")
@@ -122,7 +128,7 @@ if __name__ == "__main__":
         
         response = input(f"\nProcess these {len(recordings)} recordings with 4 workers? (yes/no): ")
         if response.lower() == 'yes':
-            process_batch_parallel(recordings, num_workers=4)
+            process_batch_parallel(recordings, num_workers=4, two_pass=args.two_pass)
     else:
         # Run full analysis
-        main()
\ No newline at end of file
+        main(two_pass=args.two_pass)
\ No newline at end of file
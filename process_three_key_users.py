@@ -6,6 +6,7 @@ Fast loan extraction - focused approach
 
 import os
 import sys
+import argparse
 import pymysql
 from datetime import datetime
 import time
@@ -204,6 +205,11 @@ def find_recordings_for_three_users():
     return all_recordings
 
 def main():
+    parser = argparse.ArgumentParser(description="Process the 3 key users' recordings")
+    parser.add_argument('--two-pass', action='store_true',
+                        help='Beam-5 re-decode around loan mentions (targeted second pass)')
+    args = parser.parse_args()
+    
     print("="*80)
     print("PROCESS 3 KEY USERS ONLY")
     print("Eric Rawlins, Krall, Rahimifar")
@@ -237,7 +243,7 @@ def main():
     if choice == '1':
         # Process in parallel
         print("\nStarting PARALLEL processing...")
-        process_batch_parallel(recordings, num_workers=4)
+        process_batch_parallel(recordings, num_workers=4, two_pass=args.two_pass)
         
     elif choice == '2':
         # Process sequentially
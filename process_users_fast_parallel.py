@@ -6,6 +6,7 @@ Expected speed: 60-80 recordings per hour
 
 import os
 import sys
+import argparse
 import pymysql
 from datetime import datetime
 import time
@@ -15,6 +16,11 @@ from fast_parallel_loan_extractor import process_batch_parallel
 exec(open('process_users_fresh_start.py').read().split('def main():')[0])
 
 def main():
+    parser = argparse.ArgumentParser(description="Process user recordings with 4 parallel workers")
+    parser.add_argument('--two-pass', action='store_true',
+                        help='Beam-5 re-decode around loan mentions (targeted second pass)')
+    args = parser.parse_args()
+    
     print("=" * 80)
     print("ULTRA-FAST PARALLEL LOAN EXTRACTION")
     print("4 Workers | Whisper Only | No Summaries")
@@ -126,7 +132,7 @@ def main():
         return
     
     # Process in parallel!
-    process_batch_parallel(all_recordings, num_workers=4)
+    process_batch_parallel(all_recordings, num_workers=4, two_pass=args.two_pass)
     
     print("\nYou can now search for loan numbers using the loan search API!")
     print("Run: python loan_search_api.py")
@@ -6,15 +6,14 @@ Left = UNDERWRITER, Right = BROKER
 """
 
 import sys
-import os
 from pathlib import Path
-import wave
-import numpy as np
 from faster_whisper import WhisperModel
 from datetime import datetime
 import json
 import glob
 
+from scream_audio import ChannelSource
+
 # RTX 4090 Settings
 MODEL_PATH = "models/faster-whisper-large-v3-turbo-ct2"
 DEVICE = "cuda"
@@ -38,52 +37,23 @@ class BatchScreenplayProcessor:
         print("✅ Model loaded! Ready for batch processing")
         
     def split_stereo(self, wav_file):
-        """Split stereo into L/R mono files"""
+        """L/R channels as 16kHz float32 arrays (mmap views, no temp files)"""
         try:
-            with wave.open(wav_file, 'rb') as wav:
-                if wav.getnchannels() != 2:
+            with ChannelSource(wav_file) as source:
+                if source.channels != 2:
                     print(f"⚠️  Skipping {wav_file} - not stereo")
                     return None, None
                     
-                frames = wav.readframes(wav.getnframes())
-                sample_width = wav.getsampwidth()
-                framerate = wav.getframerate()
-                
-            # Convert to numpy
-            dtype = np.int16 if sample_width == 2 else np.int32
-            audio_data = np.frombuffer(frames, dtype=dtype)
-            audio_data = audio_data.reshape(-1, 2)
-            
-            # Split channels
-            left = audio_data[:, 0]
-            right = audio_data[:, 1]
-            
-            # Save temp files
-            temp_dir = Path("temp_batch")
-            temp_dir.mkdir(exist_ok=True)
-            
-            base = Path(wav_file).stem
-            left_file = str(temp_dir / f"{base}_L.wav")
-            right_file = str(temp_dir / f"{base}_R.wav")
-            
-            # Write mono files
-            for data, filename in [(left, left_file), (right, right_file)]:
-                with wave.open(filename, 'wb') as out:
-                    out.setnchannels(1)
-                    out.setsampwidth(sample_width)
-                    out.setframerate(framerate)
-                    out.writeframes(data.tobytes())
-                    
-            return left_file, right_file
+                return source.channel(0), source.channel(1)
             
         except Exception as e:
             print(f"❌ Error with {wav_file}: {e}")
             return None, None
             
-    def transcribe_channel(self, audio_file, speaker):
-        """Transcribe single channel"""
+    def transcribe_channel(self, audio, speaker):
+        """Transcribe single channel (file path or 16kHz float32 samples)"""
         segments, info = self.model.transcribe(
-            audio_file,
+            audio,
             beam_size=5,
             language="en",
             condition_on_previous_text=True,
@@ -108,24 +78,17 @@ class BatchScreenplayProcessor:
         print("="*50)
         
         # Split stereo
-        left_file, right_file = self.split_stereo(wav_file)
-        if not left_file:
+        left_audio, right_audio = self.split_stereo(wav_file)
+        if left_audio is None:
             return None
             
         # Transcribe both channels
         print("📞 Transcribing UNDERWRITER (left channel)...")
-        uw_segments = self.transcribe_channel(left_file, "UNDERWRITER")
+        uw_segments = self.transcribe_channel(left_audio, "UNDERWRITER")
         
         print("📱 Transcribing BROKER (right channel)...")
-        broker_segments = self.transcribe_channel(right_file, "BROKER")
+        broker_segments = self.transcribe_channel(right_audio, "BROKER")
         
-        # Cleanup temp files
-        try:
-            os.remove(left_file)
-            os.remove(right_file)
-        except:
-            pass
-            
         # Merge and sort
         all_segments = uw_segments + broker_segments
         all_segments.sort(key=lambda x: x['start'])
@@ -292,13 +255,6 @@ class BatchScreenplayProcessor:
             print(f"Complete data: {json_file}")
         else:
             print("❌ No scenes were successfully processed")
-            
-        # Cleanup
-        try:
-            import shutil
-            shutil.rmtree("temp_batch", ignore_errors=True)
-        except:
-            pass
 
 def main():
     if len(sys.argv) < 2:
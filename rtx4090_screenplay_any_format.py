@@ -1,93 +1,39 @@
 #!/usr/bin/env python3
 """
 RTX 4090 SCREENPLAY - Handles ANY audio format
-Uses ffmpeg to ensure compatibility
+Probes the header first: WAV is decoded in-process, anything else by PyAV
 """
 
 import sys
 import os
 from pathlib import Path
-import subprocess
-import numpy as np
 from faster_whisper import WhisperModel
 from datetime import datetime
 import json
-import tempfile
+
+from scream_probe import load_probed, probe_file
 
 # RTX 4090 Settings
 MODEL_PATH = "models/faster-whisper-large-v3-turbo-ct2"
 DEVICE = "cuda"
 COMPUTE_TYPE = "float16"
 
-def convert_to_wav_stereo(input_file):
-    """Convert any audio to standard stereo WAV using ffmpeg"""
-    print(f"🔄 Converting {Path(input_file).name} to standard WAV...")
-    
-    # Create temp file
-    temp_wav = tempfile.NamedTemporaryFile(suffix='.wav', delete=False).name
-    
-    # Use ffmpeg to convert to standard stereo WAV
-    cmd = [
-        'ffmpeg', '-i', input_file,
-        '-acodec', 'pcm_s16le',  # Standard 16-bit PCM
-        '-ar', '16000',           # 16kHz sample rate (good for speech)
-        '-ac', '2',               # Force stereo
-        '-y',                     # Overwrite
-        temp_wav
-    ]
-    
+def load_stereo(input_file):
+    """(left, right) as 16kHz float32, decoded along the route the header probe picks
+    
+    WAV (PCM, μ-law, A-law) is split in-process by ChannelSource; anything
+    else goes through PyAV. Mono input gives the same channel twice, as the
+    old forced-stereo ffmpeg conversion did.
+    """
+    probe = probe_file(input_file)
+    print(f"🔎 {probe.codec or 'non-WAV'}, {probe.channels or '?'} ch, "
+          f"{probe.sample_rate or '?'} Hz -> {probe.route}/{probe.mode}")
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            print("✅ Conversion successful")
-            return temp_wav
-        else:
-            print(f"❌ FFmpeg error: {result.stderr}")
-            # Try simpler conversion
-            cmd_simple = ['ffmpeg', '-i', input_file, '-y', temp_wav]
-            result2 = subprocess.run(cmd_simple, capture_output=True, text=True)
-            if result2.returncode == 0:
-                print("✅ Simple conversion worked")
-                return temp_wav
-            else:
-                print(f"❌ Simple conversion also failed: {result2.stderr}")
-                return None
-    except FileNotFoundError:
-        print("❌ FFmpeg not found! Install with: choco install ffmpeg")
-        return None
+        left, right = load_probed(probe, split_stereo=True)
+        print("✅ Decoded both channels")
+        return left, right
     except Exception as e:
-        print(f"❌ Conversion error: {e}")
-        return None
-
-def split_channels_numpy(wav_file):
-    """Split stereo using numpy (more robust)"""
-    print("📊 Splitting stereo channels...")
-    
-    # Use ffmpeg to split channels
-    temp_left = tempfile.NamedTemporaryFile(suffix='_L.wav', delete=False).name
-    temp_right = tempfile.NamedTemporaryFile(suffix='_R.wav', delete=False).name
-    
-    # Extract left channel
-    cmd_left = [
-        'ffmpeg', '-i', wav_file,
-        '-af', 'pan=mono|c0=c0',  # Left channel only
-        '-y', temp_left
-    ]
-    
-    # Extract right channel  
-    cmd_right = [
-        'ffmpeg', '-i', wav_file,
-        '-af', 'pan=mono|c0=c1',  # Right channel only
-        '-y', temp_right
-    ]
-    
-    try:
-        subprocess.run(cmd_left, capture_output=True, check=True)
-        subprocess.run(cmd_right, capture_output=True, check=True)
-        print("✅ Channel split successful")
-        return temp_left, temp_right
-    except Exception as e:
-        print(f"❌ Channel split error: {e}")
+        print(f"❌ Decode error: {e}")
         return None, None
 
 def process_any_audio(input_file):
@@ -95,21 +41,10 @@ def process_any_audio(input_file):
     print(f"\n🎬 Processing: {Path(input_file).name}")
     print("="*60)
     
-    # Convert to standard WAV
-    wav_file = convert_to_wav_stereo(input_file)
-    if not wav_file:
-        print("❌ Could not convert audio file")
-        return None
-        
-    # Split channels
-    left_file, right_file = split_channels_numpy(wav_file)
-    if not left_file:
-        print("❌ Could not split channels")
-        # Clean up
-        try:
-            os.remove(wav_file)
-        except:
-            pass
+    # Decode and split channels (no temp files)
+    left_audio, right_audio = load_stereo(input_file)
+    if left_audio is None:
+        print("❌ Could not decode audio file")
         return None
         
     # Load model
@@ -118,12 +53,12 @@ def process_any_audio(input_file):
     
     # Transcribe both channels
     print("📞 Transcribing UNDERWRITER channel...")
-    uw_segments, _ = model.transcribe(left_file, language="en", vad_filter=True)
+    uw_segments, _ = model.transcribe(left_audio, language="en", vad_filter=True)
     uw_list = [{'speaker': 'UNDERWRITER', 'text': seg.text.strip(), 
                 'start': seg.start, 'end': seg.end} for seg in uw_segments]
     
     print("📱 Transcribing BROKER channel...")
-    broker_segments, _ = model.transcribe(right_file, language="en", vad_filter=True)
+    broker_segments, _ = model.transcribe(right_audio, language="en", vad_filter=True)
     broker_list = [{'speaker': 'BROKER', 'text': seg.text.strip(),
                     'start': seg.start, 'end': seg.end} for seg in broker_segments]
     
@@ -168,14 +103,6 @@ def process_any_audio(input_file):
         f.write('\n'.join(screenplay))
         
     print(f"\n✅ Screenplay saved: {output_file}")
-    
-    # Cleanup temp files
-    for f in [wav_file, left_file, right_file]:
-        try:
-            if f and os.path.exists(f):
-                os.remove(f)
-        except:
-            pass
             
     return output_file
 
@@ -185,7 +112,6 @@ def main():
         print("="*40)
         print("Usage: python rtx4090_screenplay_any_format.py <audio_file>")
         print("\nSupports: WAV, MP3, M4A, OGG, FLAC, etc.")
-        print("Requires: ffmpeg (choco install ffmpeg)")
         sys.exit(1)
         
     input_file = sys.argv[1]
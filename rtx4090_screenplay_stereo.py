@@ -9,12 +9,12 @@ Right Channel = BROKER/REMOTE PARTY
 import sys
 import os
 from pathlib import Path
-import wave
-import numpy as np
 from faster_whisper import WhisperModel
 from datetime import datetime
 import json
 
+from scream_audio import ChannelSource
+
 # RTX 4090 Optimized Settings
 MODEL_PATH = "models/faster-whisper-large-v3-turbo-ct2"
 DEVICE = "cuda"
@@ -30,82 +30,45 @@ def print_rtx_banner():
     print()
 
 def split_stereo_to_mono(wav_file):
-    """Split stereo WAV into left (Underwriter) and right (Broker) channels"""
+    """Left (Underwriter) and right (Broker) channels as 16kHz float32 arrays.
+
+    Reads the file through ChannelSource (mmap + per-channel views), so no
+    temp mono WAVs are written and each side is decoded once.
+    """
     print(f"📂 Opening stereo file: {wav_file}")
     
     try:
-        with wave.open(wav_file, 'rb') as wav:
-            channels = wav.getnchannels()
+        with ChannelSource(wav_file) as source:
+            channels = source.channels
             if channels != 2:
                 print(f"⚠️  File has {channels} channels - expected stereo (2)")
                 if channels == 1:
                     print("   This is MONO audio - no channel separation possible")
                     return None, None
                 
-            frames = wav.readframes(wav.getnframes())
-            sample_width = wav.getsampwidth()
-            framerate = wav.getframerate()
-            duration = wav.getnframes() / framerate
-            
-        print(f"✅ Stereo file confirmed: {duration:.1f} seconds")
-        
-        # Convert to numpy
-        if sample_width == 2:
-            dtype = np.int16
-        elif sample_width == 4:
-            dtype = np.int32
-        else:
-            print(f"❌ Unsupported sample width: {sample_width}")
-            return None, None
+            print(f"✅ Stereo file confirmed: {source.duration:.1f} seconds")
             
-        audio_data = np.frombuffer(frames, dtype=dtype)
-        audio_data = audio_data.reshape(-1, 2)
-        
-        # Extract channels
-        left_channel = audio_data[:, 0]
-        right_channel = audio_data[:, 1]
-        
-        # Create temp directory if needed
-        temp_dir = Path("temp_audio")
-        temp_dir.mkdir(exist_ok=True)
-        
-        # Save as mono files
-        base_name = Path(wav_file).stem
-        left_file = str(temp_dir / f"{base_name}_UNDERWRITER.wav")
-        right_file = str(temp_dir / f"{base_name}_BROKER.wav")
-        
-        # Write left channel (Underwriter)
-        with wave.open(left_file, 'wb') as wav_out:
-            wav_out.setnchannels(1)
-            wav_out.setsampwidth(sample_width)
-            wav_out.setframerate(framerate)
-            wav_out.writeframes(left_channel.tobytes())
-        
-        # Write right channel (Broker)
-        with wave.open(right_file, 'wb') as wav_out:
-            wav_out.setnchannels(1)
-            wav_out.setsampwidth(sample_width)
-            wav_out.setframerate(framerate)
-            wav_out.writeframes(right_channel.tobytes())
+            left_channel = source.channel(0)
+            right_channel = source.channel(1)
         
         print(f"✅ Split complete:")
-        print(f"   📞 Left → {left_file} (UNDERWRITER)")
-        print(f"   📱 Right → {right_file} (BROKER)")
+        print(f"   📞 Left → UNDERWRITER ({len(left_channel)} samples)")
+        print(f"   📱 Right → BROKER ({len(right_channel)} samples)")
         
-        return left_file, right_file
+        return left_channel, right_channel
         
     except Exception as e:
         print(f"❌ Error splitting audio: {e}")
         return None, None
 
-def transcribe_with_rtx4090(model, audio_file, speaker_role):
-    """Transcribe using RTX 4090 optimized settings"""
+def transcribe_with_rtx4090(model, audio, speaker_role):
+    """Transcribe one channel (file path or 16kHz float32 samples) using RTX 4090 optimized settings"""
     print(f"\n🎙️  Transcribing {speaker_role} channel...")
     print(f"   Using RTX 4090 with 24GB VRAM")
     
     # RTX 4090 can handle aggressive settings
     segments, info = model.transcribe(
-        audio_file,
+        audio,
         beam_size=5,
         best_of=5,  # Can afford better quality with 24GB
         patience=2.0,
@@ -239,17 +202,6 @@ def format_time(seconds):
     secs = int(seconds % 60)
     return f"{mins:02d}:{secs:02d}"
 
-def cleanup_temp_files(left_file, right_file):
-    """Remove temporary audio files"""
-    try:
-        if left_file and os.path.exists(left_file):
-            os.remove(left_file)
-        if right_file and os.path.exists(right_file):
-            os.remove(right_file)
-        print("🧹 Cleaned up temporary files")
-    except:
-        pass
-
 def main():
     print_rtx_banner()
     
@@ -279,39 +231,34 @@ def main():
     print("✅ Model loaded and ready!")
     
     # Split stereo channels
-    left_file, right_file = split_stereo_to_mono(audio_file)
+    left_audio, right_audio = split_stereo_to_mono(audio_file)
     
-    if not left_file or not right_file:
+    if left_audio is None or right_audio is None:
         print("❌ Failed to split stereo audio")
         sys.exit(1)
     
-    try:
-        # Transcribe both channels
-        underwriter_segments, uw_info = transcribe_with_rtx4090(model, left_file, "UNDERWRITER")
-        broker_segments, broker_info = transcribe_with_rtx4090(model, right_file, "BROKER")
-        
-        # Create screenplay outputs
-        screenplay, detailed, json_file = create_screenplay_format(
-            underwriter_segments, 
-            broker_segments, 
-            audio_file
-        )
-        
-        # Summary
-        print("\n" + "="*50)
-        print("✅ TRANSCRIPTION COMPLETE!")
-        print("="*50)
-        print(f"Total segments: {len(underwriter_segments) + len(broker_segments)}")
-        print(f"Underwriter: {len(underwriter_segments)} segments")
-        print(f"Broker: {len(broker_segments)} segments")
-        print(f"\nOutputs saved:")
-        print(f"  📝 {screenplay}")
-        print(f"  📊 {detailed}")
-        print(f"  💾 {json_file}")
-        
-    finally:
-        # Always cleanup
-        cleanup_temp_files(left_file, right_file)
+    # Transcribe both channels
+    underwriter_segments, uw_info = transcribe_with_rtx4090(model, left_audio, "UNDERWRITER")
+    broker_segments, broker_info = transcribe_with_rtx4090(model, right_audio, "BROKER")
+    
+    # Create screenplay outputs
+    screenplay, detailed, json_file = create_screenplay_format(
+        underwriter_segments, 
+        broker_segments, 
+        audio_file
+    )
+    
+    # Summary
+    print("\n" + "="*50)
+    print("✅ TRANSCRIPTION COMPLETE!")
+    print("="*50)
+    print(f"Total segments: {len(underwriter_segments) + len(broker_segments)}")
+    print(f"Underwriter: {len(underwriter_segments)} segments")
+    print(f"Broker: {len(broker_segments)} segments")
+    print(f"\nOutputs saved:")
+    print(f"  📝 {screenplay}")
+    print(f"  📊 {detailed}")
+    print(f"  💾 {json_file}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,19 +1,18 @@
 #!/usr/bin/env python3
 """
 RTX 4090 μ-law Telephony Screenplay Processor
-Handles 8kHz μ-law WAV files directly
+Handles 8kHz μ-law WAV files directly (header probe + in-process decode)
 """
 
 import sys
-import os
-import subprocess
 from pathlib import Path
 import glob
-import tempfile
 from faster_whisper import WhisperModel
 from datetime import datetime
 import json
 
+from scream_probe import ROUTE_G711, load_probed, probe_file
+
 # RTX 4090 Settings
 MODEL_PATH = "models/faster-whisper-large-v3-turbo-ct2"
 DEVICE = "cuda"
@@ -31,75 +30,38 @@ class ULawScreenplayProcessor:
         self.model = WhisperModel(MODEL_PATH, device=DEVICE, compute_type=COMPUTE_TYPE)
         print("✅ Model ready!")
         
-    def convert_ulaw_stereo(self, ulaw_file):
-        """Convert μ-law to PCM and split stereo"""
+    def split_stereo(self, ulaw_file):
+        """L/R as 16kHz float32: μ-law expanded through the lookup table, no ffmpeg"""
         print(f"📞 Processing μ-law file: {Path(ulaw_file).name}")
         
-        # Create temp files
-        temp_pcm = tempfile.NamedTemporaryFile(suffix='_pcm.wav', delete=False).name
-        temp_left = tempfile.NamedTemporaryFile(suffix='_L.wav', delete=False).name
-        temp_right = tempfile.NamedTemporaryFile(suffix='_R.wav', delete=False).name
-        
         try:
-            # Convert μ-law to PCM
-            cmd_convert = [
-                'ffmpeg', '-i', ulaw_file,
-                '-acodec', 'pcm_s16le',
-                '-ar', '16000',  # Upsample for better quality
-                '-y', temp_pcm
-            ]
-            subprocess.run(cmd_convert, capture_output=True, check=True)
-            
-            # Split channels
-            cmd_left = [
-                'ffmpeg', '-i', temp_pcm,
-                '-af', 'pan=mono|c0=c0',
-                '-y', temp_left
-            ]
-            subprocess.run(cmd_left, capture_output=True, check=True)
-            
-            cmd_right = [
-                'ffmpeg', '-i', temp_pcm,
-                '-af', 'pan=mono|c0=c1', 
-                '-y', temp_right
-            ]
-            subprocess.run(cmd_right, capture_output=True, check=True)
-            
-            # Clean up PCM file
-            os.remove(temp_pcm)
+            probe = probe_file(ulaw_file)
+            if probe.route != ROUTE_G711:
+                print(f"  ℹ️  {probe.codec or 'non-WAV'} recording, decoding via the {probe.route} route")
+            return load_probed(probe, split_stereo=True)
             
-            return temp_left, temp_right
-            
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Conversion error: {e}")
-            # Cleanup
-            for f in [temp_pcm, temp_left, temp_right]:
-                if os.path.exists(f):
-                    os.remove(f)
+        except Exception as e:
+            print(f"❌ Decode error: {e}")
             return None, None
             
     def process_scene(self, ulaw_file, scene_number):
         """Process one μ-law file into a scene"""
-        # Convert and split
-        left_file, right_file = self.convert_ulaw_stereo(ulaw_file)
-        if not left_file:
+        # Decode and split
+        left_audio, right_audio = self.split_stereo(ulaw_file)
+        if left_audio is None:
             return None
             
         # Transcribe
         print("  📞 Transcribing UNDERWRITER...")
-        uw_segs, _ = self.model.transcribe(left_file, language="en", vad_filter=True)
+        uw_segs, _ = self.model.transcribe(left_audio, language="en", vad_filter=True)
         uw_list = [{'speaker': 'UNDERWRITER', 'text': seg.text.strip(),
                     'start': seg.start, 'end': seg.end} for seg in uw_segs]
         
         print("  📱 Transcribing BROKER...")
-        broker_segs, _ = self.model.transcribe(right_file, language="en", vad_filter=True)
+        broker_segs, _ = self.model.transcribe(right_audio, language="en", vad_filter=True)
         broker_list = [{'speaker': 'BROKER', 'text': seg.text.strip(),
                        'start': seg.start, 'end': seg.end} for seg in broker_segs]
         
-        # Cleanup temp files
-        os.remove(left_file)
-        os.remove(right_file)
-        
         # Merge and sort
         all_segments = uw_list + broker_list
         all_segments.sort(key=lambda x: x['start'])
@@ -242,14 +204,6 @@ def main():
         print("  python rtx4090_ulaw_screenplay.py wav_batch_download\\*.wav")
         sys.exit(1)
         
-    # Check for ffmpeg
-    try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-    except:
-        print("❌ FFmpeg not found!")
-        print("Install with: choco install ffmpeg")
-        sys.exit(1)
-        
     pattern = sys.argv[1]
     
     processor = ULawScreenplayProcessor()
@@ -10,10 +10,11 @@ import sys
 from pathlib import Path
 
 from scream_engine import (
-    Pipeline, DirectorySource, WhisperEngine, FileSink,
-    create_default_pipeline
+    Pipeline, DirectorySource, FileSink,
+    create_default_pipeline, create_engine
 )
 from scream_config import ConfigLoader, create_example_config
+from scream_profile import configure as configure_profiling
 
 
 def setup_logging(level: str = "INFO"):
@@ -54,18 +55,28 @@ def cmd_run(args):
     logger.info(f"Source: {config.source.path}")
     logger.info(f"Output: {config.sink.path}")
     logger.info(f"Continuous: {config.continuous}")
+    logger.info(f"Engine: {config.engine.type}")
+    
+    # Span traces are always on; profilers only when profile.mode says so
+    configure_profiling(
+        mode=config.profile.mode,
+        output_dir=config.profile.output_dir,
+        stages=config.profile.stages,
+        sample_interval_ms=config.profile.sample_interval_ms,
+        trace_file=config.profile.trace_file
+    )
+    if config.profile.mode != "off":
+        logger.info(f"Profiling: {config.profile.mode} -> {config.profile.output_dir}/")
     
     # Create pipeline components
     source = DirectorySource(
         path=config.source.path,
-        formats=config.source.formats
+        formats=config.source.formats,
+        probe_index=config.source.probe_index,
+        recursive=config.source.recursive
     )
     
-    engine = WhisperEngine(
-        model_path=config.engine.model_path,
-        device=config.engine.device,
-        compute_type=config.engine.compute_type
-    )
+    engine = create_engine(config.engine)
     
     sink = FileSink(
         output_dir=config.sink.path,
@@ -161,6 +172,12 @@ def cmd_transcribe(args):
         print(f"Speed: {speed:.1f}x realtime")
 
 
+def cmd_bench(args):
+    """Benchmark a matrix of engine settings on a fixed corpus"""
+    from scream_bench import cmd_bench as run
+    sys.exit(run(args))
+
+
 def main():
     """Main CLI entry point"""
     parser = argparse.ArgumentParser(
@@ -177,6 +194,9 @@ Examples:
   # Transcribe single file
   scream transcribe audio.wav
   
+  # Benchmark engine settings on the synthetic corpus (CPU, tiny model)
+  scream bench
+  
   # Create example config
   scream config create
   
@@ -223,6 +243,13 @@ Examples:
                             choices=['cuda', 'cpu'], help='Device to use')
     trans_parser.set_defaults(func=cmd_transcribe)
     
+    # Bench command
+    bench_parser = subparsers.add_parser('bench',
+                                        help='Benchmark engine settings on a fixed corpus')
+    from scream_bench import add_arguments as add_bench_arguments
+    add_bench_arguments(bench_parser)
+    bench_parser.set_defaults(func=cmd_bench)
+    
     # Parse arguments
     args = parser.parse_args()
     
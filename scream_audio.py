@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+SCREAM In-Process Audio Decoding
+Decodes telephony WAVs (G.711 μ-law / A-law, 8/16/24/32-bit PCM, float)
+straight to float32 NumPy arrays and resamples them to 16 kHz with a
+polyphase filter, so the engine hands samples to WhisperModel.transcribe
+without an ffmpeg subprocess or a converted_wav/ copy on disk.
+
+μ-law and A-law bytes go through 256-entry lookup tables, one indexed
+gather per file. Anything that is not a WAV we understand falls back to
+faster-whisper's decode_audio (PyAV, also in-process).
+
+Stereo calls (left = underwriter, right = broker) are read through
+ChannelSource: the data chunk is mmapped and each side is decoded from a
+strided per-channel view, with no temp mono WAVs.
+
+Multi-hour recordings go through ChannelSource.windows(): fixed-size,
+overlapping windows, each mapped, decoded and unmapped on its own, so
+peak memory depends on the window size and not on the recording length.
+
+Usage:
+    samples = load_audio("call.wav")                   # mono 16 kHz float32
+    left, right = load_audio("call.wav", split_stereo=True)
+
+    with ChannelSource("call.wav") as source:
+        underwriter = source.channel(0)
+
+    for window in iter_windows("bridge.wav", window_seconds=600):
+        vad(window.samples)                            # window.start is its offset
+"""
+
+import math
+import os
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# WAVE format tags
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_ALAW = 0x0006
+WAVE_FORMAT_MULAW = 0x0007
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Bytes read up front when parsing a header; longer headers cost one more read
+HEADER_BYTES = 4096
+
+# Resampler filter: zero crossings each side of the sinc, Kaiser beta
+RESAMPLE_HALF_WIDTH = 8
+RESAMPLE_BETA = 5.0
+
+CODECS = {
+    WAVE_FORMAT_PCM: "pcm",
+    WAVE_FORMAT_IEEE_FLOAT: "float",
+    WAVE_FORMAT_ALAW: "alaw",
+    WAVE_FORMAT_MULAW: "ulaw",
+}
+
+
+def _ulaw_table() -> np.ndarray:
+    """G.711 μ-law byte -> float32 sample in [-1, 1)"""
+    u = ~np.arange(256, dtype=np.uint8)
+    exponent = (u >> 4) & 0x07
+    mantissa = (u & 0x0F).astype(np.int32)
+    magnitude = ((mantissa << 3) + 0x84) << exponent.astype(np.int32)
+    sample = magnitude - 0x84
+    sample = np.where(u & 0x80, -sample, sample)
+    return (sample / 32768.0).astype(np.float32)
+
+
+def _alaw_table() -> np.ndarray:
+    """G.711 A-law byte -> float32 sample in [-1, 1)"""
+    a = np.arange(256, dtype=np.uint8) ^ 0x55
+    exponent = ((a >> 4) & 0x07).astype(np.int32)
+    mantissa = (a & 0x0F).astype(np.int32)
+    magnitude = np.where(exponent == 0,
+                         (mantissa << 4) + 8,
+                         ((mantissa << 4) + 0x108) << np.maximum(exponent - 1, 0))
+    sample = np.where(a & 0x80, magnitude, -magnitude)
+    return (sample / 32768.0).astype(np.float32)
+
+
+ULAW_TABLE = _ulaw_table()
+ALAW_TABLE = _alaw_table()
+
+
+@dataclass
+class WavInfo:
+    """What the RIFF header says about a WAV file"""
+    codec: str
+    format_tag: int
+    channels: int
+    sample_rate: int
+    bits_per_sample: int
+    block_align: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // self.block_align if self.block_align else 0
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+
+def read_wav_header(path: Union[str, Path]) -> WavInfo:
+    """Parse the RIFF chunks up to 'data'; raises ValueError if this isn't a WAV"""
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        # One read covers the header of every recorder we have seen
+        head = os.read(fd, HEADER_BYTES)
+        file_size = os.fstat(fd).st_size
+
+        def read(offset: int, count: int) -> bytes:
+            if offset + count <= len(head):
+                return head[offset:offset + count]
+            os.lseek(fd, offset, os.SEEK_SET)
+            return os.read(fd, count)
+
+        if len(head) < 12 or head[:4] not in (b'RIFF', b'RF64') or head[8:12] != b'WAVE':
+            raise ValueError(f"Not a RIFF/WAVE file: {path}")
+        fmt = None
+        position = 12
+        while True:
+            header = read(position, 8)
+            if len(header) < 8:
+                raise ValueError(f"No data chunk in {path}")
+            chunk_id, size = struct.unpack('<4sI', header)
+            position += 8
+            if chunk_id == b'fmt ':
+                fmt = read(position, size)
+                if len(fmt) < 16:
+                    raise ValueError(f"Truncated fmt chunk in {path}")
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"data chunk before fmt chunk in {path}")
+                data_offset = position
+                break
+            # Chunks are word aligned
+            position += size + (size % 2)
+    finally:
+        os.close(fd)
+    # Recorders that never finalize the header leave a bogus data size
+    available = file_size - data_offset
+    if size == 0 or size > available:
+        size = available
+
+    format_tag, channels, sample_rate, _, block_align, bits = struct.unpack('<HHIIHH', fmt[:16])
+    if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+        # First two bytes of the SubFormat GUID are the real format tag
+        format_tag = struct.unpack('<H', fmt[24:26])[0]
+    return WavInfo(
+        codec=CODECS.get(format_tag, f"0x{format_tag:04x}"),
+        format_tag=format_tag,
+        channels=channels,
+        sample_rate=sample_rate,
+        bits_per_sample=bits,
+        block_align=block_align,
+        data_offset=data_offset,
+        data_size=size - size % block_align if block_align else size
+    )
+
+
+# How each encoding is stored: (numpy dtype, bytes per sample)
+STORAGE = {
+    ("ulaw", 8): (np.uint8, 1),
+    ("alaw", 8): (np.uint8, 1),
+    ("pcm", 8): (np.uint8, 1),
+    ("pcm", 16): (np.dtype('<i2'), 2),
+    ("pcm", 24): (np.uint8, 3),
+    ("pcm", 32): (np.dtype('<i4'), 4),
+    ("float", 32): (np.dtype('<f4'), 4),
+    ("float", 64): (np.dtype('<f8'), 8),
+}
+
+
+def _storage(info: WavInfo):
+    try:
+        return STORAGE[(info.codec, info.bits_per_sample)]
+    except KeyError:
+        raise ValueError(f"Unsupported WAV encoding: {info.codec} {info.bits_per_sample}-bit")
+
+
+def map_wav(path: Union[str, Path], info: Optional[WavInfo] = None,
+            start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+    """Read-only mmap of the data chunk (or frames start:stop) shaped (frames, channels).
+
+    24-bit PCM gets a trailing axis of 3 bytes. Nothing is read until a
+    slice is used, and frames[:, c] is a strided view of one channel.
+    """
+    info = info or read_wav_header(path)
+    dtype, width = _storage(info)
+    stop = info.frames if stop is None else min(stop, info.frames)
+    count = max(0, stop - start)
+    shape = (count, info.channels) + ((3,) if width == 3 else ())
+    if count == 0:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(str(path), dtype=dtype, mode='r', shape=shape,
+                     offset=info.data_offset + start * info.block_align)
+
+
+def to_float32(values: np.ndarray, info: WavInfo) -> np.ndarray:
+    """Stored samples (any view from map_wav) -> new float32 array in [-1, 1)"""
+    if info.codec == "ulaw":
+        return ULAW_TABLE[values]
+    if info.codec == "alaw":
+        return ALAW_TABLE[values]
+    if info.codec == "pcm" and info.bits_per_sample == 8:
+        return (values.astype(np.float32) - 128.0) / 128.0
+    if info.codec == "pcm" and info.bits_per_sample == 24:
+        triplets = values.astype(np.int32)
+        value = triplets[..., 0] | (triplets[..., 1] << 8) | (triplets[..., 2] << 16)
+        value = np.where(value & 0x800000, value - 0x1000000, value)
+        return value.astype(np.float32) / 8388608.0
+    if info.codec == "pcm":
+        scale = np.float32(1 << (info.bits_per_sample - 1))
+        return values.astype(np.float32) / scale
+    return values.astype(np.float32)
+
+
+def decode_wav(path: Union[str, Path]) -> Tuple[np.ndarray, int]:
+    """Whole WAV -> (float32 (frames, channels), sample rate), one read, no temp files"""
+    info = read_wav_header(path)
+    return to_float32(map_wav(path, info), info), info.sample_rate
+
+
+@dataclass
+class AudioWindow:
+    """One slice of a long recording, in seconds of call time.
+
+    samples[0] sits at `start`. Neighbouring windows overlap; each second
+    of the call is owned by exactly one window (own_start <= t < own_end),
+    cut in the middle of the overlap, which is what stitching keys on.
+    """
+    index: int
+    start: float
+    own_start: float
+    own_end: float
+    samples: np.ndarray
+    sample_rate: int = SAMPLE_RATE
+
+    @property
+    def end(self) -> float:
+        return self.start + len(self.samples) / self.sample_rate
+
+    def owns(self, t: float) -> bool:
+        return self.own_start <= t < self.own_end
+
+
+class ChannelSource:
+    """Channel-aware view of one WAV: decode one side without touching the other.
+
+    The data chunk is mmapped once; channel(i) converts that channel's
+    strided view straight to float32 at the model rate, so a stereo call
+    never goes through temp mono WAVs or a full interleaved copy.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = str(path)
+        self.info = read_wav_header(path)
+        self.frames = map_wav(path, self.info)
+
+    @property
+    def channels(self) -> int:
+        return self.info.channels
+
+    @property
+    def duration(self) -> float:
+        return self.info.duration
+
+    def channel(self, index: int, sampling_rate: int = SAMPLE_RATE) -> np.ndarray:
+        """One channel as float32 at sampling_rate"""
+        if not 0 <= index < self.channels:
+            raise IndexError(f"{self.path} has {self.channels} channel(s), no channel {index}")
+        samples = to_float32(self.frames[:, index], self.info)
+        return resample(samples, self.info.sample_rate, sampling_rate)
+
+    def stereo(self, sampling_rate: int = SAMPLE_RATE) -> Tuple[np.ndarray, np.ndarray]:
+        """(left, right); a mono file gives the same channel twice"""
+        left = self.channel(0, sampling_rate)
+        right = self.channel(1, sampling_rate) if self.channels > 1 else left
+        return left, right
+
+    def mono(self, sampling_rate: int = SAMPLE_RATE) -> np.ndarray:
+        """Channels averaged"""
+        if self.channels == 1:
+            return self.channel(0, sampling_rate)
+        mixed = to_float32(self.frames, self.info).mean(axis=1)
+        return resample(mixed, self.info.sample_rate, sampling_rate)
+
+    def windows(self, window_seconds: float = 600.0, overlap_seconds: float = 30.0,
+                sampling_rate: int = SAMPLE_RATE, channel: Optional[int] = None,
+                split_channels: bool = False) -> Iterator[AudioWindow]:
+        """Decode the recording one overlapping window at a time.
+
+        Each window maps only its own frames (plus a few for the resampler
+        to settle) and drops the mapping before the next one, so neither
+        RSS nor the float32 buffers grow with the recording length.
+        channel=None mixes to mono; split_channels yields (n, channels).
+        """
+        if channel is not None and not 0 <= channel < self.channels:
+            raise IndexError(f"{self.path} has {self.channels} channel(s), no channel {channel}")
+        rate = self.info.sample_rate
+        total = self.info.frames
+        g = math.gcd(rate, sampling_rate)
+        up, down = sampling_rate // g, rate // g
+        # Window edges on multiples of `down` land exactly on output samples
+        def align(frames: float) -> int:
+            return max(down, int(frames) // down * down)
+        window = align(window_seconds * rate)
+        overlap = min(align(overlap_seconds * rate), window - down) if overlap_seconds else 0
+        step = window - overlap
+        # Resampler context read either side and trimmed, so seams are sample-exact
+        reach = -(-RESAMPLE_HALF_WIDTH * max(up, down) // up) + 1
+        context = -(-reach // down) * down
+
+        index = 0
+        start = 0
+        while True:
+            end = min(start + window, total)
+            lo = max(0, start - context)
+            hi = min(total, end + context)
+            frames = map_wav(self.path, self.info, lo, hi)
+            if channel is not None:
+                raw = to_float32(frames[:, channel], self.info)
+            elif split_channels:
+                raw = to_float32(frames, self.info)
+            else:
+                raw = to_float32(frames, self.info).mean(axis=1)
+            # Drop the mapping now, not when the generator is next resumed
+            del frames
+            out = resample(raw, rate, sampling_rate)
+            first = (start - lo) * up // down
+            samples = out[first:first + (end - start) * up // down]
+
+            last = end >= total
+            yield AudioWindow(
+                index=index,
+                start=start / rate,
+                own_start=(start + overlap // 2) / rate if index else 0.0,
+                own_end=total / rate if last else (end - overlap + overlap // 2) / rate,
+                samples=samples,
+                sample_rate=sampling_rate
+            )
+            if last:
+                return
+            index += 1
+            start += step
+
+    def close(self):
+        # Dropping the memmap unmaps the file
+        self.frames = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@lru_cache(maxsize=16)
+def _polyphase_filter(up: int, down: int) -> np.ndarray:
+    """Kaiser-windowed sinc low-pass, split into `up` phases: (up, taps_per_phase)"""
+    factor = max(up, down)
+    length = 2 * RESAMPLE_HALF_WIDTH * factor + 1
+    t = np.arange(length) - (length - 1) / 2
+    h = np.sinc(t / factor) * np.kaiser(length, RESAMPLE_BETA)
+    h *= up / h.sum()
+    taps = -(-length // up)
+    h = np.concatenate([h, np.zeros(taps * up - length)])
+    # phases[p, k] = h[p + k * up]
+    return h.reshape(taps, up).T.astype(np.float32).copy()
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Polyphase rational resampling along axis 0.
+
+    Only the output samples are computed: each one is a dot product of
+    taps_per_phase input samples with the filter phase it lands on, so
+    8 kHz -> 16 kHz costs about 17 multiply-adds per output sample.
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if src_rate == dst_rate or len(samples) == 0:
+        return samples
+    g = math.gcd(src_rate, dst_rate)
+    up, down = dst_rate // g, src_rate // g
+    phases = _polyphase_filter(up, down)
+    taps = phases.shape[1]
+    # Centre of the filter, so output sample 0 lines up with input sample 0
+    delay = RESAMPLE_HALF_WIDTH * max(up, down)
+
+    out_len = -(-len(samples) * up // down)
+    last_base = ((out_len - 1) * down + delay) // up
+    padded = np.concatenate([
+        np.zeros((taps,) + samples.shape[1:], dtype=np.float32),
+        samples,
+        np.zeros((max(last_base + 1 - len(samples), 0),) + samples.shape[1:], dtype=np.float32)
+    ])
+    out = np.empty((out_len,) + samples.shape[1:], dtype=np.float32)
+    # Outputs n0, n0 + up, n0 + 2*up, ... share one filter phase and read
+    # input samples `down` apart, so each is a strided slice, never a gather
+    for n0 in range(min(up, out_len)):
+        position = n0 * down + delay
+        phase = phases[position % up]
+        first = position // up + taps
+        count = len(range(n0, out_len, up))
+        span = (count - 1) * down + 1
+        acc = np.zeros((count,) + samples.shape[1:], dtype=np.float32)
+        for k in range(taps):
+            acc += phase[k] * padded[first - k:first - k + span:down]
+        out[n0::up] = acc
+    return out
+
+
+def iter_windows(path: Union[str, Path], window_seconds: float = 600.0,
+                 overlap_seconds: float = 30.0, sampling_rate: int = SAMPLE_RATE,
+                 channel: Optional[int] = None, split_channels: bool = False) -> Iterator[AudioWindow]:
+    """ChannelSource(path).windows(...) that closes the source when exhausted"""
+    with ChannelSource(path) as source:
+        yield from source.windows(window_seconds, overlap_seconds, sampling_rate,
+                                  channel, split_channels)
+
+
+def load_audio(path: Union[str, Path], sampling_rate: int = SAMPLE_RATE,
+               split_stereo: bool = False):
+    """decode_audio() replacement: float32 at sampling_rate, decoded in-process.
+
+    Mono (channels averaged) by default; split_stereo returns (left, right)
+    like faster-whisper's decode_audio. Non-WAV or exotic encodings go
+    through PyAV via decode_audio.
+    """
+    try:
+        source = ChannelSource(path)
+    except ValueError:
+        from faster_whisper import decode_audio
+        return decode_audio(str(path), sampling_rate=sampling_rate, split_stereo=split_stereo)
+
+    with source:
+        if split_stereo:
+            return source.stereo(sampling_rate)
+        return source.mono(sampling_rate)
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+SCREAM Benchmark Suite
+Runs one fixed corpus through a matrix of engine settings on CPU with a
+small model and records, per configuration:
+    rtf            - processing seconds per audio second (lower is faster)
+    files_per_hour - throughput at that speed
+    peak_rss_mb    - peak resident memory of the process that ran it
+    wer            - word error rate against reference text
+
+Each configuration runs in a fresh process (so peak RSS is its own and no
+model state carries over) after one untimed warm-up file. The corpus
+defaults to a scream_synth.py corpus with a fixed seed, so every revision
+is measured on the same bytes. Reference text is read from
+--references (<orkuid>.txt); without it WER is measured against the
+baseline configuration's own transcripts, i.e. how far each setting drifts
+from production output.
+
+Reports are JSON + CSV stamped with the git revision. --compare diffs two
+reports and exits non-zero on a regression; --rev measures an older
+checkout (a detached worktree) with this revision's harness.
+
+Usage:
+    scream bench                                  # one-at-a-time matrix, synthetic corpus
+    scream bench --matrix full --corpus wav/ --references refs/
+    scream bench --rev HEAD~5 --baseline bench_results/latest.json
+    scream bench --compare old.json new.json
+"""
+
+import os
+import re
+import csv
+import sys
+import json
+import time
+import inspect
+import argparse
+import resource
+import itertools
+import subprocess
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+RESULTS_DIR = "bench_results"
+CORPUS_DIR = "bench_corpus"
+TINY_MODEL = "models/faster-whisper-tiny-ct2"
+
+# Production settings; every other configuration is measured against these
+BASELINE = {
+    'beam_size': 5,
+    'vad_filter': False,
+    'without_timestamps': False,
+    'compute_type': "int8_float16",
+    'condition_on_previous_text': True,
+}
+
+# The values each setting is benchmarked at
+AXES = {
+    'beam_size': [5, 1],
+    'vad_filter': [False, True],
+    'without_timestamps': [False, True],
+    'compute_type': ["int8_float16", "float16"],
+    'condition_on_previous_text': [True, False],
+}
+
+# Fixed, small and deterministic: a few minutes of audio in total
+CORPUS_SPEC = dict(calls=12, seed=2024, duration_median=40.0, duration_sigma=0.6,
+                   min_duration=10.0, max_duration=120.0)
+
+# A change counts as a regression past these
+RTF_TOLERANCE = 0.10
+WER_TOLERANCE = 0.02
+RSS_TOLERANCE = 0.15
+
+CSV_FIELDS = ['name', 'revision'] + list(BASELINE) + [
+    'effective_compute_type', 'files', 'audio_seconds', 'wall_seconds', 'rtf',
+    'files_per_hour', 'peak_rss_mb', 'wer', 'reference_words', 'errors']
+
+
+def config_name(config: dict) -> str:
+    """Short stable label, e.g. beam1_int8_float16_vad_nots"""
+    name = f"beam{config['beam_size']}_{config['compute_type']}"
+    if config['vad_filter']:
+        name += "_vad"
+    if config['without_timestamps']:
+        name += "_nots"
+    if not config['condition_on_previous_text']:
+        name += "_nocond"
+    return name
+
+
+def build_matrix(kind: str = "oat") -> List[dict]:
+    """'oat': baseline plus one setting changed at a time; 'full': every combination"""
+    if kind == "full":
+        configs = [dict(zip(AXES, values)) for values in itertools.product(*AXES.values())]
+    elif kind == "oat":
+        configs = [dict(BASELINE)]
+        for axis, values in AXES.items():
+            for value in values:
+                if value != BASELINE[axis]:
+                    configs.append(dict(BASELINE, **{axis: value}))
+    else:
+        raise ValueError(f"Unknown matrix: {kind}")
+    return configs
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercase words without punctuation; digits and apostrophes kept"""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_errors(reference: List[str], hypothesis: List[str]) -> int:
+    """Substitutions + deletions + insertions (word-level Levenshtein)"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref in enumerate(reference, 1):
+        current = [i] + [0] * len(hypothesis)
+        for j, hyp in enumerate(hypothesis, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (ref != hyp))
+        previous = current
+    return previous[-1]
+
+
+def corpus_wer(references: Dict[str, str], hypotheses: Dict[str, str]) -> Tuple[Optional[float], int]:
+    """Corpus WER over the files that have a reference, and the reference word count"""
+    errors = words = 0
+    for orkuid, reference in references.items():
+        ref = normalize_words(reference)
+        errors += word_errors(ref, normalize_words(hypotheses.get(orkuid, "")))
+        words += len(ref)
+    if not words:
+        # Nothing to match: any output at all is an insertion
+        inserted = sum(len(normalize_words(hypotheses.get(k, ""))) for k in references)
+        return (1.0 if inserted else 0.0) if references else None, 0
+    return round(errors / words, 4), words
+
+
+def git_revision(tree: Optional[str] = None) -> dict:
+    """Commit of the checkout being measured (this file's by default)"""
+    tree = tree or os.path.dirname(os.path.abspath(__file__))
+
+    def git(*args) -> str:
+        out = subprocess.run(['git', '-C', tree] + list(args), capture_output=True, text=True)
+        return out.stdout.strip()
+    return {
+        'commit': git('rev-parse', 'HEAD'),
+        'describe': git('describe', '--always', '--dirty') or "unknown",
+        'subject': git('log', '-1', '--format=%s'),
+    }
+
+
+def ensure_corpus(path: str) -> str:
+    """Generate the fixed synthetic corpus unless it's already there"""
+    from scream_synth import CorpusSpec, generate_corpus
+    spec = CorpusSpec(**CORPUS_SPEC)
+    manifest = os.path.join(path, "manifest.json")
+    if os.path.exists(manifest):
+        with open(manifest) as f:
+            if json.load(f).get('spec') == json.loads(json.dumps(spec.__dict__)):
+                return path
+    print(f"Generating benchmark corpus in {path} ({spec.calls} calls, seed {spec.seed})...")
+    generate_corpus(path, spec)
+    return path
+
+
+def corpus_files(path: str, limit: int = 0) -> List[str]:
+    files = sorted(str(p) for p in Path(path).rglob("*.wav"))
+    return files[:limit] if limit else files
+
+
+def load_references(directory: Optional[str], paths: List[str]) -> Dict[str, str]:
+    """Reference transcripts named <orkuid>.txt for the recordings being benchmarked"""
+    references = {}
+    if not directory:
+        return references
+    for path in paths:
+        orkuid = Path(path).stem
+        reference = Path(directory) / f"{orkuid}.txt"
+        if reference.exists():
+            references[orkuid] = reference.read_text(encoding='utf-8')
+    return references
+
+
+def run_config(config: dict, paths: List[str], model: str, cpu_threads: int,
+               tree: Optional[str] = None) -> dict:
+    """Runs in a child process: warm up, then transcribe every file with one configuration"""
+    if tree:
+        # Measure another checkout's engine with this harness
+        sys.path.insert(0, tree)
+    from scream_engine import AudioFile, WhisperEngine
+
+    accepted = inspect.signature(WhisperEngine.__init__).parameters
+    options = {k: v for k, v in config.items() if k in accepted}
+    engine = WhisperEngine(model, device="cpu", cpu_threads=cpu_threads, **options)
+    audios = [AudioFile(path=Path(p), size=os.path.getsize(p), format=".wav") for p in paths]
+
+    # Model load and first-call allocation stay out of the timing
+    engine.process(audios[0])
+    start = time.time()
+    results = [engine.process(audio) for audio in audios]
+    wall = time.time() - start
+
+    inner = getattr(engine.model, 'model', None)
+    return {
+        'wall_seconds': round(wall, 3),
+        # ru_maxrss is KiB on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'effective_compute_type': getattr(inner, 'compute_type', config['compute_type']),
+        'ignored': sorted(set(config) - set(options)),
+        'errors': sum(1 for r in results if r.error),
+        'texts': {r.source.path.stem: r.text for r in results},
+    }
+
+
+def measure(config: dict, paths: List[str], args, tree: Optional[str] = None) -> dict:
+    """run_config() in a fresh interpreter; returns its JSON"""
+    with tempfile.TemporaryDirectory(prefix="scream_bench_") as scratch:
+        job = os.path.join(scratch, "job.json")
+        out = os.path.join(scratch, "result.json")
+        with open(job, 'w') as f:
+            json.dump({'config': config, 'paths': paths, 'model': args.model,
+                       'cpu_threads': args.cpu_threads, 'tree': tree}, f)
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-one', job, out],
+                              capture_output=True, text=True)
+        if proc.returncode != 0 or not os.path.exists(out):
+            raise RuntimeError(f"{config_name(config)} failed:\n{proc.stderr[-2000:]}")
+        with open(out) as f:
+            return json.load(f)
+
+
+def run_bench(args) -> dict:
+    from scream_audio import read_wav_header
+
+    corpus = args.corpus or ensure_corpus(CORPUS_DIR)
+    paths = corpus_files(corpus, args.limit)
+    if not paths:
+        raise SystemExit(f"No recordings in {corpus}")
+    audio_seconds = sum(read_wav_header(p).duration for p in paths)
+
+    tree = None
+    revision = git_revision()
+    if args.rev:
+        tree = tempfile.mkdtemp(prefix="scream_bench_rev_")
+        subprocess.run(['git', '-C', os.path.dirname(os.path.abspath(__file__)), 'worktree', 'add',
+                        '--detach', tree, args.rev], check=True, capture_output=True)
+        revision = git_revision(tree)
+
+    configs = build_matrix(args.matrix)
+    references = load_references(args.references, paths)
+    reference_source = "files" if references else f"config:{config_name(BASELINE)}"
+
+    print("=" * 78)
+    print(f"SCREAM BENCH - {revision['describe']} - {len(paths)} files, "
+          f"{audio_seconds / 60:.1f} min, {len(configs)} configs, model {args.model}")
+    print("=" * 78)
+    print(f"{'Config':<40} {'RTF':>7} {'files/h':>9} {'RSS MB':>8}")
+
+    rows = []
+    texts = {}
+    try:
+        for config in configs:
+            result = measure(config, paths, args, tree)
+            name = config_name(config)
+            texts[name] = result.pop('texts')
+            wall = result['wall_seconds']
+            rows.append(dict(
+                name=name, revision=revision['describe'], **config,
+                effective_compute_type=result['effective_compute_type'],
+                files=len(paths), audio_seconds=round(audio_seconds, 1), wall_seconds=wall,
+                rtf=round(wall / audio_seconds, 4) if audio_seconds else 0,
+                files_per_hour=round(len(paths) / (wall / 3600), 1) if wall > 0 else 0,
+                peak_rss_mb=result['peak_rss_mb'], wer=None, reference_words=0,
+                errors=result['errors'], ignored=result['ignored']))
+            row = rows[-1]
+            print(f"{name:<40} {row['rtf']:>7.3f} {row['files_per_hour']:>9.0f} "
+                  f"{row['peak_rss_mb']:>8.0f}" + (f"  (ignored {', '.join(row['ignored'])})"
+                                                   if row['ignored'] else ""))
+    finally:
+        if tree:
+            subprocess.run(['git', '-C', os.path.dirname(os.path.abspath(__file__)), 'worktree',
+                            'remove', '--force', tree], capture_output=True)
+
+    if not references:
+        references = texts.get(config_name(BASELINE), {})
+    for row in rows:
+        row['wer'], row['reference_words'] = corpus_wer(references, texts[row['name']])
+    print(f"\nWER against {reference_source}: " + ", ".join(
+        f"{row['name']} {row['wer']:.1%}" for row in rows if row['wer'] is not None))
+
+    return {
+        'revision': revision,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'model': args.model,
+        'cpu_threads': args.cpu_threads,
+        'corpus': {'path': corpus, 'files': len(paths), 'audio_seconds': round(audio_seconds, 1)},
+        'wer_reference': reference_source,
+        'results': rows,
+        'transcripts': texts,
+    }
+
+
+def save_report(report: dict, output: Optional[str] = None) -> str:
+    """<output>.json plus <output>.csv; default name carries time and revision"""
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"bench_{stamp}_{report['revision']['describe']}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    with open(os.path.splitext(output)[0] + ".csv", 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(report['results'])
+    return output
+
+
+def compare_reports(old: dict, new: dict) -> List[str]:
+    """Print a per-configuration diff; returns the regressions found"""
+    print("=" * 78)
+    print(f"BENCH DIFF - {old['revision']['describe']} -> {new['revision']['describe']}")
+    print("=" * 78)
+    if old.get('corpus', {}).get('files') != new.get('corpus', {}).get('files'):
+        print("Warning: the two reports used different corpora")
+    print(f"{'Config':<40} {'RTF':>18} {'files/h':>9} {'RSS':>8} {'WER':>8}")
+
+    def change(a, b):
+        return (b - a) / a if a else 0.0
+
+    before = {row['name']: row for row in old['results']}
+    regressions = []
+    for row in new['results']:
+        base = before.get(row['name'])
+        if not base:
+            print(f"{row['name']:<40} (new)")
+            continue
+        rtf = change(base['rtf'], row['rtf'])
+        rss = change(base['peak_rss_mb'], row['peak_rss_mb'])
+        wer = (row['wer'] or 0) - (base['wer'] or 0)
+        flags = []
+        if rtf > RTF_TOLERANCE:
+            flags.append(f"rtf +{rtf:.0%}")
+        if rss > RSS_TOLERANCE:
+            flags.append(f"rss +{rss:.0%}")
+        if wer > WER_TOLERANCE:
+            flags.append(f"wer +{wer:.1%}")
+        if flags:
+            regressions.append(f"{row['name']}: {', '.join(flags)}")
+        print(f"{row['name']:<40} {base['rtf']:>6.3f}->{row['rtf']:<6.3f}{rtf:>+4.0%} "
+              f"{change(base['files_per_hour'], row['files_per_hour']):>+9.0%} {rss:>+8.0%} "
+              f"{wer:>+8.1%}" + ("  REGRESSION" if flags else ""))
+    print(f"\n{len(regressions)} regression(s)" if regressions else "\nNo regressions")
+    return regressions
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--corpus', help=f'Recordings to use (default: synthetic {CORPUS_DIR}/)')
+    parser.add_argument('--references', help='Directory of <orkuid>.txt reference transcripts')
+    parser.add_argument('-m', '--model', default=TINY_MODEL if os.path.isdir(TINY_MODEL) else "tiny",
+                        help='Model path or size name (default: tiny)')
+    parser.add_argument('--matrix', default='oat', choices=['oat', 'full'],
+                        help='oat: one setting at a time (default); full: every combination')
+    parser.add_argument('--cpu-threads', type=int, default=4, help='CTranslate2 threads')
+    parser.add_argument('--limit', type=int, default=0, help='Use only the first N recordings')
+    parser.add_argument('--rev', help='Benchmark this git revision instead of the working tree')
+    parser.add_argument('--baseline', help='Report to diff this run against')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help='Diff two saved reports and exit')
+    parser.add_argument('-o', '--output', help='Report path (.json; .csv written alongside)')
+
+
+def cmd_bench(args) -> int:
+    if args.compare:
+        with open(args.compare[0]) as f:
+            old = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        return 1 if compare_reports(old, new) else 0
+
+    report = run_bench(args)
+    output = save_report(report, args.output)
+    print(f"Report saved to: {output} (+ .csv)")
+    if args.baseline:
+        with open(args.baseline) as f:
+            return 1 if compare_reports(json.load(f), report) else 0
+    return 0
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--run-one':
+        with open(sys.argv[2]) as f:
+            job = json.load(f)
+        result = run_config(job['config'], job['paths'], job['model'], job['cpu_threads'], job['tree'])
+        with open(sys.argv[3], 'w') as f:
+            json.dump(result, f)
+        return 0
+
+    parser = argparse.ArgumentParser(description="Benchmark engine settings on a fixed corpus")
+    add_arguments(parser)
+    return cmd_bench(parser.parse_args())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
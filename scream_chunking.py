@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+SCREAM Long-File Chunking
+Splits very long recordings (conference bridges, 90-minute calls) at VAD
+silence boundaries, transcribes the chunks batched on one model or in
+parallel threads, and stitches them back with global timestamps.
+
+transcribe_windows() does the same over overlapping windows read from the
+WAV one at a time, for recordings too long to decode into memory at once.
+"""
+
+import re
+import time
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+from faster_whisper import BatchedInferencePipeline
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from scream_audio import iter_windows, load_audio, read_wav_header
+
+logger = logging.getLogger("SCREAM")
+
+SAMPLE_RATE = 16000
+
+
+@dataclass
+class ChunkInfo:
+    """Stand-in for faster-whisper TranscriptionInfo on stitched results"""
+    # As detected by the model (or forced); None if nothing was decoded
+    language: Optional[str]
+    duration: float
+    chunks: int = 0
+
+
+def wav_duration(path: str) -> Optional[float]:
+    """Duration from the WAV header, or None if it can't be read cheaply"""
+    # read_wav_header, unlike the wave module, also understands μ-law/A-law
+    try:
+        return read_wav_header(path).duration
+    except (OSError, ValueError):
+        return None
+
+
+def plan_chunks(speech: List[dict], max_samples: int, total_samples: int) -> List[dict]:
+    """Group VAD speech regions into chunks, cutting only in the silences.
+
+    Each chunk is {'start', 'end'} in samples and owns the range up to the
+    midpoint of the silence before the next chunk. A single speech region
+    longer than max_samples is split hard.
+    """
+    chunks = []
+    current = None
+    for region in speech:
+        start, end = region['start'], region['end']
+        while end - start > max_samples:
+            if current:
+                chunks.append(current)
+                current = None
+            chunks.append({'start': start, 'end': start + max_samples})
+            start += max_samples
+        if current and end - current['start'] <= max_samples:
+            current['end'] = end
+            continue
+        if current:
+            chunks.append(current)
+        current = {'start': start, 'end': end}
+    if current:
+        chunks.append(current)
+
+    # Cut points: middle of each gap, so every sample belongs to one chunk
+    for previous, following in zip(chunks, chunks[1:]):
+        cut = (previous['end'] + following['start']) // 2
+        previous['own_end'] = cut
+        following['own_start'] = cut
+    if chunks:
+        chunks[0]['own_start'] = 0
+        chunks[-1]['own_end'] = total_samples
+    return chunks
+
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def stitch_segments(chunk_results: List[tuple]) -> List[dict]:
+    """Merge per-chunk segments (already in call time) into one list.
+
+    chunk_results: [(own_start_s, own_end_s, segments), ...] in chunk order.
+    Segments whose midpoint falls outside the owning chunk are dropped
+    (they were decoded from the overlap), and a segment that repeats the
+    words at the end of the previous one across a seam is trimmed.
+    """
+    stitched = []
+    for own_start, own_end, segments in chunk_results:
+        first = True
+        for segment in segments:
+            middle = (segment['start'] + segment['end']) / 2
+            if not own_start <= middle < own_end:
+                continue
+            if first and stitched:
+                segment = _trim_seam(stitched[-1], segment)
+                if segment is None:
+                    continue
+            first = False
+            stitched.append(segment)
+    return stitched
+
+
+def _trim_seam(previous: dict, segment: dict) -> Optional[dict]:
+    """Drop words at the start of segment that repeat the end of previous"""
+    before = _words(previous['text'])
+    after = segment['text'].split()
+    after_words = _words(segment['text'])
+    if not after_words:
+        return None
+    longest = 0
+    for size in range(min(len(before), len(after_words)), 0, -1):
+        if before[-size:] == after_words[:size]:
+            longest = size
+            break
+    if longest == 0:
+        return segment
+    if longest >= len(after):
+        return None
+    return dict(segment, text=' '.join(after[longest:]))
+
+
+class ChunkedTranscriber:
+    """Transcribe one long recording as VAD-bounded chunks"""
+
+    def __init__(self, model, mode: str = "batched", chunk_seconds: float = 30.0,
+                 workers: int = 4, batch_size: int = 8, overlap_seconds: float = 0.5,
+                 beam_size: int = 1, language: str = "en"):
+        if mode not in ("batched", "parallel"):
+            raise ValueError(f"Unknown chunk mode: {mode}")
+        self.model = model
+        self.mode = mode
+        # Batched chunks must fit the model's 30s window
+        self.chunk_seconds = min(chunk_seconds, 30.0) if mode == "batched" else chunk_seconds
+        self.workers = workers
+        self.batch_size = batch_size
+        self.overlap_seconds = overlap_seconds
+        self.beam_size = beam_size
+        self.language = language
+
+    def transcribe(self, audio):
+        """Returns (segments, ChunkInfo); segments are dicts in call time"""
+        start_time = time.time()
+        samples = load_audio(audio, sampling_rate=SAMPLE_RATE) if isinstance(audio, str) else audio
+        segments, chunks, language = self._transcribe_samples(samples)
+        info = ChunkInfo(language=language, duration=len(samples) / SAMPLE_RATE, chunks=chunks)
+
+        logger.info(f"Chunked {info.duration / 60:.1f} min into {chunks} chunks "
+                    f"({self.mode}) in {time.time() - start_time:.1f}s")
+        return segments, info
+
+    def transcribe_windows(self, path: str, window_seconds: float = 600.0,
+                           overlap_seconds: float = 30.0, channel: Optional[int] = None):
+        """Like transcribe(), but reads and decodes the WAV one window at a time.
+
+        Only one window of samples is alive at once; segments are kept when
+        their midpoint falls in the window's owned range and stitched across
+        the overlaps. Returns (segments, ChunkInfo).
+        """
+        start_time = time.time()
+        info = ChunkInfo(language=self.language, duration=0.0)
+        windows = 0
+        languages = Counter()
+
+        def window_results():
+            nonlocal windows
+            for window in iter_windows(path, window_seconds, overlap_seconds,
+                                       SAMPLE_RATE, channel):
+                segments, chunks, language = self._transcribe_samples(window.samples)
+                info.chunks += chunks
+                if language:
+                    languages[language] += chunks
+                info.duration = window.end
+                windows += 1
+                yield window.own_start, window.own_end, [
+                    dict(s, start=s['start'] + window.start, end=s['end'] + window.start)
+                    for s in segments
+                ]
+
+        segments = stitch_segments(window_results())
+        if languages:
+            info.language = languages.most_common(1)[0][0]
+        logger.info(f"Chunked {info.duration / 60:.1f} min in {windows} windows, "
+                    f"{info.chunks} chunks ({self.mode}) in {time.time() - start_time:.1f}s")
+        return segments, info
+
+    def _transcribe_samples(self, samples):
+        """VAD-chunk and decode one array; returns (segments, chunk count, language)"""
+        speech = get_speech_timestamps(samples, VadOptions(min_silence_duration_ms=500,
+                                                           speech_pad_ms=100))
+        chunks = plan_chunks(speech, int(self.chunk_seconds * SAMPLE_RATE), len(samples))
+        if not chunks:
+            return [], 0, self.language
+
+        if self.mode == "batched":
+            segments, language = self._transcribe_batched(samples, chunks)
+        else:
+            segments, language = self._transcribe_parallel(samples, chunks)
+        return segments, len(chunks), language
+
+    def _transcribe_batched(self, samples, chunks: List[dict]):
+        """One model, chunks decoded side by side in batches -> (segments, language)"""
+        pipeline = BatchedInferencePipeline(model=self.model)
+        segments, info = pipeline.transcribe(
+            samples,
+            language=self.language,
+            beam_size=self.beam_size,
+            batch_size=self.batch_size,
+            clip_timestamps=[{'start': c['start'], 'end': c['end']} for c in chunks],
+            without_timestamps=False
+        )
+        # Clips never overlap in batched mode, so times are already global
+        segments = [{'start': s.start, 'end': s.end, 'text': s.text.strip()} for s in segments]
+        return segments, info.language
+
+    def _transcribe_parallel(self, samples, chunks: List[dict]):
+        """Chunks decoded concurrently (model needs num_workers > 1) -> (segments, language)"""
+        overlap = int(self.overlap_seconds * SAMPLE_RATE)
+
+        def run(chunk):
+            clip_start = max(0, chunk['start'] - overlap)
+            clip_end = min(len(samples), chunk['end'] + overlap)
+            segments, info = self.model.transcribe(
+                samples[clip_start:clip_end],
+                language=self.language,
+                beam_size=self.beam_size,
+                condition_on_previous_text=False,
+                vad_filter=True
+            )
+            offset = clip_start / SAMPLE_RATE
+            return [{'start': offset + s.start, 'end': offset + s.end, 'text': s.text.strip()}
+                    for s in segments], info.language
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(run, chunks))
+
+        # Each chunk detects on its own; report the language most chunks agree on
+        language = Counter(language for _, language in results).most_common(1)[0][0]
+        return stitch_segments([
+            (chunk['own_start'] / SAMPLE_RATE, chunk['own_end'] / SAMPLE_RATE, segments)
+            for chunk, (segments, _) in zip(chunks, results)
+        ]), language
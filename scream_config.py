@@ -20,6 +20,9 @@ class SourceConfig:
     formats: List[str] = None
     watch_interval: int = 5
     recursive: bool = False
+    # SQLite cache of header probes (decoder route, mono/stereo) per orkuid, e.g.
+    # "probe_index.db"; "" = off (nothing is written unless a path is set)
+    probe_index: str = ""
     
     def __post_init__(self):
         if self.formats is None:
@@ -34,9 +37,47 @@ class EngineConfig:
     device: str = "cuda"
     compute_type: str = "int8_float16"
     beam_size: int = 5
+    # Decode options for files transcribed in one pass
+    vad_filter: bool = False
+    without_timestamps: bool = False
+    condition_on_previous_text: bool = True
     language: Optional[str] = None
     batch_size: int = 1
     num_workers: int = 1
+    normalize_numbers: bool = True
+    # Cascade mode (type: cascade): small model triages, large model escalates
+    triage_model_path: str = "models/faster-whisper-tiny-ct2"
+    triage_device: str = "cpu"
+    triage_compute_type: str = "int8"
+    cascade_min_keywords: int = 1
+    cascade_min_digit_runs: int = 1
+    cascade_min_speech_seconds: float = 5.0
+    # CPU farm mode (type: cpu_farm): 0 = size from os.cpu_count()
+    cpu_workers: int = 0
+    cpu_threads_per_worker: int = 0
+    # Long files (>= long_file_seconds, 0 = off) are split at VAD silences;
+    # chunk_mode "batched" decodes chunks in batches of chunk_batch_size on one model,
+    # "parallel" runs chunk_workers concurrent decodes
+    long_file_seconds: float = 1800
+    chunk_mode: str = "batched"
+    chunk_seconds: float = 30.0
+    chunk_workers: int = 4
+    chunk_batch_size: int = 8
+    # Files longer than window_seconds (0 = off) are read, decoded and chunked one
+    # overlapping window at a time, so peak memory doesn't grow with call length
+    window_seconds: float = 1800
+    window_overlap_seconds: float = 30.0
+    # Stereo files: "mix" averages the channels, "speakers" decodes both
+    # channels in one batch and labels segments left/right
+    stereo_mode: str = "mix"
+    left_speaker: str = "UNDERWRITER"
+    right_speaker: str = "BROKER"
+    # Energy-VAD triage on native samples before any model work; files with
+    # too little speech are skipped (or deferred), the rest decode only speech
+    vad_triage: bool = False
+    vad_triage_min_speech_seconds: float = 2.0
+    vad_triage_min_speech_ratio: float = 0.02
+    vad_triage_action: str = "skip"
 
 
 @dataclass
@@ -49,6 +90,23 @@ class SinkConfig:
     include_metadata: bool = False
 
 
+@dataclass
+class ProfileConfig:
+    """Configuration for profiling hooks (see scream_profile)"""
+    # "off", "sample" (stack sampler, .folded) or "deterministic" (cProfile, .prof)
+    mode: str = "off"
+    output_dir: str = "profiles"
+    # Stages to profile; empty = every stage
+    stages: List[str] = None
+    sample_interval_ms: float = 5.0
+    # Always-on per-orkuid span traces; "" = off
+    trace_file: str = "scream_traces.jsonl"
+    
+    def __post_init__(self):
+        if self.stages is None:
+            self.stages = []
+
+
 @dataclass
 class PipelineConfig:
     """Main pipeline configuration"""
@@ -57,6 +115,11 @@ class PipelineConfig:
     sink: SinkConfig
     continuous: bool = False
     log_level: str = "INFO"
+    profile: ProfileConfig = None
+    
+    def __post_init__(self):
+        if self.profile is None:
+            self.profile = ProfileConfig()
     
     @classmethod
     def from_dict(cls, data: dict):
@@ -66,7 +129,8 @@ class PipelineConfig:
             engine=EngineConfig(**data.get('engine', {})),
             sink=SinkConfig(**data.get('sink', {})),
             continuous=data.get('continuous', False),
-            log_level=data.get('log_level', 'INFO')
+            log_level=data.get('log_level', 'INFO'),
+            profile=ProfileConfig(**data.get('profile', {}))
         )
     
     def to_dict(self) -> dict:
@@ -76,7 +140,8 @@ class PipelineConfig:
             'engine': asdict(self.engine),
             'sink': asdict(self.sink),
             'continuous': self.continuous,
-            'log_level': self.log_level
+            'log_level': self.log_level,
+            'profile': asdict(self.profile)
         }
 
 
@@ -165,12 +230,23 @@ class ConfigLoader:
         env_map = {
             'SCREAM_SOURCE_PATH': ('source', 'path'),
             'SCREAM_SOURCE_FORMATS': ('source', 'formats'),
+            'SCREAM_PROBE_INDEX': ('source', 'probe_index'),
+            'SCREAM_ENGINE_TYPE': ('engine', 'type'),
+            'SCREAM_CPU_WORKERS': ('engine', 'cpu_workers'),
+            'SCREAM_CPU_THREADS': ('engine', 'cpu_threads_per_worker'),
             'SCREAM_ENGINE_DEVICE': ('engine', 'device'),
             'SCREAM_ENGINE_MODEL': ('engine', 'model_path'),
+            'SCREAM_STEREO_MODE': ('engine', 'stereo_mode'),
+            'SCREAM_VAD_TRIAGE': ('engine', 'vad_triage'),
             'SCREAM_SINK_PATH': ('sink', 'path'),
             'SCREAM_SINK_FORMAT': ('sink', 'format'),
             'SCREAM_CONTINUOUS': ('continuous',),
-            'SCREAM_LOG_LEVEL': ('log_level',)
+            'SCREAM_LOG_LEVEL': ('log_level',),
+            'SCREAM_PROFILE': ('profile', 'mode'),
+            'SCREAM_PROFILE_DIR': ('profile', 'output_dir'),
+            'SCREAM_PROFILE_STAGES': ('profile', 'stages'),
+            'SCREAM_PROFILE_INTERVAL_MS': ('profile', 'sample_interval_ms'),
+            'SCREAM_TRACE_FILE': ('profile', 'trace_file')
         }
         
         for env_var, path in env_map.items():
@@ -179,8 +255,14 @@ class ConfigLoader:
                 # Convert value type
                 if env_var == 'SCREAM_SOURCE_FORMATS':
                     value = value.split(',')
-                elif env_var == 'SCREAM_CONTINUOUS':
+                elif env_var == 'SCREAM_PROFILE_STAGES':
+                    value = [stage for stage in value.split(',') if stage]
+                elif env_var in ('SCREAM_CONTINUOUS', 'SCREAM_VAD_TRIAGE'):
                     value = value.lower() in ['true', '1', 'yes']
+                elif env_var in ('SCREAM_CPU_WORKERS', 'SCREAM_CPU_THREADS'):
+                    value = int(value)
+                elif env_var == 'SCREAM_PROFILE_INTERVAL_MS':
+                    value = float(value)
                     
                 # Set in config dict
                 self._set_nested(config, path, value)
@@ -251,7 +333,12 @@ def create_example_config():
             'include_metadata': True
         },
         'continuous': False,
-        'log_level': 'INFO'
+        'log_level': 'INFO',
+        'profile': {
+            'mode': 'off',
+            'output_dir': 'profiles',
+            'trace_file': 'scream_traces.jsonl'
+        }
     }
     
     with open('scream.yaml.example', 'w') as f:
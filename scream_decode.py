@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+SCREAM Process-Pool Decode Stage
+Decoding and resampling used to run inside model.transcribe(path), on the
+same thread that drives inference, so every worker alternated CPU decode
+with model compute. DecodeStage moves that work to a ProcessPoolExecutor:
+each job (optionally fetches and) decodes a file to 16 kHz float32 and
+writes the samples into a SharedMemory block. Only the block name and
+length cross the process boundary, so no sample arrays are pickled.
+
+The inference side only ever sees a ready NumPy array.
+
+Blocks that are decoded but never released (cancelled work, a consumer
+that stopped early) are unlinked when the stage closes.
+
+Usage:
+    with DecodeStage(workers=4) as stage:
+        for path, future in stage.stream(paths):
+            with future.result() as decoded:
+                model.transcribe(decoded.samples)
+"""
+
+import atexit
+import ctypes
+import multiprocessing
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from scream_audio import SAMPLE_RATE, load_audio
+
+# Unlinked blocks still mapped under a live .samples view; closed once the views are gone
+_unclosed: List[shared_memory.SharedMemory] = []
+_unclosed_lock = threading.Lock()
+
+
+def _close_unused(shm: Optional[shared_memory.SharedMemory] = None):
+    """Close (unmap) every parked block that no view exports any more"""
+    with _unclosed_lock:
+        if shm is not None:
+            _unclosed.append(shm)
+        still_mapped = []
+        for block in _unclosed:
+            try:
+                block.close()
+            except BufferError:
+                still_mapped.append(block)
+        _unclosed[:] = still_mapped
+
+
+atexit.register(_close_unused)
+
+
+@dataclass
+class DecodedAudio:
+    """16 kHz float32 samples parked in shared memory by a decode process"""
+    name: str
+    frames: int
+    sample_rate: int = SAMPLE_RATE
+    decode_time: float = 0.0
+    path: str = ""
+    _shm: Optional[shared_memory.SharedMemory] = None
+    _on_release: Optional[Callable[["DecodedAudio"], None]] = None
+    released: bool = False
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+    def _attach(self) -> shared_memory.SharedMemory:
+        if self._shm is None:
+            self._shm = shared_memory.SharedMemory(name=self.name)
+        return self._shm
+
+    @property
+    def samples(self) -> np.ndarray:
+        """Zero-copy view on the block; the mapping lives as long as the view"""
+        # numpy keeps only a reference to the buffer's owner, not an export, so a
+        # ctypes array over the block sits in between: it holds an export for as
+        # long as any view (or view of a view) is alive, and close() refuses to
+        # unmap until it is gone
+        holder = (ctypes.c_char * (self.frames * 4)).from_buffer(self._attach().buf)
+        return np.ndarray((self.frames,), dtype=np.float32, buffer=holder)
+
+    def release(self):
+        """Unlink the block; it is unmapped once the last .samples view is dropped"""
+        if self.released:
+            return
+        self.released = True
+        if self._on_release:
+            self._on_release(self)
+        shm = self._attach()
+        shm.unlink()
+        self._shm = None
+        _close_unused(shm)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def _decode_job(source: str, sampling_rate: int, fetch: Optional[Callable[[str], str]],
+                cleanup: bool) -> Tuple[str, int, float, str]:
+    """Runs in a pool process: fetch -> decode -> copy into a new shared block"""
+    start = time.time()
+    path = fetch(source) if fetch else source
+    if not path:
+        raise IOError(f"Could not fetch {source}")
+    try:
+        samples = load_audio(path, sampling_rate=sampling_rate)
+    finally:
+        if fetch and cleanup and os.path.exists(path):
+            os.remove(path)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, samples.nbytes))
+    np.ndarray(samples.shape, dtype=np.float32, buffer=shm.buf)[:] = samples
+    # The consumer owns the block from here; stop this process's tracker unlinking it
+    resource_tracker.unregister(shm._name, "shared_memory")
+    shm.close()
+    return shm.name, len(samples), time.time() - start, path
+
+
+class DecodeStage:
+    """Decode files to 16 kHz float32 in worker processes, ahead of inference"""
+
+    def __init__(self, workers: int = 2, sampling_rate: int = SAMPLE_RATE,
+                 fetch: Optional[Callable[[str], str]] = None, cleanup: bool = True):
+        """
+        Args:
+            workers: Decode processes
+            sampling_rate: Output rate
+            fetch: Optional picklable source -> local path (e.g. an scp download),
+                run in the decode process so downloads overlap inference too
+            cleanup: Remove fetched files once decoded
+        """
+        self.workers = workers
+        self.sampling_rate = sampling_rate
+        self.fetch = fetch
+        self.cleanup = cleanup
+        # Spawned, not forked: the parent may already hold a CUDA context
+        self.executor = ProcessPoolExecutor(max_workers=workers,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        # Decoded but not yet released blocks; the pool processes no longer track them
+        self.outstanding = {}
+        self.lock = threading.Lock()
+
+    def submit(self, source: str) -> "Future[DecodedAudio]":
+        job = self.executor.submit(_decode_job, source, self.sampling_rate,
+                                   self.fetch, self.cleanup)
+        result: Future = Future()
+
+        def done(job: Future):
+            try:
+                name, frames, decode_time, path = job.result()
+            except Exception as e:
+                result.set_exception(e)
+                return
+            decoded = DecodedAudio(name, frames, self.sampling_rate, decode_time, path,
+                                   _on_release=self._forget)
+            with self.lock:
+                self.outstanding[name] = decoded
+            result.set_result(decoded)
+
+        job.add_done_callback(done)
+        return result
+
+    def decode(self, source: str) -> DecodedAudio:
+        return self.submit(source).result()
+
+    def stream(self, items: Iterable, source: Callable = lambda item: item,
+               depth: Optional[int] = None) -> Iterator[Tuple[object, "Future[DecodedAudio]"]]:
+        """(item, future) in input order with `depth` decodes kept in flight"""
+        depth = depth or self.workers * 2
+        pending = deque()
+        for item in items:
+            pending.append((item, self.submit(source(item))))
+            if len(pending) >= depth:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+
+    def _forget(self, decoded: DecodedAudio):
+        with self.lock:
+            self.outstanding.pop(decoded.name, None)
+
+    def close(self):
+        """Stop the pool and unlink every block nobody released"""
+        # wait=True also waits for the done callbacks, so outstanding is complete after it
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        with self.lock:
+            leftover = list(self.outstanding.values())
+        for decoded in leftover:
+            try:
+                decoded.release()
+            except FileNotFoundError:
+                pass
+        _close_unused()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
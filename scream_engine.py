@@ -8,15 +8,26 @@ import os
 import json
 import time
 import logging
+import multiprocessing
 from pathlib import Path
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Iterator, Optional, Dict, Any
-from queue import Queue
+from typing import Iterable, Iterator, Optional, Dict, Any
+from queue import Queue, Empty
 from threading import Thread
 
+import numpy as np
 from faster_whisper import WhisperModel
 
+from scream_numbers import SpokenNumberNormalizer
+from scream_redecode import LOAN_TOPICS, DIGIT_RUN
+from scream_chunking import ChunkInfo, ChunkedTranscriber, wav_duration
+from scream_audio import ChannelSource, iter_windows, load_audio, read_wav_header
+from scream_screenplay import StereoTranscriber, format_screenplay, group_turns
+from scream_triage import triage_file
+from scream_probe import ProbeIndex, load_probed
+from scream_profile import profiled, span
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -66,6 +77,19 @@ class Engine(ABC):
     def process(self, audio: AudioFile) -> TranscriptionResult:
         """Process an audio file and return transcription"""
         pass
+        
+    def process_many(self, audios: Iterable[AudioFile]) -> Iterator[TranscriptionResult]:
+        """Process a stream of files; engines with parallelism override this"""
+        for audio in audios:
+            yield self.process(audio)
+        
+    def report(self) -> Dict[str, Any]:
+        """Engine-specific statistics for the pipeline summary"""
+        return {}
+        
+    def close(self):
+        """Release workers or other long-lived resources"""
+        pass
 
 
 class Sink(ABC):
@@ -80,10 +104,27 @@ class Sink(ABC):
 class DirectorySource(Source):
     """Scan directory for audio files"""
     
-    def __init__(self, path: str, formats: list = None):
+    def __init__(self, path: str, formats: list = None, probe_index: Optional[str] = None,
+                 recursive: bool = False):
         self.path = Path(path)
         self.formats = formats or ['.wav', '.mp3', '.m4a', '.flac', '.ogg']
+        # Recorder layout is YYYY/MM/DD/HH/<orkuid>.wav
+        self.recursive = recursive
         self.processed = set()
+        # Header probes (decoder route, mono/stereo) cached per orkuid
+        self.probe_index_path = probe_index
+        self._probe_index = None
+        
+    def _probe(self, audio: AudioFile):
+        if not self.probe_index_path:
+            return
+        # sqlite connections stay on the thread that discovers
+        if self._probe_index is None:
+            self._probe_index = ProbeIndex(self.probe_index_path)
+        try:
+            audio.metadata['probe'] = self._probe_index.probe(audio.path)
+        except OSError as e:
+            logger.warning(f"Could not probe {audio.path.name}: {e}")
         
     def discover(self) -> Iterator[AudioFile]:
         """Scan directory and yield unprocessed audio files"""
@@ -92,7 +133,9 @@ class DirectorySource(Source):
             return
             
         for format in self.formats:
-            for audio_path in self.path.glob(f"*{format}"):
+            pattern = f"*{format}"
+            paths = self.path.rglob(pattern) if self.recursive else self.path.glob(pattern)
+            for audio_path in sorted(paths):
                 if audio_path in self.processed:
                     continue
                     
@@ -102,6 +145,7 @@ class DirectorySource(Source):
                         size=audio_path.stat().st_size,
                         format=format
                     )
+                    self._probe(audio)
                     self.processed.add(audio_path)
                     logger.info(f"Discovered: {audio_path.name}")
                     yield audio
@@ -113,11 +157,46 @@ class WhisperEngine(Engine):
     """Whisper-based transcription engine"""
     
     def __init__(self, model_path: str, device: str = "cuda", 
-                 compute_type: str = "int8_float16"):
+                 compute_type: str = "int8_float16",
+                 normalize_numbers: bool = True,
+                 cpu_threads: int = 0, beam_size: int = 5,
+                 num_workers: int = 1, long_file_seconds: float = 0,
+                 chunk_mode: str = "batched", chunk_seconds: float = 30.0,
+                 chunk_workers: int = 4, batch_size: int = 8,
+                 window_seconds: float = 0, window_overlap_seconds: float = 30.0,
+                 stereo_mode: str = "mix", speakers: tuple = ("UNDERWRITER", "BROKER"),
+                 vad_filter: bool = False, without_timestamps: bool = False,
+                 condition_on_previous_text: bool = True):
         self.model_path = model_path
         self.device = device
         self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.beam_size = beam_size
+        # Parallel chunks need one model worker per concurrent decode
+        if long_file_seconds and chunk_mode == "parallel":
+            num_workers = max(num_workers, chunk_workers)
+        self.num_workers = num_workers
+        # Files longer than this are split at silences and decoded in chunks
+        self.long_file_seconds = long_file_seconds
+        self.chunk_mode = chunk_mode
+        self.chunk_seconds = chunk_seconds
+        self.chunk_workers = chunk_workers
+        self.batch_size = batch_size
+        # Files longer than this are read and decoded one overlapping window at a time
+        self.window_seconds = window_seconds
+        self.window_overlap_seconds = window_overlap_seconds
+        # "speakers": stereo files decode both channels in one batch, labelled by side
+        if stereo_mode not in ("mix", "speakers"):
+            raise ValueError(f"Unknown stereo mode: {stereo_mode}")
+        self.stereo_mode = stereo_mode
+        self.speakers = tuple(speakers)
+        # Decode options for single-pass files (chunked and stereo paths set their own)
+        self.vad_filter = vad_filter
+        self.without_timestamps = without_timestamps
+        self.condition_on_previous_text = condition_on_previous_text
         self._model = None
+        # Spoken digits -> digit runs so loan extractors see them
+        self.normalizer = SpokenNumberNormalizer() if normalize_numbers else None
         
     @property
     def model(self):
@@ -127,11 +206,14 @@ class WhisperEngine(Engine):
             self._model = WhisperModel(
                 self.model_path,
                 device=self.device,
-                compute_type=self.compute_type
+                compute_type=self.compute_type,
+                cpu_threads=self.cpu_threads,
+                num_workers=self.num_workers
             )
             logger.info("Model loaded successfully")
         return self._model
         
+    @profiled("engine.process", orkuid=lambda self, audio: audio.path.stem)
     def process(self, audio: AudioFile) -> TranscriptionResult:
         """Transcribe audio file"""
         start_time = time.time()
@@ -139,23 +221,51 @@ class WhisperEngine(Engine):
         try:
             logger.info(f"Processing: {audio.path.name}")
             
-            # Transcribe
-            segments, info = self.model.transcribe(
-                str(audio.path),
-                beam_size=5
-            )
+            # Stereo calls: one speaker per channel
+            if self.stereo_mode == "speakers" and self._is_stereo(audio):
+                return self._process_stereo(audio, start_time)
+            
+            # Long recordings: chunk at silences instead of one sequential decode
+            if self.long_file_seconds:
+                duration = wav_duration(audio.path)
+                if duration and duration >= self.long_file_seconds:
+                    return self._process_chunked(audio, start_time)
             
-            # Collect text
-            full_text = []
-            segment_list = []
-            for segment in segments:
-                text = segment.text.strip()
-                full_text.append(text)
-                segment_list.append({
-                    'start': segment.start,
-                    'end': segment.end,
-                    'text': text
-                })
+            # Decode in-process (G.711 lookup + polyphase resample), no ffmpeg;
+            # a probed file goes straight to its decoder
+            probe = audio.metadata.get('probe')
+            with span("decode"):
+                samples = load_probed(probe) if probe else load_audio(audio.path)
+            options = {
+                'vad_filter': self.vad_filter,
+                'without_timestamps': self.without_timestamps,
+                'condition_on_previous_text': self.condition_on_previous_text
+            }
+            # Triage already found the speech: decode only that
+            clips = audio.metadata.get('speech_clips')
+            if clips:
+                options.update(clip_timestamps=clips, vad_filter=False)
+            # Segments are lazy: the decode happens while they are collected
+            with span("transcribe"):
+                segments, info = self.model.transcribe(
+                    samples,
+                    beam_size=self.beam_size,
+                    **options
+                )
+                
+                # Collect text
+                full_text = []
+                segment_list = []
+                for segment in segments:
+                    text = segment.text.strip()
+                    if self.normalizer:
+                        text = self.normalizer.normalize(text)
+                    full_text.append(text)
+                    segment_list.append({
+                        'start': segment.start,
+                        'end': segment.end,
+                        'text': text
+                    })
             
             processing_time = time.time() - start_time
             
@@ -186,6 +296,485 @@ class WhisperEngine(Engine):
             )
 
 
+    def _is_stereo(self, audio: AudioFile) -> bool:
+        probe = audio.metadata.get('probe')
+        if probe:
+            return probe.stereo and probe.route != "generic"
+        try:
+            return read_wav_header(audio.path).channels == 2
+        except (OSError, ValueError):
+            return False
+            
+    def _is_windowed(self, audio: AudioFile) -> bool:
+        return bool(self.window_seconds) and (wav_duration(audio.path) or 0) > self.window_seconds
+            
+    def _process_stereo(self, audio: AudioFile, start_time: float) -> TranscriptionResult:
+        """Both channels in one batched decode, merged into speaker turns"""
+        transcriber = StereoTranscriber(
+            self.model,
+            speakers=self.speakers,
+            batch_size=self.batch_size,
+            beam_size=self.beam_size,
+            language=None
+        )
+        windowed = self._is_windowed(audio)
+        if windowed:
+            stream, info = self._stereo_windows(audio, transcriber)
+        else:
+            with ChannelSource(audio.path) as source:
+                left, right = source.stereo()
+            stream = transcriber.iter_segments(left, right)
+        segments = []
+        for segment in stream:
+            if self.normalizer:
+                segment['text'] = self.normalizer.normalize(segment['text'])
+            segments.append(segment)
+        turns = list(group_turns(segments))
+        if not windowed:
+            info = transcriber.info
+        audio.metadata['turns'] = len(turns)
+        
+        processing_time = time.time() - start_time
+        speed_ratio = info.duration / processing_time if processing_time > 0 else 0
+        logger.info(f"Completed: {audio.path.name} in {processing_time:.1f}s "
+                   f"({speed_ratio:.1f}x realtime, {len(turns)} turns)")
+        
+        return TranscriptionResult(
+            source=audio,
+            text=format_screenplay(turns),
+            language=info.language or "unknown",
+            duration=info.duration,
+            processing_time=processing_time,
+            segments=segments
+        )
+        
+    def _stereo_windows(self, audio: AudioFile, transcriber: StereoTranscriber):
+        """Stereo segments one window at a time; returns (segment iterator, ChunkInfo)"""
+        info = ChunkInfo(language=None, duration=wav_duration(audio.path) or 0.0)
+
+        def segments():
+            for window in iter_windows(audio.path, self.window_seconds,
+                                       self.window_overlap_seconds, split_channels=True):
+                left = np.ascontiguousarray(window.samples[:, 0])
+                right = np.ascontiguousarray(window.samples[:, 1])
+                for segment in transcriber.iter_segments(left, right):
+                    segment['start'] = round(segment['start'] + window.start, 3)
+                    segment['end'] = round(segment['end'] + window.start, 3)
+                    # Overlap is decoded twice; keep the copy from the owning window
+                    if window.owns((segment['start'] + segment['end']) / 2):
+                        yield segment
+                # First window that decoded anything names the language
+                info.language = info.language or transcriber.info.language
+                info.chunks += transcriber.info.chunks
+
+        return segments(), info
+        
+    def _process_chunked(self, audio: AudioFile, start_time: float) -> TranscriptionResult:
+        """Transcribe a long file as VAD-bounded chunks with global timestamps"""
+        chunker = ChunkedTranscriber(
+            self.model,
+            mode=self.chunk_mode,
+            chunk_seconds=self.chunk_seconds,
+            workers=self.chunk_workers,
+            batch_size=self.batch_size,
+            beam_size=self.beam_size,
+            language=None
+        )
+        if self._is_windowed(audio):
+            # Bounded memory: only one window of samples is decoded at a time
+            segments, info = chunker.transcribe_windows(str(audio.path), self.window_seconds,
+                                                        self.window_overlap_seconds)
+        else:
+            segments, info = chunker.transcribe(str(audio.path))
+        if self.normalizer:
+            segments = self.normalizer.normalize_segments(segments)
+        audio.metadata['chunks'] = info.chunks
+        
+        processing_time = time.time() - start_time
+        speed_ratio = info.duration / processing_time if processing_time > 0 else 0
+        logger.info(f"Completed: {audio.path.name} in {processing_time:.1f}s "
+                   f"({speed_ratio:.1f}x realtime, {info.chunks} chunks)")
+        
+        return TranscriptionResult(
+            source=audio,
+            text='\n'.join(s['text'] for s in segments),
+            language=info.language or "unknown",
+            duration=info.duration,
+            processing_time=processing_time,
+            segments=segments
+        )
+
+
+class CascadeEngine(Engine):
+    """Small-model triage; only loan-relevant calls reach the large model"""
+    
+    def __init__(self, triage: WhisperEngine, large: WhisperEngine,
+                 min_keywords: int = 1, min_digit_runs: int = 1,
+                 min_speech_seconds: float = 5.0, beam_size: int = 5):
+        self.triage = triage
+        self.large = large
+        self.min_keywords = min_keywords
+        self.min_digit_runs = min_digit_runs
+        self.min_speech_seconds = min_speech_seconds
+        self.beam_size = beam_size
+        self.normalizer = SpokenNumberNormalizer(min_digits=4)
+        self.stats = {
+            'triaged': 0,
+            'escalated': 0,
+            'audio_seconds': 0.0,
+            'triage_time': 0.0,
+            'escalation_time': 0.0,
+            'started': None
+        }
+        
+    def classify(self, segments: list) -> Dict[str, Any]:
+        """Score triage segments on loan keyword and digit signals"""
+        text = ' '.join(s['text'] for s in segments)
+        normalized = self.normalizer.normalize(text)
+        speech = sum(s['end'] - s['start'] for s in segments)
+        keywords = len(LOAN_TOPICS.findall(text))
+        digit_runs = len(DIGIT_RUN.findall(normalized))
+        escalate = speech >= self.min_speech_seconds and (
+            keywords >= self.min_keywords or digit_runs >= self.min_digit_runs
+        )
+        return {
+            'keywords': keywords,
+            'digit_runs': digit_runs,
+            'speech_seconds': speech,
+            'escalate': escalate
+        }
+        
+    def process(self, audio: AudioFile) -> TranscriptionResult:
+        """Triage with the small model, escalate to the large one if it matters"""
+        start_time = time.time()
+        if self.stats['started'] is None:
+            self.stats['started'] = start_time
+            
+        try:
+            logger.info(f"Triage: {audio.path.name}")
+            
+            # Decode once; both models share the samples
+            samples = load_audio(audio.path)
+            
+            segments, info = self.triage.model.transcribe(
+                samples,
+                beam_size=1,
+                best_of=1,
+                temperature=0.0,
+                condition_on_previous_text=False,
+                vad_filter=True
+            )
+            segments = [{'start': s.start, 'end': s.end, 'text': s.text.strip()}
+                        for s in segments]
+            triage_time = time.time() - start_time
+            
+            signals = self.classify(segments)
+            audio.metadata['cascade'] = signals
+            self.stats['triaged'] += 1
+            self.stats['audio_seconds'] += info.duration
+            self.stats['triage_time'] += triage_time
+            
+            if signals['escalate']:
+                escalate_start = time.time()
+                self.stats['escalated'] += 1
+                # Reuse triage VAD: decode only the speech the small model found
+                clips = []
+                for segment in segments:
+                    clips.extend([segment['start'], segment['end']])
+                large_segments, info = self.large.model.transcribe(
+                    samples,
+                    beam_size=self.beam_size,
+                    vad_filter=False,
+                    clip_timestamps=clips
+                )
+                segments = [{'start': s.start, 'end': s.end, 'text': s.text.strip()}
+                            for s in large_segments]
+                self.stats['escalation_time'] += time.time() - escalate_start
+                logger.info(f"Escalated: {audio.path.name} "
+                           f"({signals['keywords']} keywords, {signals['digit_runs']} digit runs)")
+            
+            normalizer = self.large.normalizer
+            if normalizer:
+                for segment in segments:
+                    segment['text'] = normalizer.normalize(segment['text'])
+                    
+            return TranscriptionResult(
+                source=audio,
+                text='\n'.join(s['text'] for s in segments),
+                language=info.language,
+                duration=info.duration,
+                processing_time=time.time() - start_time,
+                segments=segments
+            )
+            
+        except Exception as e:
+            logger.error(f"Failed to process {audio.path.name}: {e}")
+            return TranscriptionResult(
+                source=audio,
+                text="",
+                language="unknown",
+                duration=0,
+                processing_time=time.time() - start_time,
+                error=str(e)
+            )
+            
+    def report(self) -> Dict[str, Any]:
+        """Escalation rate and end-to-end throughput"""
+        triaged = self.stats['triaged']
+        if not triaged:
+            return {}
+        elapsed = time.time() - self.stats['started']
+        return {
+            'escalation_rate': self.stats['escalated'] / triaged,
+            'triage_time': self.stats['triage_time'],
+            'escalation_time': self.stats['escalation_time'],
+            'files_per_hour': triaged / (elapsed / 3600) if elapsed > 0 else 0,
+            'realtime_factor': self.stats['audio_seconds'] / elapsed if elapsed > 0 else 0
+        }
+
+
+class TriageEngine(Engine):
+    """Energy-VAD triage in front of another engine.
+
+    Dead air, hold music and near-empty recordings are skipped (or deferred
+    to the end of the run) before any model work; the rest go through with
+    their speech intervals as clip_timestamps.
+    """
+    
+    def __init__(self, engine: Engine, min_speech_seconds: float = 2.0,
+                 min_speech_ratio: float = 0.02, action: str = "skip"):
+        if action not in ("skip", "defer"):
+            raise ValueError(f"Unknown triage action: {action}")
+        self.engine = engine
+        self.min_speech_seconds = min_speech_seconds
+        self.min_speech_ratio = min_speech_ratio
+        self.action = action
+        self.stats = {
+            'files': 0,
+            'skipped': 0,
+            'deferred': 0,
+            'audio_seconds': 0.0,
+            'model_seconds': 0.0,
+            'triage_time': 0.0
+        }
+        
+    def _admit(self, audio: AudioFile) -> bool:
+        """Triage one file; True if it should be transcribed now"""
+        self.stats['files'] += 1
+        try:
+            with span("triage", audio.path.stem):
+                triage = triage_file(audio.path, self.min_speech_seconds, self.min_speech_ratio)
+        except (OSError, ValueError) as e:
+            # Not a WAV we can read natively: let the engine decide
+            logger.debug(f"Triage skipped for {audio.path.name}: {e}")
+            return True
+        
+        audio.metadata['triage'] = {
+            'verdict': triage.verdict,
+            'speech_seconds': triage.speech_seconds,
+            'music_ratio': triage.music_ratio
+        }
+        self.stats['audio_seconds'] += triage.duration
+        self.stats['triage_time'] += triage.triage_time
+        if triage.verdict == "speech":
+            audio.metadata['speech_clips'] = triage.clip_timestamps
+            self.stats['model_seconds'] += triage.speech_seconds
+            return True
+        
+        logger.info(f"Triage: {audio.path.name} is {triage.verdict} "
+                   f"({triage.speech_seconds:.1f}s speech of {triage.duration:.1f}s)")
+        if self.action == "defer":
+            self.stats['deferred'] += 1
+            self.stats['model_seconds'] += triage.duration
+        else:
+            self.stats['skipped'] += 1
+        return False
+        
+    def process(self, audio: AudioFile) -> TranscriptionResult:
+        return next(iter(self.process_many([audio])))
+        
+    def process_many(self, audios: Iterable[AudioFile]) -> Iterator[TranscriptionResult]:
+        """Transcribe what passes triage; skipped files get an empty result"""
+        skipped = []
+        deferred = []
+        
+        def admitted():
+            for audio in audios:
+                if self._admit(audio):
+                    yield audio
+                elif self.action == "defer":
+                    deferred.append(audio)
+                else:
+                    skipped.append(audio)
+                    
+        for result in self.engine.process_many(admitted()):
+            while skipped:
+                yield self._skipped_result(skipped.pop(0))
+            yield result
+        for audio in skipped:
+            yield self._skipped_result(audio)
+        if deferred:
+            logger.info(f"Triage: transcribing {len(deferred)} deferred recordings")
+            yield from self.engine.process_many(deferred)
+            
+    def _skipped_result(self, audio: AudioFile) -> TranscriptionResult:
+        return TranscriptionResult(
+            source=audio,
+            text="",
+            language="unknown",
+            duration=0,
+            processing_time=0,
+            segments=[]
+        )
+        
+    def report(self) -> Dict[str, Any]:
+        """What triage kept away from the model"""
+        report = dict(self.engine.report())
+        audio_seconds = self.stats['audio_seconds']
+        if audio_seconds:
+            report.update({
+                'triage_skipped': self.stats['skipped'],
+                'triage_deferred': self.stats['deferred'],
+                'triage_time': self.stats['triage_time'],
+                'model_audio_saved': 1 - self.stats['model_seconds'] / audio_seconds
+            })
+        return report
+        
+    def close(self):
+        self.engine.close()
+
+
+def _farm_worker(worker_id: int, engine_kwargs: Dict[str, Any], tasks, results):
+    """CPU farm process: one model, pulls files off the shared queue until None"""
+    engine = WhisperEngine(**engine_kwargs)
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        index, audio = task
+        result = engine.process(audio)
+        results.put((index, worker_id, result))
+
+
+class CPUFarmEngine(Engine):
+    """Process pool of int8 CPU Whisper models fed from one shared queue"""
+    
+    def __init__(self, model_path: str, workers: int = 0, threads_per_worker: int = 0,
+                 compute_type: str = "int8", beam_size: int = 5,
+                 normalize_numbers: bool = True, **engine_options):
+        """engine_options: further WhisperEngine kwargs (chunking, stereo, decode options)"""
+        cores = os.cpu_count() or 1
+        self.workers = workers or max(1, cores // max(1, threads_per_worker or 4))
+        self.threads_per_worker = threads_per_worker or max(1, cores // self.workers)
+        self.model_path = model_path
+        self.compute_type = compute_type
+        self.beam_size = beam_size
+        self.normalize_numbers = normalize_numbers
+        self.engine_options = engine_options
+        self.stats = {
+            'files': 0,
+            'audio_seconds': 0.0,
+            'wall_time': 0.0,
+            'per_worker': {}
+        }
+        self._processes = []
+        self._tasks = None
+        self._results = None
+        
+    def _start(self):
+        """Spawn the worker processes once; models stay loaded between scans"""
+        if self._processes:
+            return
+        context = multiprocessing.get_context("spawn")
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        
+        logger.info(f"Starting CPU farm: {self.workers} workers x "
+                   f"{self.threads_per_worker} threads ({self.compute_type})")
+        engine_kwargs = dict(self.engine_options, model_path=self.model_path, device="cpu",
+                             compute_type=self.compute_type,
+                             cpu_threads=self.threads_per_worker, beam_size=self.beam_size,
+                             normalize_numbers=self.normalize_numbers)
+        self._processes = [
+            context.Process(
+                target=_farm_worker,
+                args=(i, engine_kwargs, self._tasks, self._results),
+                daemon=True
+            )
+            for i in range(self.workers)
+        ]
+        for process in self._processes:
+            process.start()
+            
+    def process(self, audio: AudioFile) -> TranscriptionResult:
+        """Single file through the farm"""
+        return next(iter(self.process_many([audio])))
+        
+    def process_many(self, audios: Iterable[AudioFile]) -> Iterator[TranscriptionResult]:
+        """Stream files through the pool; idle workers take the next file"""
+        self._start()
+        tasks = self._tasks
+        results = self._results
+        
+        start_time = time.time()
+        submitted = 0
+        completed = 0
+        # Keep every worker busy with one file queued behind it
+        max_in_flight = self.workers * 2
+        audios = iter(audios)
+        exhausted = False
+        
+        try:
+            while True:
+                while not exhausted and submitted - completed < max_in_flight:
+                    audio = next(audios, None)
+                    if audio is None:
+                        exhausted = True
+                        break
+                    tasks.put((submitted, audio))
+                    submitted += 1
+                    
+                if completed == submitted:
+                    break
+                    
+                try:
+                    _, worker_id, result = results.get(timeout=5)
+                except Empty:
+                    if not any(p.is_alive() for p in self._processes):
+                        raise RuntimeError("All CPU farm workers exited")
+                    continue
+                completed += 1
+                self.stats['files'] += 1
+                self.stats['audio_seconds'] += result.duration
+                per_worker = self.stats['per_worker']
+                per_worker[worker_id] = per_worker.get(worker_id, 0) + 1
+                yield result
+        finally:
+            self.stats['wall_time'] += time.time() - start_time
+            
+    def close(self):
+        """Stop the worker processes"""
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+            
+    def report(self) -> Dict[str, Any]:
+        """Farm throughput and per-worker load"""
+        wall = self.stats['wall_time']
+        if not self.stats['files'] or wall <= 0:
+            return {}
+        return {
+            'layout': f"{self.workers}x{self.threads_per_worker}",
+            'files_per_hour': self.stats['files'] / (wall / 3600),
+            'realtime_factor': self.stats['audio_seconds'] / wall,
+            'files_per_worker': dict(sorted(self.stats['per_worker'].items()))
+        }
+
+
 class FileSink(Sink):
     """Save transcriptions to files"""
     
@@ -238,6 +827,7 @@ class Pipeline:
             'total_time': 0
         }
         
+    @profiled("pipeline.run")
     def run(self, continuous: bool = False):
         """Run the pipeline"""
         logger.info("Starting SCREAM pipeline")
@@ -245,10 +835,10 @@ class Pipeline:
         while True:
             found_files = False
             
-            for audio in self.source.discover():
+            for result in self.engine.process_many(self.source.discover()):
                 found_files = True
-                result = self.engine.process(audio)
-                self.sink.deliver(result)
+                with span("sink.deliver", result.source.path.stem):
+                    self.sink.deliver(result)
                 
                 # Update stats
                 self.stats['processed'] += 1
@@ -262,6 +852,7 @@ class Pipeline:
             # Wait before next scan
             time.sleep(5)
             
+        self.engine.close()
         self._print_stats()
         
     def _print_stats(self):
@@ -274,6 +865,75 @@ class Pipeline:
         if self.stats['processed'] > 0:
             avg_time = self.stats['total_time'] / self.stats['processed']
             logger.info(f"Average time per file: {avg_time:.1f}s")
+        for key, value in self.engine.report().items():
+            if isinstance(value, float):
+                value = f"{value:.2f}"
+            logger.info(f"{key.replace('_', ' ').capitalize()}: {value}")
+
+
+def whisper_engine_kwargs(config) -> Dict[str, Any]:
+    """WhisperEngine kwargs for an EngineConfig (shared by every engine type)"""
+    return dict(
+        model_path=config.model_path,
+        device=config.device,
+        compute_type=config.compute_type,
+        normalize_numbers=config.normalize_numbers,
+        beam_size=config.beam_size,
+        num_workers=config.num_workers,
+        long_file_seconds=config.long_file_seconds,
+        chunk_mode=config.chunk_mode,
+        chunk_seconds=config.chunk_seconds,
+        chunk_workers=config.chunk_workers,
+        batch_size=config.chunk_batch_size,
+        window_seconds=config.window_seconds,
+        window_overlap_seconds=config.window_overlap_seconds,
+        stereo_mode=config.stereo_mode,
+        speakers=(config.left_speaker, config.right_speaker),
+        vad_filter=config.vad_filter,
+        without_timestamps=config.without_timestamps,
+        condition_on_previous_text=config.condition_on_previous_text
+    )
+
+
+def create_engine(config) -> Engine:
+    """Build the engine described by an EngineConfig"""
+    engine_kwargs = whisper_engine_kwargs(config)
+    large = WhisperEngine(**engine_kwargs)
+    
+    engine = large
+    if config.type == "cpu_farm":
+        # Workers run the same WhisperEngine, on CPU in int8 with the farm's thread split
+        del engine_kwargs['device'], engine_kwargs['compute_type']
+        engine = CPUFarmEngine(
+            workers=config.cpu_workers,
+            threads_per_worker=config.cpu_threads_per_worker,
+            compute_type="int8",
+            **engine_kwargs
+        )
+        
+    if config.type == "cascade":
+        triage = WhisperEngine(
+            model_path=config.triage_model_path,
+            device=config.triage_device,
+            compute_type=config.triage_compute_type,
+            normalize_numbers=False
+        )
+        engine = CascadeEngine(
+            triage, large,
+            min_keywords=config.cascade_min_keywords,
+            min_digit_runs=config.cascade_min_digit_runs,
+            min_speech_seconds=config.cascade_min_speech_seconds,
+            beam_size=config.beam_size
+        )
+        
+    if config.vad_triage:
+        engine = TriageEngine(
+            engine,
+            min_speech_seconds=config.vad_triage_min_speech_seconds,
+            min_speech_ratio=config.vad_triage_min_speech_ratio,
+            action=config.vad_triage_action
+        )
+    return engine
 
 
 def create_default_pipeline(wav_dir: str = "wav", 
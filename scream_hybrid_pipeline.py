@@ -14,6 +14,9 @@ import pymysql
 from datetime import datetime
 from pathlib import Path
 from faster_whisper import WhisperModel
+from scream_numbers import normalize_spoken_numbers
+from loan_rollups import refresh_after_ingest
+from transcript_index import get_index
 
 print("=" * 80)
 print("SCREAM HYBRID PIPELINE")
@@ -84,10 +87,12 @@ class ScreamPipeline:
         # Transcribe
         segments, info = self.whisper_model.transcribe(audio_path, beam_size=5)
         
-        # Collect transcript
+        # Collect transcript (segment start times are kept for the search index)
         transcript_lines = []
+        timed_lines = []
         for segment in segments:
             transcript_lines.append(segment.text.strip())
+            timed_lines.append((round(segment.start, 2), segment.text.strip()))
         
         full_transcript = "\n".join(transcript_lines)
         transcribe_time = (time.time() - start_time) * 1000  # milliseconds
@@ -95,7 +100,7 @@ class ScreamPipeline:
         print(f"   ✓ Transcribed in {transcribe_time:.0f}ms")
         print(f"   Duration: {info.duration:.1f}s | Speed: {info.duration/(transcribe_time/1000):.1f}x")
         
-        return full_transcript, transcribe_time, info
+        return full_transcript, transcribe_time, info, timed_lines
     
     def extract_loan_numbers(self, text):
         """Extract loan numbers from transcript"""
@@ -107,7 +112,7 @@ class ScreamPipeline:
         ]
         
         loan_numbers = set()
-        text_lower = text.lower()
+        text_lower = normalize_spoken_numbers(text).lower()
         
         for pattern in loan_patterns:
             matches = re.findall(pattern, text_lower)
@@ -230,10 +235,43 @@ Legal Brief Summary:<end_of_turn>
             'large-v3-turbo',
             'gemma-3-12b'
         ))
+        # Same transaction: index the loans, drop cached API results, refresh the rollups
+        call = self.index_loans(orkuid, loan_numbers)
+        if call:
+            refresh_after_ingest(self.cursor, call['timestamp'], loan_numbers, call['user_name'])
         
         self.db_conn.commit()
         print("   ✓ Saved to database")
     
+    def index_loans(self, orkuid, loan_numbers):
+        """Add loan_number_index rows for this call; returns its orktape row (None if unknown)"""
+        if not loan_numbers:
+            return None
+        self.cursor.execute("""
+            SELECT t.timestamp, t.duration, u.firstname, u.lastname,
+                   NULLIF(TRIM(CONCAT(COALESCE(u.firstname, ''), ' ', COALESCE(u.lastname, ''))), '')
+                       as user_name
+            FROM orktape t
+            LEFT JOIN orksegment s ON s.id = (
+                SELECT MIN(s1.id) FROM orksegment s1 WHERE s1.tape_id = t.id)
+            LEFT JOIN orkuser u ON s.user_id = u.id
+            WHERE t.orkUid = %s
+        """, (orkuid,))
+        call = self.cursor.fetchone()
+        if not call:
+            print(f"   ⚠️  {orkuid} not in orktape, loan index not updated")
+            return None
+        
+        for loan_number in loan_numbers:
+            self.cursor.execute("""
+                INSERT IGNORE INTO loan_number_index
+                (loan_number, orkuid, user_name, user_firstname, user_lastname,
+                 call_date, call_timestamp, duration)
+                VALUES (%s, %s, %s, %s, %s, DATE(%s), %s, %s)
+            """, (loan_number, orkuid, call['user_name'], call['firstname'], call['lastname'],
+                  call['timestamp'], call['timestamp'], call['duration']))
+        return call
+    
     def process_recording(self, orkuid, audio_path):
         """Process a single recording through the pipeline"""
         print(f"\n{'='*60}")
@@ -244,7 +282,7 @@ Legal Brief Summary:<end_of_turn>
         
         try:
             # Step 1: Transcribe
-            transcript, transcribe_time, info = self.transcribe_audio(audio_path)
+            transcript, transcribe_time, info, timed_lines = self.transcribe_audio(audio_path)
             
             # Step 2: Extract loan numbers
             loan_numbers = self.extract_loan_numbers(transcript)
@@ -277,6 +315,9 @@ Legal Brief Summary:<end_of_turn>
                 key_facts, sentiment, total_time
             )
             
+            # Step 8: Make the transcript text-searchable
+            self.index_transcript(orkuid, timed_lines, loan_numbers)
+            
             print(f"\n✅ Processing complete in {total_time:.0f}ms")
             print(f"\nSummary:\n{summary}")
             
@@ -288,6 +329,23 @@ Legal Brief Summary:<end_of_turn>
             traceback.print_exc()
             return False
     
+    @staticmethod
+    def call_time(orkuid):
+        """Call start from the orkuid (YYYYMMDD_HHMMSS_XXXX), None if it doesn't parse"""
+        try:
+            return datetime.strptime(orkuid[:15], '%Y%m%d_%H%M%S')
+        except ValueError:
+            return None
+    
+    def index_transcript(self, orkuid, timed_lines, loan_numbers):
+        """Add the transcript to the full-text index (catch-up job retries failures)"""
+        try:
+            segments = get_index().add(orkuid, timed_lines, self.call_time(orkuid),
+                                       loan_numbers=loan_numbers)
+            print(f"   ✓ Indexed {segments} segments for text search")
+        except Exception as e:
+            print(f"   ⚠️  Text index update failed: {e}")
+    
     def close(self):
         """Clean up resources"""
         if self.cursor:
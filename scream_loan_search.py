@@ -12,6 +12,8 @@ from datetime import datetime
 import pymysql
 from typing import List, Dict
 
+from scream_numbers import normalize_spoken_numbers
+
 class LoanNumberExtractor:
     """Fast loan number extraction without AI"""
     
@@ -41,6 +43,7 @@ class LoanNumberExtractor:
     def extract(cls, text: str) -> List[str]:
         """Extract all potential loan numbers from text"""
         found = set()
+        text = normalize_spoken_numbers(text)
         
         for pattern in cls.PATTERNS:
             matches = re.findall(pattern, text, re.IGNORECASE)
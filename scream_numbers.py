@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+SCREAM Number Normalization
+Turns spoken digits ("one two three", "twelve thirty four", "double five")
+into digit runs so the loan extractors can match them with plain \\d patterns.
+
+Single pass over whitespace tokens driven by a small token automaton -
+no per-pattern regex loops.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Token classes
+UNIT = "unit"          # zero..nine, oh
+TEEN = "teen"          # ten..nineteen
+TENS = "tens"          # twenty..ninety
+HUNDRED = "hundred"    # hundred
+REPEAT = "repeat"      # double, triple
+DIGITS = "digits"      # literal "1225" or "12-25"
+COMPOUND = "compound"  # hyphenated words "thirty-four"
+HUNDRED_TENS = "hundred_tens"  # internal: "one hundred twenty" awaiting a unit
+
+WORD_VALUES = {
+    'zero': (UNIT, 0), 'oh': (UNIT, 0), 'o': (UNIT, 0),
+    'one': (UNIT, 1), 'two': (UNIT, 2), 'three': (UNIT, 3),
+    'four': (UNIT, 4), 'five': (UNIT, 5), 'six': (UNIT, 6),
+    'seven': (UNIT, 7), 'eight': (UNIT, 8), 'nine': (UNIT, 9),
+    'ten': (TEEN, 10), 'eleven': (TEEN, 11), 'twelve': (TEEN, 12),
+    'thirteen': (TEEN, 13), 'fourteen': (TEEN, 14), 'fifteen': (TEEN, 15),
+    'sixteen': (TEEN, 16), 'seventeen': (TEEN, 17), 'eighteen': (TEEN, 18),
+    'nineteen': (TEEN, 19),
+    'twenty': (TENS, 20), 'thirty': (TENS, 30), 'forty': (TENS, 40),
+    'fourty': (TENS, 40), 'fifty': (TENS, 50), 'sixty': (TENS, 60),
+    'seventy': (TENS, 70), 'eighty': (TENS, 80), 'ninety': (TENS, 90),
+    'hundred': (HUNDRED, 100),
+    'double': (REPEAT, 2), 'triple': (REPEAT, 3),
+}
+
+# "oh" and "o" only count as zero next to other numbers ("oh, okay" stays)
+WEAK_ZEROS = {'oh', 'o'}
+
+# Punctuation that may sit inside a spoken run ("one, two, three-four")
+SOFT_PUNCT = ',-;:'
+# Punctuation that ends a run after the current token
+HARD_PUNCT = '.?!'
+
+TOKEN_RE = re.compile(r'\S+')
+DIGITS_RE = re.compile(r'^\d+(?:-\d+)*$')
+
+
+class SpokenNumberNormalizer:
+    """Collapse runs of spoken or split digits into a single digit string"""
+
+    def __init__(self, min_digits: int = 7):
+        # Runs shorter than this are left as spoken ("two calls" stays)
+        self.min_digits = min_digits
+
+    @staticmethod
+    def _classify(token: str):
+        """Return (class, value, hard_stop, word) for a raw token, or None"""
+        hard_stop = token[-1] in HARD_PUNCT
+        word = token.strip(SOFT_PUNCT + HARD_PUNCT + '"\'()').lower()
+        if not word:
+            return None
+        if word in WORD_VALUES:
+            cls, value = WORD_VALUES[word]
+            return cls, value, hard_stop, word
+        if DIGITS_RE.match(word):
+            return DIGITS, word.replace('-', ''), hard_stop, word
+        # Whisper sometimes hyphenates spoken groups: "thirty-four"
+        if '-' in word:
+            parts = word.split('-')
+            if all(p in WORD_VALUES for p in parts):
+                return COMPOUND, parts, hard_stop, word
+        return None
+
+    @classmethod
+    def is_number_token(cls, token: str) -> bool:
+        """Could this one token be part of a spoken or written number?"""
+        token = token.strip()
+        return bool(token) and cls._classify(token) is not None
+
+    def normalize(self, text: str) -> str:
+        """Normalize one piece of text; non-number text is left untouched"""
+        if not text:
+            return text
+
+        tokens = list(TOKEN_RE.finditer(text))
+        classes = [self._classify(m.group()) for m in tokens]
+
+        out = []
+        last_end = 0
+        i = 0
+        n = len(tokens)
+        while i < n:
+            info = classes[i]
+            if (info is None or self._complete(info)
+                    or (info[3] in WEAK_ZEROS and not self._has_number_neighbor(classes, i))):
+                i += 1
+                continue
+
+            # Consume a maximal run of number tokens
+            run = _DigitRun()
+            j = i
+            while j < n:
+                info = classes[j]
+                if info is None or self._complete(info):
+                    break
+                if info[3] in WEAK_ZEROS and not self._has_number_neighbor(classes, j):
+                    break
+                # "1225, 381" may be two numbers; only spoken runs span a comma
+                if (j > i and info[0] == DIGITS and classes[j - 1][0] == DIGITS
+                        and tokens[j - 1].group()[-1] in SOFT_PUNCT):
+                    break
+                if info[0] == COMPOUND:
+                    for part in info[1]:
+                        run.feed(*WORD_VALUES[part])
+                else:
+                    run.feed(info[0], info[1])
+                j += 1
+                if info[2]:
+                    break
+
+            digits = run.finish()
+            if len(digits) >= self.min_digits and (j - i > 1 or classes[i][0] != DIGITS):
+                start = tokens[i].start()
+                end = tokens[j - 1].end()
+                # Keep trailing punctuation of the last token
+                tail = tokens[j - 1].group()
+                trail = len(tail) - len(tail.rstrip(SOFT_PUNCT + HARD_PUNCT))
+                out.append(text[last_end:start])
+                out.append(digits)
+                if trail:
+                    out.append(tail[-trail:])
+                last_end = end
+            i = j
+
+        if not out:
+            return text
+        out.append(text[last_end:])
+        return ''.join(out)
+
+    def _complete(self, info) -> bool:
+        """A digit literal that is already a full number ("1234567") stands alone"""
+        return info[0] == DIGITS and len(info[1]) >= self.min_digits
+
+    @staticmethod
+    def _has_number_neighbor(classes: list, i: int) -> bool:
+        """True if a weak zero is adjacent to a non-weak number token"""
+        for k in (i - 1, i + 1):
+            if 0 <= k < len(classes) and classes[k] is not None and classes[k][3] not in WEAK_ZEROS:
+                return True
+        return False
+
+    def normalize_segments(self, segments: Iterable[Dict]) -> List[Dict]:
+        """Normalize the 'text' field of segment dicts (engine segment format)"""
+        normalized = []
+        for segment in segments:
+            segment = dict(segment)
+            segment['text'] = self.normalize(segment.get('text', ''))
+            normalized.append(segment)
+        return normalized
+
+
+class _DigitRun:
+    """Accumulates digit groups for one run of number tokens"""
+
+    def __init__(self):
+        self.groups = []
+        self.pending = None     # value of the group being built
+        self.pending_cls = None
+        self.repeat = 1
+
+    def _flush(self):
+        if self.pending is not None:
+            self.groups.append(str(self.pending))
+            self.pending = None
+            self.pending_cls = None
+
+    def feed(self, cls: str, value):
+        if cls == REPEAT:
+            self._flush()
+            self.repeat = value
+            return
+
+        if cls == DIGITS:
+            self._flush()
+            self.groups.append(value * self.repeat)
+            self.repeat = 1
+            return
+
+        if cls == HUNDRED:
+            # "one hundred", "twelve hundred"; a bare "hundred" is 100
+            if self.pending is not None and self.pending_cls in (UNIT, TEEN) and self.pending:
+                self.pending *= 100
+            else:
+                self._flush()
+                self.pending = 100
+            self.pending_cls = HUNDRED
+            return
+
+        if cls == UNIT and self.repeat > 1:
+            self._flush()
+            self.groups.append(str(value) * self.repeat)
+            self.repeat = 1
+            return
+
+        # Merge into the pending group where spoken grammar allows it:
+        # "thirty four", "hundred twenty", "hundred twelve", "hundred five"
+        if self.pending is not None:
+            if self.pending_cls == TENS and cls == UNIT and value > 0:
+                self.pending += value
+                self.pending_cls = UNIT
+                return
+            if self.pending_cls == HUNDRED and cls in (UNIT, TEEN, TENS) and value > 0:
+                self.pending += value
+                self.pending_cls = HUNDRED_TENS if cls == TENS else UNIT
+                return
+            if self.pending_cls == HUNDRED_TENS and cls == UNIT and value > 0:
+                self.pending += value
+                self.pending_cls = UNIT
+                return
+
+        self._flush()
+        self.pending = value
+        self.pending_cls = cls
+        self.repeat = 1
+
+    def finish(self) -> str:
+        self._flush()
+        return ''.join(self.groups)
+
+
+_default_normalizer: Optional[SpokenNumberNormalizer] = None
+
+
+def normalize_spoken_numbers(text: str) -> str:
+    """Normalize text with the shared default normalizer"""
+    global _default_normalizer
+    if _default_normalizer is None:
+        _default_normalizer = SpokenNumberNormalizer()
+    return _default_normalizer.normalize(text)
+
+
+if __name__ == "__main__":
+    samples = [
+        "my loan number is one two two five three eight one nine six four",
+        "it's twelve twenty five, three eight one, nine six four.",
+        "loan twelve thirty four five six seven eight",
+        "the number is 1225 381 964 thanks",
+        "double five oh one two three four",
+        "oh okay, I have two calls today",
+    ]
+    normalizer = SpokenNumberNormalizer()
+    for sample in samples:
+        print(f"{sample!r}\n  -> {normalizer.normalize(sample)!r}")
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+SCREAM Audio Format Probe
+Reads only the RIFF/fmt header (codec, channels, sample rate, duration)
+and decides up front how a recording should be decoded and transcribed,
+instead of trying wave.open, then ffmpeg, then pydub until one works.
+
+Routes:
+    pcm      - PCM / float WAV, decoded from an mmap of the data chunk
+    g711     - μ-law / A-law WAV, decoded through the 256-entry lookup tables
+    generic  - anything else (MP3, odd WAV encodings), decoded by PyAV
+Modes:
+    stereo   - two channels: one speaker per side
+    mono     - everything else (extra channels are mixed)
+
+Probes are cached per orkuid in a small SQLite file and re-used while the
+file's size and mtime are unchanged, so re-scanning the archive costs a
+stat() per recording.
+
+Usage:
+    probe = get_probe_index().probe("2024/06/03/14/ABC123.wav")
+    samples = load_probed(probe)
+
+    python scream_probe.py /var/log/orkaudio.prod.nfs/audio/2024/06    # probe a tree
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import threading
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+from scream_audio import SAMPLE_RATE, STORAGE, ChannelSource, read_wav_header
+
+PROBE_INDEX_PATH = os.environ.get('SCREAM_PROBE_INDEX', 'probe_index.db')
+COMMIT_BATCH = 1000
+
+ROUTE_PCM = "pcm"
+ROUTE_G711 = "g711"
+ROUTE_GENERIC = "generic"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS probes (
+    orkuid TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    codec TEXT,
+    channels INTEGER,
+    sample_rate INTEGER,
+    bits_per_sample INTEGER,
+    duration REAL,
+    route TEXT NOT NULL,
+    mode TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class AudioProbe:
+    """Header facts about one recording and where it should be sent"""
+    orkuid: str
+    path: str
+    size: int
+    mtime_ns: int
+    codec: Optional[str]
+    channels: Optional[int]
+    sample_rate: Optional[int]
+    bits_per_sample: Optional[int]
+    duration: Optional[float]
+    route: str
+    mode: str
+
+    @property
+    def stereo(self) -> bool:
+        return self.mode == "stereo"
+
+
+COLUMNS = tuple(f.name for f in fields(AudioProbe))
+SELECT_PROBE = f"SELECT {', '.join(COLUMNS)} FROM probes WHERE orkuid = ?"
+INSERT_PROBE = (f"INSERT OR REPLACE INTO probes ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in COLUMNS)})")
+
+
+def orkuid_for(path: Union[str, Path]) -> str:
+    """Production layout is YYYY/MM/DD/HH/<orkuid>.wav"""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def probe_file(path: Union[str, Path], orkuid: Optional[str] = None,
+               stat: Optional[os.stat_result] = None) -> AudioProbe:
+    """Header-only probe; never decodes audio, never spawns a process"""
+    stat = stat or os.stat(path)
+    try:
+        info = read_wav_header(path)
+    except ValueError:
+        # Not a WAV we can parse: PyAV will have to work it out
+        return AudioProbe(orkuid or orkuid_for(path), str(path), stat.st_size, stat.st_mtime_ns,
+                          None, None, None, None, None, ROUTE_GENERIC, "mono")
+    route = ROUTE_GENERIC
+    if (info.codec, info.bits_per_sample) in STORAGE and info.block_align:
+        route = ROUTE_G711 if info.codec in ("ulaw", "alaw") else ROUTE_PCM
+    return AudioProbe(orkuid or orkuid_for(path), str(path), stat.st_size, stat.st_mtime_ns,
+                      info.codec, info.channels, info.sample_rate, info.bits_per_sample,
+                      round(info.duration, 3), route, "stereo" if info.channels == 2 else "mono")
+
+
+def load_probed(probe: AudioProbe, sampling_rate: int = SAMPLE_RATE,
+                split_stereo: bool = False):
+    """Decode along the probed route (same return shapes as load_audio)"""
+    if probe.route == ROUTE_GENERIC:
+        from faster_whisper import decode_audio
+        return decode_audio(probe.path, sampling_rate=sampling_rate, split_stereo=split_stereo)
+    with ChannelSource(probe.path) as source:
+        if split_stereo:
+            return source.stereo(sampling_rate)
+        return source.mono(sampling_rate)
+
+
+class ProbeIndex:
+    """Per-orkuid probe cache (use one instance per thread)"""
+
+    def __init__(self, path: str = PROBE_INDEX_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, orkuid: str) -> Optional[AudioProbe]:
+        """Cached probe as last stored, without checking the file"""
+        row = self.conn.execute(SELECT_PROBE, (orkuid,)).fetchone()
+        return AudioProbe(*row) if row else None
+
+    def probe(self, path: Union[str, Path], orkuid: Optional[str] = None,
+              commit: bool = True) -> AudioProbe:
+        """Cached probe if the file is unchanged, otherwise probe and store"""
+        orkuid = orkuid or orkuid_for(path)
+        stat = os.stat(path)
+        cached = self.get(orkuid)
+        if cached and cached.size == stat.st_size and cached.mtime_ns == stat.st_mtime_ns:
+            if cached.path != str(path):
+                cached.path = str(path)
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        result = probe_file(path, orkuid, stat)
+        self.put(result, commit=commit)
+        return result
+
+    def probe_many(self, paths: Iterable[Union[str, Path]]) -> Iterator[AudioProbe]:
+        """probe() over a stream of paths, committing every COMMIT_BATCH new probes"""
+        pending = 0
+        for path in paths:
+            misses = self.misses
+            try:
+                yield self.probe(path, commit=False)
+            except OSError:
+                continue
+            pending += self.misses - misses
+            if pending >= COMMIT_BATCH:
+                self.conn.commit()
+                pending = 0
+        self.conn.commit()
+
+    def put(self, probe: AudioProbe, commit: bool = True):
+        self.conn.execute(INSERT_PROBE, tuple(getattr(probe, column) for column in COLUMNS))
+        if commit:
+            self.conn.commit()
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM probes").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+_local = threading.local()
+
+
+def get_probe_index() -> ProbeIndex:
+    """Per-thread ProbeIndex on PROBE_INDEX_PATH"""
+    index = getattr(_local, 'index', None)
+    if index is None:
+        index = _local.index = ProbeIndex()
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe recordings and cache their formats")
+    parser.add_argument('root', help='Directory tree of recordings')
+    parser.add_argument('--pattern', default='*.wav', help='Glob pattern (default: *.wav)')
+    parser.add_argument('--index', default=PROBE_INDEX_PATH, help='Probe cache path')
+    args = parser.parse_args()
+
+    index = ProbeIndex(args.index)
+    start = time.time()
+    routes = {}
+    modes = {}
+    for probe in index.probe_many(Path(args.root).rglob(args.pattern)):
+        routes[probe.route] = routes.get(probe.route, 0) + 1
+        modes[probe.mode] = modes.get(probe.mode, 0) + 1
+    elapsed = time.time() - start
+    total = index.hits + index.misses
+
+    print(f"Probed {total} files in {elapsed:.2f}s "
+          f"({index.hits} cached, {index.misses} read)")
+    print(f"Routes: {', '.join(f'{n} {r}' for r, n in sorted(routes.items()))}")
+    print(f"Modes: {', '.join(f'{n} {m}' for m, n in sorted(modes.items()))}")
+    index.close()
+    return 0 if total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+SCREAM Profiling Hooks
+Two layers, so a slow call can be explained after the fact without
+editing code:
+
+    span timer  - always on. span()/stage() record wall time per named
+                  step; every trace that carries an orkuid is appended as
+                  one JSON line to SCREAM_TRACE_FILE (scream_traces.jsonl),
+                  and per-stage totals are kept in memory (/metrics/profile).
+    profilers   - opt in with SCREAM_PROFILE (or profile.mode in the config):
+                  "sample"        stack sampler thread, SCREAM_PROFILE_INTERVAL_MS
+                                  apart; writes <stage>.folded per stage
+                                  (flamegraph.pl / speedscope input)
+                  "deterministic" cProfile per stage; writes <stage>.prof
+                                  (snakeviz / flameprof input)
+                  Only stage() boundaries are profiled; SCREAM_PROFILE_STAGES
+                  narrows them to a comma-separated list. Files land in
+                  SCREAM_PROFILE_DIR (profiles/) at exit.
+
+Spans nest through a ContextVar, so they follow asyncio tasks; threads
+start their own traces. A span with a different orkuid than its parent
+starts a new trace and shows up in the parent as one span.
+
+Usage:
+    with stage("process_recording", orkuid=orkuid):
+        with span("download"):
+            ...
+
+    @profiled("pipeline.run")
+    def run(self): ...
+
+    register_profile_routes(app)            # FastAPI: every route + /metrics/profile
+
+    python scream_profile.py scream_traces.jsonl --slowest 10
+    python scream_profile.py scream_traces.jsonl --orkuid ABC123
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import atexit
+import cProfile
+import pstats
+import argparse
+import functools
+import inspect
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger("scream_profile")
+
+PROFILE_MODES = ("off", "sample", "deterministic")
+
+
+@dataclass
+class ProfileSettings:
+    """Module-wide settings; env first, configure() from the pipeline config"""
+    mode: str = os.environ.get('SCREAM_PROFILE', 'off')
+    output_dir: str = os.environ.get('SCREAM_PROFILE_DIR', 'profiles')
+    stages: Set[str] = field(default_factory=lambda: set(
+        filter(None, os.environ.get('SCREAM_PROFILE_STAGES', '').split(','))))
+    sample_interval_ms: float = float(os.environ.get('SCREAM_PROFILE_INTERVAL_MS', 5))
+    # "" turns trace lines off (the in-memory stage totals stay)
+    trace_file: str = os.environ.get('SCREAM_TRACE_FILE', 'scream_traces.jsonl')
+
+
+settings = ProfileSettings()
+
+
+def configure(mode: Optional[str] = None, output_dir: Optional[str] = None,
+              stages: Optional[List[str]] = None, sample_interval_ms: Optional[float] = None,
+              trace_file: Optional[str] = None):
+    """Override settings (best called before the first stage runs)"""
+    global _profiler
+    if mode is not None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode} (expected one of {PROFILE_MODES})")
+        if mode != settings.mode and _profiler is not None:
+            # Keep what the old profiler collected, then start over in the new mode
+            flush_profiles()
+            _profiler = None
+        settings.mode = mode
+    if output_dir is not None:
+        settings.output_dir = output_dir
+    if stages is not None:
+        settings.stages = set(stages)
+    if sample_interval_ms is not None:
+        settings.sample_interval_ms = sample_interval_ms
+    if trace_file is not None:
+        settings.trace_file = trace_file
+
+
+# --- Span timer --------------------------------------------------------------
+
+class Trace:
+    """Spans recorded under one root: [name, offset, duration, depth, attrs?]"""
+    __slots__ = ('name', 'orkuid', 'attrs', 'started', 'origin', 'depth', 'spans')
+
+    def __init__(self, name: str, orkuid: Optional[str], attrs: dict):
+        self.name = name
+        self.orkuid = orkuid
+        self.attrs = attrs
+        self.started = time.time()
+        self.origin = time.perf_counter()
+        self.depth = 0
+        self.spans = []
+
+
+_trace: ContextVar = ContextVar('scream_trace', default=None)
+
+
+class StageStats:
+    """Count / total / max seconds per span name, for /metrics/profile"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages: Dict[str, list] = {}
+
+    def add(self, name: str, seconds: float):
+        with self.lock:
+            entry = self.stages.get(name)
+            if entry is None:
+                self.stages[name] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                if seconds > entry[2]:
+                    entry[2] = seconds
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self.lock:
+            return {
+                name: {'count': count, 'total_seconds': round(total, 3),
+                       'mean_ms': round(total / count * 1000, 2), 'max_ms': round(peak * 1000, 2)}
+                for name, (count, total, peak) in sorted(self.stages.items())
+            }
+
+
+stats = StageStats()
+
+_write_lock = threading.Lock()
+_trace_out = None
+
+
+def _write_trace(trace: Trace, duration: float, error: Optional[str]):
+    """One JSON line per finished trace that belongs to a recording"""
+    global _trace_out
+    if not trace.orkuid or not settings.trace_file:
+        return
+    line = json.dumps({
+        'orkuid': trace.orkuid,
+        'stage': trace.name,
+        'started': round(trace.started, 3),
+        'duration': round(duration, 6),
+        'error': error,
+        'attrs': trace.attrs or None,
+        'spans': sorted(trace.spans, key=lambda s: (s[1], s[3])),
+    }, default=str)
+    with _write_lock:
+        if _trace_out is None or _trace_out.name != settings.trace_file:
+            if _trace_out is not None:
+                _trace_out.close()
+            # Line-buffered: one write per trace, readable while the process runs
+            _trace_out = open(settings.trace_file, 'a', buffering=1, encoding='utf-8')
+        _trace_out.write(line + '\n')
+
+
+@contextmanager
+def span(name: str, orkuid: Optional[str] = None, **attrs):
+    """Time a block; starts a trace when there is none (or the orkuid changes)"""
+    parent = _trace.get()
+    trace = parent
+    token = None
+    if parent is None or (orkuid is not None and orkuid != parent.orkuid):
+        trace = Trace(name, orkuid, attrs)
+        token = _trace.set(trace)
+    depth = trace.depth
+    trace.depth += 1
+    error = None
+    start = time.perf_counter()
+    try:
+        yield trace
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        trace.depth = depth
+        record = [name, round(start - trace.origin, 6), round(duration, 6), depth]
+        extra = dict(attrs) if token is None else {}
+        if error:
+            extra['error'] = error
+        if extra:
+            record.append(extra)
+        trace.spans.append(record)
+        stats.add(name, duration)
+        if token is not None:
+            _trace.reset(token)
+            if parent is not None:
+                # The parent sees the whole child trace as one span
+                parent.spans.append([name, round(start - parent.origin, 6), round(duration, 6),
+                                     parent.depth, {'orkuid': orkuid}])
+            _write_trace(trace, duration, error)
+
+
+def annotate(**attrs):
+    """Attach attributes (e.g. orkuid once it is known) to the current trace"""
+    trace = _trace.get()
+    if trace is None:
+        return
+    if 'orkuid' in attrs:
+        trace.orkuid = attrs.pop('orkuid')
+    trace.attrs.update(attrs)
+
+
+# --- Profilers ---------------------------------------------------------------
+
+def _safe_name(stage: str) -> str:
+    return re.sub(r'[^\w.-]+', '_', stage).strip('_') or "stage"
+
+
+class DeterministicProfiler:
+    """cProfile per (stage, thread), merged per stage on flush"""
+
+    def __init__(self):
+        self.profiles: Dict[tuple, cProfile.Profile] = {}
+        self.active = threading.local()
+        self.skipped = 0
+
+    def start(self, stage: str):
+        # One cProfile per thread at a time: an outer stage already covers this one
+        if getattr(self.active, 'stage', None):
+            self.skipped += 1
+            return None
+        profile = self.profiles.setdefault((stage, threading.get_ident()), cProfile.Profile())
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler owns this thread (e.g. an interleaved async request)
+            self.skipped += 1
+            return None
+        self.active.stage = stage
+        return profile
+
+    def stop(self, profile: cProfile.Profile):
+        profile.disable()
+        self.active.stage = None
+
+    def flush(self, directory: str) -> List[str]:
+        by_stage: Dict[str, list] = {}
+        for (stage, _), profile in list(self.profiles.items()):
+            by_stage.setdefault(stage, []).append(profile)
+        written = []
+        for stage, profiles in by_stage.items():
+            try:
+                merged = pstats.Stats(profiles[0])
+            except TypeError:
+                # Never enabled long enough to collect anything
+                continue
+            for profile in profiles[1:]:
+                try:
+                    merged.add(profile)
+                except TypeError:
+                    pass
+            path = os.path.join(directory, f"{_safe_name(stage)}.prof")
+            merged.dump_stats(path)
+            written.append(path)
+        return written
+
+
+class SamplingProfiler:
+    """Samples the stacks of threads inside a stage; folded stacks per stage"""
+
+    def __init__(self, interval_ms: float):
+        self.interval = interval_ms / 1000.0
+        self.lock = threading.Lock()
+        self.active: Dict[int, List[str]] = {}
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.labels: Dict[object, str] = {}
+        self.thread = None
+
+    def start(self, stage: str):
+        ident = threading.get_ident()
+        with self.lock:
+            self.active.setdefault(ident, []).append(stage)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="scream-sampler", daemon=True)
+                self.thread.start()
+        return ident
+
+    def stop(self, ident: int):
+        with self.lock:
+            stack = self.active.get(ident)
+            if stack:
+                stack.pop()
+                if not stack:
+                    del self.active[ident]
+
+    def _label(self, code) -> str:
+        label = self.labels.get(code)
+        if label is None:
+            label = self.labels[code] = (f"{code.co_name} "
+                                         f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        return label
+
+    def _fold(self, frame) -> str:
+        names = []
+        while frame is not None:
+            names.append(self._label(frame.f_code))
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                targets = {ident: set(stack) for ident, stack in self.active.items()}
+            if not targets:
+                continue
+            frames = sys._current_frames()
+            for ident, stages in targets.items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                folded = self._fold(frame)
+                with self.lock:
+                    # Outer stages include the time of the stages nested in them
+                    for stage in stages:
+                        counts = self.counts.setdefault(stage, {})
+                        counts[folded] = counts.get(folded, 0) + 1
+
+    def flush(self, directory: str) -> List[str]:
+        with self.lock:
+            counts = {stage: dict(c) for stage, c in self.counts.items()}
+        written = []
+        for stage, stacks in counts.items():
+            path = os.path.join(directory, f"{_safe_name(stage)}.folded")
+            with open(path, 'w', encoding='utf-8') as f:
+                for folded, count in sorted(stacks.items()):
+                    f.write(f"{folded} {count}\n")
+            written.append(path)
+        return written
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler():
+    """The profiler for settings.mode, created on first use (None when off)"""
+    global _profiler
+    if settings.mode == "off":
+        return None
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                if settings.mode == "sample":
+                    _profiler = SamplingProfiler(settings.sample_interval_ms)
+                else:
+                    _profiler = DeterministicProfiler()
+                atexit.register(flush_profiles)
+    return _profiler
+
+
+def flush_profiles() -> List[str]:
+    """Write the per-stage profile files collected so far"""
+    if _profiler is None:
+        return []
+    os.makedirs(settings.output_dir, exist_ok=True)
+    written = _profiler.flush(settings.output_dir)
+    if written:
+        logger.info(f"Wrote {len(written)} profile(s) to {settings.output_dir}")
+    return written
+
+
+@contextmanager
+def stage(name: str, orkuid: Optional[str] = None, **attrs):
+    """A span that is also a profiler boundary when profiling is on"""
+    profiler = get_profiler()
+    if profiler is not None and settings.stages and name not in settings.stages:
+        profiler = None
+    token = profiler.start(name) if profiler is not None else None
+    try:
+        with span(name, orkuid, **attrs) as trace:
+            yield trace
+    finally:
+        if token is not None:
+            profiler.stop(token)
+
+
+def profiled(name: Optional[str] = None, orkuid: Optional[Callable[..., Optional[str]]] = None):
+    """Decorator: run the function inside stage(name); orkuid(*args, **kwargs) names the trace"""
+    def decorate(func):
+        stage_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage(stage_name, orkuid(*args, **kwargs) if orkuid else None):
+                    return await func(*args, **kwargs)
+            async_wrapper.scream_stage = stage_name
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name, orkuid(*args, **kwargs) if orkuid else None):
+                return func(*args, **kwargs)
+        wrapper.scream_stage = stage_name
+        return wrapper
+    return decorate
+
+
+# --- FastAPI -----------------------------------------------------------------
+
+def register_profile_routes(app):
+    """Time every request, profile each route when profiling is on, expose /metrics/profile"""
+    from starlette.routing import Match
+
+    def route_for(scope):
+        for route in app.router.routes:
+            match, child = route.matches(scope)
+            if match == Match.FULL:
+                return route.path, child.get('path_params', {})
+        return "unmatched", {}
+
+    @app.middleware("http")
+    async def time_request(request, call_next):
+        path, params = route_for(request.scope)
+        with span(f"{request.method} {path}", params.get('orkuid')):
+            return await call_next(request)
+
+    @app.on_event("startup")
+    def profile_endpoints():
+        # Wrap the handlers themselves: sync routes run in the threadpool,
+        # so the profiler has to start on the thread that does the work
+        if settings.mode == "off":
+            return
+        for route in app.router.routes:
+            dependant = getattr(route, 'dependant', None)
+            if dependant is None or getattr(dependant.call, 'scream_stage', None):
+                continue
+            methods = ",".join(sorted(getattr(route, 'methods', None) or []))
+            try:
+                dependant.call = profiled(f"route {methods} {route.path}")(dependant.call)
+            except AttributeError:
+                logger.warning(f"Cannot profile {route.path}: handler is read-only")
+
+    @app.get("/metrics/profile")
+    def profile_metrics():
+        return {
+            'mode': settings.mode,
+            'trace_file': settings.trace_file or None,
+            'output_dir': settings.output_dir if settings.mode != "off" else None,
+            'stages': stats.snapshot(),
+        }
+
+    @app.on_event("shutdown")
+    def write_profiles():
+        flush_profiles()
+
+
+# --- Trace reader ------------------------------------------------------------
+
+def read_traces(path: str, orkuid: Optional[str] = None) -> List[dict]:
+    traces = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            trace = json.loads(line)
+            if orkuid is None or trace['orkuid'] == orkuid:
+                traces.append(trace)
+    return traces
+
+
+def format_trace(trace: dict) -> str:
+    """Indented span tree with offsets, durations and each span's share"""
+    started = datetime.fromtimestamp(trace['started']).strftime('%Y-%m-%d %H:%M:%S')
+    total = trace['duration'] or 1e-9
+    lines = [f"{trace['orkuid']}  {trace['stage']}  {trace['duration']:.3f}s  at {started}"
+             + (f"  ERROR {trace['error']}" if trace.get('error') else "")]
+    for entry in trace['spans']:
+        name, offset, duration, depth = entry[:4]
+        extra = entry[4] if len(entry) > 4 else {}
+        note = ", ".join(f"{k}={v}" for k, v in extra.items())
+        lines.append(f"  {'  ' * depth}{name:<{max(1, 40 - 2 * depth)}} +{offset:>8.3f}s "
+                     f"{duration:>9.3f}s {duration / total:>6.1%}" + (f"  [{note}]" if note else ""))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Explain recordings from their span traces")
+    parser.add_argument('traces', nargs='?', default=settings.trace_file or 'scream_traces.jsonl',
+                        help='Trace file (default: SCREAM_TRACE_FILE)')
+    parser.add_argument('--orkuid', help='Show every trace for this recording')
+    parser.add_argument('--stage', help='Only traces rooted at this stage')
+    parser.add_argument('--slowest', type=int, default=5, help='Show the N slowest traces')
+    args = parser.parse_args()
+
+    traces = read_traces(args.traces, args.orkuid)
+    if args.stage:
+        traces = [t for t in traces if t['stage'] == args.stage]
+    if not traces:
+        print("No matching traces")
+        return 1
+    if not args.orkuid:
+        traces = sorted(traces, key=lambda t: t['duration'], reverse=True)[:args.slowest]
+    for trace in traces:
+        print(format_trace(trace))
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
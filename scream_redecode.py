@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+SCREAM Targeted Re-decode
+Two-pass transcription for loan numbers: pass one stays greedy (beam 1)
+but keeps word timestamps, so hits can be pinned to the words themselves.
+Pass two re-decodes only a few seconds around each loan-number phrase
+("loan number", "account #") or spoken/written digit run with a wide beam,
+then splices the re-decoded words back over the first-pass ones.
+"""
+
+import re
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from scream_audio import load_audio
+from scream_numbers import SpokenNumberNormalizer
+
+SAMPLE_RATE = 16000
+
+# Phrases that introduce a loan number; bare nouns ("file", "case") are too common
+LOAN_KEYWORDS = re.compile(
+    r'\b(loan|account|application|reference|mortgage|case|file)\s*(number|num\b|no\.|#)',
+    re.IGNORECASE
+)
+# Any loan talk at all: the cascade triage escalates on these (recall over precision)
+LOAN_TOPICS = re.compile(
+    r'\b(loan|account|application|reference|mortgage|case|file)\s*(number|#|num)?\b',
+    re.IGNORECASE
+)
+DIGIT_RUN = re.compile(r'\d{4,}')
+
+
+@dataclass
+class RedecodeStats:
+    """Compute accounting for one two-pass transcription"""
+    first_pass_time: float = 0.0
+    second_pass_time: float = 0.0
+    audio_duration: float = 0.0
+    redecoded_seconds: float = 0.0
+    windows: List[Tuple[float, float]] = field(default_factory=list)
+
+    @property
+    def added_fraction(self) -> float:
+        """Second-pass compute as a fraction of total compute"""
+        total = self.first_pass_time + self.second_pass_time
+        return self.second_pass_time / total if total > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'first_pass_time': self.first_pass_time,
+            'second_pass_time': self.second_pass_time,
+            'added_fraction': self.added_fraction,
+            'redecoded_seconds': self.redecoded_seconds,
+            'windows': len(self.windows),
+        }
+
+
+class TargetedRedecoder:
+    """Greedy pass + wide-beam re-decode of a few seconds around loan-number mentions"""
+
+    def __init__(self, model, pad_seconds: float = 1.0, beam_size: int = 5,
+                 language: str = "en", lookahead_seconds: float = 4.0,
+                 max_window_seconds: float = 10.0):
+        self.model = model
+        # Decode context either side of a window (its words are not kept)
+        self.pad_seconds = pad_seconds
+        # After a keyword phrase the digits follow within a few seconds
+        self.lookahead_seconds = lookahead_seconds
+        # No single hit re-decodes more than this
+        self.max_window_seconds = max_window_seconds
+        self.beam_size = beam_size
+        self.language = language
+        # Lower threshold than the extractors: partial runs are still worth a look
+        self.normalizer = SpokenNumberNormalizer(min_digits=4)
+
+    def is_hit(self, text: str) -> bool:
+        """Does a piece of text mention a loan-number phrase or a digit run?"""
+        if LOAN_KEYWORDS.search(text):
+            return True
+        return bool(DIGIT_RUN.search(self.normalizer.normalize(text)))
+
+    def find_windows(self, words: List[dict]) -> List[Tuple[float, float]]:
+        """Merged time ranges to re-decode, each bounded, around hit words"""
+        spans = []
+
+        # Keyword phrases, matched over the joined words
+        offsets = []
+        text = ''
+        for word in words:
+            text += ' ' if text else ''
+            offsets.append(len(text))
+            text += word['word'].strip()
+        for match in LOAN_KEYWORDS.finditer(text):
+            first = bisect_right(offsets, match.start()) - 1
+            last = bisect_right(offsets, match.end() - 1) - 1
+            spans.append((words[first]['start'], words[last]['end'] + self.lookahead_seconds))
+
+        # Runs of number words / digits that normalize to 4+ digits
+        run = []
+        for word in words + [None]:
+            if word is not None and SpokenNumberNormalizer.is_number_token(word['word']):
+                run.append(word)
+                continue
+            if run and self.is_hit(' '.join(w['word'].strip() for w in run)):
+                spans.append((run[0]['start'], run[-1]['end']))
+            run = []
+
+        windows = []
+        for start, end in sorted(spans):
+            end = min(end, start + self.max_window_seconds)
+            if windows and start <= windows[-1][1]:
+                windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+            else:
+                windows.append((start, end))
+        return windows
+
+    def transcribe(self, audio, **first_pass_options):
+        """Two-pass transcribe of a path or 16kHz samples; returns (segments, info, RedecodeStats)"""
+        stats = RedecodeStats()
+
+        # Decode once, share the samples between both passes
+        if isinstance(audio, str):
+            audio = load_audio(audio, sampling_rate=SAMPLE_RATE)
+
+        options = dict(language=self.language, beam_size=1, best_of=1,
+                       temperature=0.0, condition_on_previous_text=False,
+                       vad_filter=True)
+        options.update(first_pass_options)
+        # Word timestamps are needed to locate the hits
+        options['without_timestamps'] = False
+        options['word_timestamps'] = True
+
+        start = time.time()
+        segments, info = self.model.transcribe(audio, **options)
+        segments = [{'start': s.start, 'end': s.end, 'text': s.text.strip(),
+                     'words': self._words(s.words or [], 0.0)}
+                    for s in segments]
+        stats.first_pass_time = time.time() - start
+        stats.audio_duration = info.duration
+
+        windows = self.find_windows([w for s in segments for w in s['words']])
+        stats.windows = windows
+        if not windows:
+            return [self._strip(s) for s in segments], info, stats
+
+        start = time.time()
+        redecoded = []
+        for window_start, window_end in windows:
+            # Decode with a little context either side; words outside the
+            # window are dropped again using the word timestamps
+            clip_start = max(0.0, window_start - self.pad_seconds)
+            clip_end = min(info.duration, window_end + self.pad_seconds)
+            clip = audio[int(clip_start * SAMPLE_RATE):int(clip_end * SAMPLE_RATE)]
+            wide, _ = self.model.transcribe(
+                clip,
+                language=self.language,
+                beam_size=self.beam_size,
+                temperature=0.0,
+                condition_on_previous_text=False,
+                vad_filter=False,
+                word_timestamps=True
+            )
+            words = [w for s in wide for w in self._words(s.words or [], clip_start)
+                     if window_start <= (w['start'] + w['end']) / 2 < window_end]
+            redecoded.append((window_start, window_end, words))
+            stats.redecoded_seconds += clip_end - clip_start
+        stats.second_pass_time = time.time() - start
+
+        return self._splice(segments, redecoded), info, stats
+
+    @staticmethod
+    def _words(words, offset: float) -> List[dict]:
+        """faster-whisper words as dicts in call time (word text keeps its leading space)"""
+        return [{'start': offset + w.start, 'end': offset + w.end, 'word': w.word} for w in words]
+
+    @staticmethod
+    def _strip(segment: dict) -> dict:
+        return {key: value for key, value in segment.items() if key != 'words'}
+
+    @staticmethod
+    def _splice(segments: List[dict], redecoded) -> List[dict]:
+        """Swap first-pass words inside each window for the re-decoded ones.
+
+        A window whose re-decode came back empty keeps its first-pass words.
+        """
+        windows = [(start, end, words) for start, end, words in redecoded if words]
+        pending = list(windows)
+
+        def replaced(word) -> bool:
+            middle = (word['start'] + word['end']) / 2
+            return any(start <= middle < end for start, end, _ in windows)
+
+        result = []
+        for segment in segments:
+            if not segment['words']:
+                result.append(TargetedRedecoder._strip(segment))
+                continue
+            kept = [w for w in segment['words'] if not replaced(w)]
+            added = []
+            # Each window's words land in the first segment that ends after it starts
+            while pending and pending[0][0] < segment['end']:
+                added.extend(pending.pop(0)[2])
+            if len(kept) == len(segment['words']) and not added:
+                result.append(TargetedRedecoder._strip(segment))
+                continue
+            words = sorted(kept + added, key=lambda w: w['start'])
+            if not words:
+                continue
+            result.append({
+                'start': words[0]['start'],
+                'end': words[-1]['end'],
+                'text': ''.join(w['word'] for w in words).strip(),
+                'redecoded': bool(added)
+            })
+        for _, _, words in pending:
+            result.append({'start': words[0]['start'], 'end': words[-1]['end'],
+                           'text': ''.join(w['word'] for w in words).strip(), 'redecoded': True})
+        return result
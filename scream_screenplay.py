@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+SCREAM Stereo Screenplay Decoding
+Left channel = underwriter, right channel = broker. Instead of transcribing
+one channel and then the other and re-sorting, both channels' speech
+clips go into one BatchedInferencePipeline job (interleaved by call time,
+so a batch holds both speakers), and the decoded segments are merged on
+start time with a k-way heap merge and folded into speaker turns while
+the job is still running.
+
+Usage:
+    transcriber = StereoTranscriber(model)
+    for turn in transcriber.iter_turns(left, right):
+        print(f"{turn['speaker']}: {turn['text']}")
+"""
+
+import heapq
+import logging
+from collections import deque
+from typing import Callable, Iterable, Iterator, List, Sequence
+
+import numpy as np
+from faster_whisper import BatchedInferencePipeline
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from scream_chunking import ChunkInfo, plan_chunks
+
+logger = logging.getLogger("SCREAM")
+
+SAMPLE_RATE = 16000
+SPEAKERS = ("UNDERWRITER", "BROKER")
+# Batched clips are decoded in one 30s window each
+MAX_CLIP_SECONDS = 30.0
+
+
+def demultiplex(segments: Iterable[dict], route: Callable[[dict], int],
+                count: int) -> List[Iterator[dict]]:
+    """Split one segment stream into `count` lazy streams.
+
+    Pulling from one stream buffers whatever the others are owed, so
+    memory stays bounded by how far the source runs ahead of the reader.
+    """
+    source = iter(segments)
+    buffers = [deque() for _ in range(count)]
+
+    def stream(index: int) -> Iterator[dict]:
+        buffer = buffers[index]
+        while True:
+            if buffer:
+                yield buffer.popleft()
+                continue
+            segment = next(source, None)
+            if segment is None:
+                return
+            buffers[route(segment)].append(segment)
+
+    return [stream(i) for i in range(count)]
+
+
+def merge_by_start(streams: Sequence[Iterable[dict]]) -> Iterator[dict]:
+    """k-way merge of per-speaker streams that are each in start order"""
+    return heapq.merge(*streams, key=lambda segment: segment['start'])
+
+
+def group_turns(segments: Iterable[dict]) -> Iterator[dict]:
+    """Fold consecutive segments from the same speaker into one turn"""
+    turn = None
+    for segment in segments:
+        if turn and turn['speaker'] == segment['speaker']:
+            turn['end'] = segment['end']
+            turn['text'] = f"{turn['text']} {segment['text']}".strip()
+            turn['segments'] += 1
+            continue
+        if turn:
+            yield turn
+        turn = {
+            'speaker': segment['speaker'],
+            'start': segment['start'],
+            'end': segment['end'],
+            'text': segment['text'],
+            'segments': 1
+        }
+    if turn:
+        yield turn
+
+
+class StereoTranscriber:
+    """Both channels of a stereo call as one batched decode, merged into turns"""
+
+    def __init__(self, model, speakers: Sequence[str] = SPEAKERS, batch_size: int = 8,
+                 beam_size: int = 1, language: str = "en"):
+        self.model = model
+        self.speakers = tuple(speakers)
+        self.batch_size = batch_size
+        self.beam_size = beam_size
+        self.language = language
+        self.info = None
+
+    def _clips(self, channels: Sequence[np.ndarray]) -> List[dict]:
+        """VAD clips for every channel in one timeline, ordered by call time"""
+        clips = []
+        offset = 0
+        for index, samples in enumerate(channels):
+            speech = get_speech_timestamps(samples, VadOptions(min_silence_duration_ms=500,
+                                                               speech_pad_ms=100))
+            for chunk in plan_chunks(speech, int(MAX_CLIP_SECONDS * SAMPLE_RATE), len(samples)):
+                clips.append({'start': offset + chunk['start'], 'end': offset + chunk['end'],
+                              'call_start': chunk['start'], 'channel': index})
+            offset += len(samples)
+        # Interleaving keeps both per-speaker streams moving, so the merge buffers little
+        clips.sort(key=lambda clip: (clip['call_start'], clip['channel']))
+        return clips
+
+    def iter_segments(self, left: np.ndarray, right: np.ndarray) -> Iterator[dict]:
+        """Segments from both channels in call-time order, with speaker labels"""
+        channels = (left, right)
+        duration = max(len(left), len(right)) / SAMPLE_RATE
+        clips = self._clips(channels)
+        self.info = ChunkInfo(language=self.language, duration=duration, chunks=len(clips))
+        if not clips:
+            return iter(())
+
+        # Channels sit end to end in one array; clips never straddle the seam
+        boundary = len(left) / SAMPLE_RATE
+        pipeline = BatchedInferencePipeline(model=self.model)
+        decoded, info = pipeline.transcribe(
+            np.concatenate(channels),
+            language=self.language,
+            beam_size=self.beam_size,
+            batch_size=self.batch_size,
+            clip_timestamps=[{'start': c['start'], 'end': c['end']} for c in clips],
+            without_timestamps=False
+        )
+        self.info.language = info.language
+
+        def label(segment) -> dict:
+            channel = 1 if segment.start >= boundary else 0
+            shift = boundary if channel else 0.0
+            return {
+                'start': round(segment.start - shift, 3),
+                'end': round(segment.end - shift, 3),
+                'text': segment.text.strip(),
+                'speaker': self.speakers[channel],
+                'channel': channel
+            }
+
+        labelled = (label(segment) for segment in decoded)
+        # Route on the channel, not the label: both sides may share a speaker name
+        streams = demultiplex(labelled, lambda s: s['channel'], len(channels))
+        return merge_by_start(streams)
+
+    def iter_turns(self, left: np.ndarray, right: np.ndarray) -> Iterator[dict]:
+        """Speaker turns, yielded as soon as the other speaker takes over"""
+        return group_turns(self.iter_segments(left, right))
+
+
+def format_screenplay(turns: Iterable[dict]) -> str:
+    """One 'SPEAKER: text' line per turn"""
+    return '\n'.join(f"{turn['speaker']}: {turn['text']}" for turn in turns)
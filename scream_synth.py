@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+SCREAM Synthetic Telephony Corpus
+Generates a reproducible stand-in for the recorder share so the throughput
+work (decode stage, windowed reader, probe cache, triage, CPU farm) can be
+benchmarked on a plain Linux box without the NFS mount or a GPU.
+
+Each call is an 8 kHz stereo WAV (G.711 μ-law or 16-bit PCM, left =
+underwriter, right = broker) in the production layout
+YYYY/MM/DD/HH/<orkuid>.wav, built from:
+    speech    - turn-taking voiced syllables (harmonics under two formants,
+                syllable-rate envelope) with the odd fricative burst
+    hold      - flat chord progressions, what triage should call music
+    silence   - line noise only (dead air, abandoned calls)
+    voicemail - a short greeting, a beep, then dead air
+
+Every call is drawn from its own generator seeded by (seed, index), so the
+same seed always produces the same bytes and a larger corpus starts with
+the smaller one. Matching orktape / orksegment / orkuser rows go into a
+SQLite file and the ground truth (kind, speech and hold seconds per call)
+into manifest.json.
+
+Usage:
+    python scream_synth.py corpus/ --calls 500 --seed 7
+    python scream_synth.py corpus/ --calls 50 --median 900 --max 7200 --pcm 0.5
+
+    corpus = generate_corpus("corpus/", CorpusSpec(calls=200))
+"""
+
+import os
+import sys
+import json
+import time
+import string
+import sqlite3
+import argparse
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from scream_audio import WAVE_FORMAT_MULAW, WAVE_FORMAT_PCM
+
+RATE = 8000
+BANDWIDTH = 3400.0
+ORKUID_ALPHABET = np.array(list(string.ascii_uppercase + string.digits))
+
+KINDS = ("conversation", "hold", "voicemail", "silence")
+
+# (F1, F2) in Hz for a handful of vowels
+VOWELS = np.array([(730, 1090), (270, 2290), (530, 1840), (660, 1720),
+                   (300, 870), (570, 840), (440, 1020), (490, 1350)], dtype=np.float64)
+
+# Hold music: I-vi-IV-V in a few keys, as note frequencies
+CHORDS = np.array([(0, 4, 7), (9, 12, 16), (5, 9, 12), (7, 11, 14)], dtype=np.float64)
+
+FIRST_NAMES = ["Eric", "Celina", "Negin", "Maria", "James", "Priya", "Daniel", "Aisha",
+               "Tom", "Keiko", "Luis", "Hannah", "Omar", "Grace", "Victor", "Nina"]
+LAST_NAMES = ["Rawlins", "Fischer", "Rahimifar", "Lopez", "Carter", "Shah", "Brooks", "Khan",
+              "Nguyen", "Sato", "Ramirez", "Cole", "Haddad", "Kim", "Novak", "Petrov"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orkuser (
+    id INTEGER PRIMARY KEY,
+    firstname TEXT,
+    lastname TEXT,
+    login TEXT
+);
+CREATE TABLE IF NOT EXISTS orktape (
+    id INTEGER PRIMARY KEY,
+    orkUid TEXT UNIQUE NOT NULL,
+    timestamp TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    localParty TEXT,
+    remoteParty TEXT,
+    direction TEXT
+);
+CREATE TABLE IF NOT EXISTS orksegment (
+    id INTEGER PRIMARY KEY,
+    tape_id INTEGER NOT NULL,
+    user_id INTEGER,
+    timestamp TEXT,
+    duration INTEGER,
+    localParty TEXT,
+    remoteParty TEXT,
+    direction TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_orktape_timestamp ON orktape (timestamp);
+CREATE INDEX IF NOT EXISTS idx_orksegment_tape ON orksegment (tape_id);
+CREATE INDEX IF NOT EXISTS idx_orksegment_user ON orksegment (user_id);
+"""
+
+
+@dataclass
+class CorpusSpec:
+    """What to generate; the same spec and seed always give the same corpus"""
+    calls: int = 200
+    seed: int = 0
+    start_date: str = "2024-06-03"
+    days: int = 5
+    # Share of each kind of call
+    mix: Dict[str, float] = field(default_factory=lambda: {
+        "conversation": 0.75, "hold": 0.08, "voicemail": 0.09, "silence": 0.08})
+    # Conversation length: lognormal around the median, clipped to [min, max]
+    duration_median: float = 150.0
+    duration_sigma: float = 0.9
+    min_duration: float = 8.0
+    max_duration: float = 1800.0
+    # Conversations that put one side on hold part-way through
+    hold_probability: float = 0.2
+    hold_median: float = 40.0
+    # Remaining calls are 16-bit PCM
+    ulaw_ratio: float = 0.9
+    users: int = 12
+    speech_dbfs: float = -20.0
+    music_dbfs: float = -22.0
+    noise_dbfs: float = -62.0
+
+
+@dataclass
+class SyntheticCall:
+    """One generated recording and what is really in it"""
+    id: int
+    orkuid: str
+    filename: str
+    timestamp: str
+    duration: float
+    kind: str
+    codec: str
+    user_id: int
+    direction: str
+    local_party: str
+    remote_party: str
+    speech_seconds: List[float]
+    hold_seconds: float
+
+    @property
+    def expected_verdict(self) -> str:
+        """What scream_triage should say about the mixed-down call"""
+        return {"conversation": "speech", "hold": "music"}.get(self.kind, "silence")
+
+
+def _encode_ulaw_table() -> np.ndarray:
+    """int16 (viewed as uint16) -> G.711 μ-law byte, for all 65536 values"""
+    x = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32)
+    sign = np.where(x < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(x), 32635) + 0x84
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 7
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+ULAW_ENCODE = _encode_ulaw_table()
+
+
+def encode(samples: np.ndarray, codec: str) -> bytes:
+    """float32 frames in [-1, 1) -> interleaved WAV data bytes"""
+    pcm = np.clip(np.round(samples * 32768.0), -32768, 32767).astype(np.int16)
+    if codec == "ulaw":
+        return ULAW_ENCODE[pcm.view(np.uint16)].tobytes()
+    return pcm.astype('<i2').tobytes()
+
+
+def write_wav(path: str, samples: np.ndarray, codec: str = "ulaw", rate: int = RATE):
+    """(frames, channels) float32 -> μ-law or 16-bit PCM WAV"""
+    channels = samples.shape[1] if samples.ndim == 2 else 1
+    format_tag, bits = (WAVE_FORMAT_MULAW, 8) if codec == "ulaw" else (WAVE_FORMAT_PCM, 16)
+    data = encode(samples, codec)
+    block_align = channels * bits // 8
+    with open(path, 'wb') as f:
+        f.write(b'RIFF' + (36 + len(data)).to_bytes(4, 'little') + b'WAVE')
+        f.write(b'fmt ' + (16).to_bytes(4, 'little'))
+        f.write(format_tag.to_bytes(2, 'little') + channels.to_bytes(2, 'little'))
+        f.write(rate.to_bytes(4, 'little') + (rate * block_align).to_bytes(4, 'little'))
+        f.write(block_align.to_bytes(2, 'little') + bits.to_bytes(2, 'little'))
+        f.write(b'data' + len(data).to_bytes(4, 'little'))
+        f.write(data)
+
+
+def _amplitude(dbfs: float) -> float:
+    return 10.0 ** (dbfs / 20.0)
+
+
+def _syllable(rng: np.random.Generator, seconds: float, f0: float) -> np.ndarray:
+    """One voiced syllable at unit RMS: gliding harmonics shaped by two formants"""
+    n = max(16, int(seconds * RATE))
+    t = np.arange(n) / RATE
+    pitch = f0 * (1.0 + rng.uniform(-0.12, 0.12) * t / seconds)
+    phase = 2.0 * np.pi * np.cumsum(pitch) / RATE
+    k = np.arange(1, int(BANDWIDTH / pitch.max()) + 1, dtype=np.float64)
+    f1, f2 = VOWELS[rng.integers(len(VOWELS))] * rng.uniform(0.9, 1.1)
+    weights = (1.0 / (1.0 + ((k * f0 - f1) / 110.0) ** 2)
+               + 0.6 / (1.0 + ((k * f0 - f2) / 160.0) ** 2)) / k ** 0.5
+    weights /= np.sqrt((weights ** 2).sum() / 2.0)
+    voiced = weights @ np.sin(np.outer(k, phase))
+    return voiced * np.sin(np.pi * t / seconds) ** 0.7
+
+
+def _fricative(rng: np.random.Generator, seconds: float) -> np.ndarray:
+    """Short high-passed noise burst (s, f, sh) at unit RMS"""
+    n = max(16, int(seconds * RATE))
+    noise = np.diff(rng.standard_normal(n + 1)) / np.sqrt(2.0)
+    return noise * np.hanning(n)
+
+
+def _speak(rng: np.random.Generator, track: np.ndarray, start: float, end: float,
+           f0: float, level: float) -> float:
+    """Fill [start, end) of one channel with words; returns the seconds voiced"""
+    position = start
+    voiced = 0.0
+    while position < end:
+        for _ in range(rng.integers(1, 4)):
+            if rng.random() < 0.25:
+                seconds = rng.uniform(0.05, 0.12)
+                _place(track, position, 0.3 * level * _fricative(rng, seconds), end)
+                position += seconds
+            seconds = rng.uniform(0.12, 0.28)
+            if position + seconds > end:
+                return voiced
+            _place(track, position, level * rng.uniform(0.6, 1.2)
+                   * _syllable(rng, seconds, f0 * rng.uniform(0.9, 1.1)), end)
+            position += seconds
+            voiced += seconds
+        # Word gap, now and then a phrase pause
+        position += rng.uniform(0.3, 0.7) if rng.random() < 0.15 else rng.uniform(0.04, 0.18)
+    return voiced
+
+
+def _hold_music(rng: np.random.Generator, seconds: float, level: float) -> np.ndarray:
+    """Looped chord progression at a steady level (unit tremolo depth of 5%)"""
+    n = int(seconds * RATE)
+    root = 220.0 * 2.0 ** (rng.integers(0, 7) / 12.0)
+    beat = rng.uniform(1.5, 2.5)
+    t = np.arange(n) / RATE
+    chord = (t // beat).astype(np.int64) % len(CHORDS)
+    music = np.zeros(n)
+    for voice in range(CHORDS.shape[1]):
+        freq = root * 2.0 ** (CHORDS[chord, voice] / 12.0)
+        phase = 2.0 * np.pi * np.cumsum(freq) / RATE
+        music += np.sin(phase) + 0.3 * np.sin(2.0 * phase)
+    music *= 1.0 + 0.05 * np.sin(2.0 * np.pi * 4.0 * t)
+    return level * music / np.sqrt(music.var() + 1e-12)
+
+
+def _place(track: np.ndarray, start: float, signal: np.ndarray, end: Optional[float] = None):
+    begin = int(start * RATE)
+    stop = min(len(track), begin + len(signal), int(end * RATE) if end is not None else len(track))
+    if stop > begin:
+        track[begin:stop] += signal[:stop - begin]
+
+
+def _duration(rng: np.random.Generator, spec: CorpusSpec, kind: str) -> float:
+    if kind == "voicemail":
+        return float(rng.uniform(12.0, 45.0))
+    if kind == "silence":
+        return float(rng.uniform(spec.min_duration, 90.0))
+    seconds = spec.duration_median * float(np.exp(spec.duration_sigma * rng.standard_normal()))
+    if kind == "hold":
+        seconds = max(seconds, 60.0)
+    return float(np.clip(seconds, spec.min_duration, spec.max_duration))
+
+
+def render_call(rng: np.random.Generator, spec: CorpusSpec, kind: str,
+                duration: float) -> Tuple[np.ndarray, List[float], float]:
+    """(frames, 2) float32 audio, voiced seconds per channel, hold seconds"""
+    frames = int(round(duration * RATE))
+    audio = np.zeros((2, frames))
+    voiced = [0.0, 0.0]
+    hold = 0.0
+    speech = _amplitude(spec.speech_dbfs)
+    pitch = [rng.uniform(95.0, 230.0), rng.uniform(95.0, 230.0)]
+    levels = [speech * rng.uniform(0.7, 1.3), speech * rng.uniform(0.7, 1.3)]
+
+    if kind == "conversation":
+        held = None
+        if rng.random() < spec.hold_probability and duration > 60.0:
+            length = min(duration / 4, spec.hold_median * float(np.exp(0.5 * rng.standard_normal())))
+            begin = rng.uniform(10.0, duration - length - 5.0)
+            held = (begin, begin + length, int(rng.integers(2)))
+        position = rng.uniform(0.3, 1.5)
+        side = int(rng.integers(2))
+        while position < duration - 0.5:
+            if held and held[0] <= position < held[1]:
+                position = held[1] + rng.uniform(0.2, 1.0)
+                continue
+            length = min(float(np.exp(np.log(3.5) + 0.7 * rng.standard_normal())), 25.0)
+            end = min(position + length, duration, held[0] if held and position < held[0] else duration)
+            voiced[side] += _speak(rng, audio[side], position, end, pitch[side], levels[side])
+            # Mostly alternate; sometimes the same side carries on, or a quick backchannel
+            if rng.random() < 0.8:
+                side = 1 - side
+            position = end + rng.uniform(0.15, 1.2)
+        if held:
+            begin, end, side = held
+            _place(audio[side], begin, _hold_music(rng, end - begin, _amplitude(spec.music_dbfs)))
+            hold = end - begin
+    elif kind == "hold":
+        # Queue call: a few words, then music for the rest
+        side = int(rng.integers(2))
+        voiced[side] += _speak(rng, audio[side], 0.5, 2.0, pitch[side], levels[side])
+        _place(audio[side], 2.5, _hold_music(rng, duration - 2.5, _amplitude(spec.music_dbfs)))
+        hold = duration - 2.5
+    elif kind == "voicemail":
+        # Greeting under the triage minimum, a beep, then nobody talks
+        side = int(rng.integers(2))
+        voiced[side] += _speak(rng, audio[side], 0.5, rng.uniform(0.9, 1.3), pitch[side], levels[side])
+        beep = np.sin(2.0 * np.pi * 1000.0 * np.arange(int(0.4 * RATE)) / RATE)
+        _place(audio[side], 2.2, 0.3 * beep)
+
+    noise = _amplitude(spec.noise_dbfs)
+    audio += noise * rng.standard_normal(audio.shape)
+    np.clip(audio, -1.0, 32767 / 32768, out=audio)
+    return audio.T.astype(np.float32), [round(v, 2) for v in voiced], round(hold, 2)
+
+
+def plan_call(spec: CorpusSpec, index: int) -> Tuple[np.random.Generator, dict]:
+    """Everything about call `index` that does not need audio, from its own generator"""
+    rng = np.random.default_rng([spec.seed, index])
+    kinds = [k for k in KINDS if spec.mix.get(k, 0) > 0]
+    weights = np.array([spec.mix[k] for k in kinds], dtype=np.float64)
+    kind = kinds[rng.choice(len(kinds), p=weights / weights.sum())]
+    day = datetime.strptime(spec.start_date, "%Y-%m-%d") + timedelta(days=int(rng.integers(spec.days)))
+    # Business hours, 08:00-18:00
+    timestamp = day + timedelta(seconds=int(rng.integers(8 * 3600, 18 * 3600)))
+    orkuid = "".join(rng.choice(ORKUID_ALPHABET, 16))
+    return rng, {
+        'id': index + 1,
+        'orkuid': orkuid,
+        'filename': f"{timestamp.strftime('%Y/%m/%d/%H')}/{orkuid}.wav",
+        'timestamp': timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+        'duration': round(_duration(rng, spec, kind), 3),
+        'kind': kind,
+        'codec': "ulaw" if rng.random() < spec.ulaw_ratio else "pcm",
+        'user_id': int(rng.integers(spec.users)) + 1,
+        'direction': "IN" if rng.random() < 0.55 else "OUT",
+        'local_party': str(2000 + int(rng.integers(spec.users))),
+        'remote_party': "".join(str(d) for d in rng.integers(0, 10, 10)),
+    }
+
+
+def generate_call(root: str, spec: CorpusSpec, index: int) -> SyntheticCall:
+    rng, plan = plan_call(spec, index)
+    audio, voiced, hold = render_call(rng, spec, plan['kind'], plan['duration'])
+    path = os.path.join(root, plan['filename'])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_wav(path, audio, plan['codec'])
+    # mtime = end of the call, as the recorder leaves it
+    ended = datetime.strptime(plan['timestamp'], "%Y-%m-%d %H:%M:%S").timestamp() + plan['duration']
+    os.utime(path, (ended, ended))
+    return SyntheticCall(speech_seconds=voiced, hold_seconds=hold, **plan)
+
+
+def write_database(path: str, calls: List[SyntheticCall], spec: CorpusSpec):
+    """Oreka-shaped orkuser / orktape / orksegment rows for the generated calls"""
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO orkuser (id, firstname, lastname, login) VALUES (?, ?, ?, ?)",
+        [(i + 1, FIRST_NAMES[i % len(FIRST_NAMES)], LAST_NAMES[(i * 7) % len(LAST_NAMES)],
+          f"{FIRST_NAMES[i % len(FIRST_NAMES)][0]}{LAST_NAMES[(i * 7) % len(LAST_NAMES)]}".lower())
+         for i in range(spec.users)])
+    conn.executemany(
+        "INSERT INTO orktape (id, orkUid, timestamp, duration, filename, localParty, remoteParty, "
+        "direction) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(c.id, c.orkuid, c.timestamp, int(round(c.duration)), c.filename, c.local_party,
+          c.remote_party, c.direction) for c in calls])
+    conn.executemany(
+        "INSERT INTO orksegment (id, tape_id, user_id, timestamp, duration, localParty, remoteParty, "
+        "direction) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(c.id, c.id, c.user_id, c.timestamp, int(round(c.duration)), c.local_party,
+          c.remote_party, c.direction) for c in calls])
+    conn.commit()
+    conn.close()
+
+
+def generate_corpus(root: str, spec: CorpusSpec, database: Optional[str] = None,
+                    progress: bool = False) -> List[SyntheticCall]:
+    """Write spec.calls recordings under root, plus oreka.db and manifest.json"""
+    os.makedirs(root, exist_ok=True)
+    calls = []
+    for index in range(spec.calls):
+        calls.append(generate_call(root, spec, index))
+        if progress and (index + 1) % 50 == 0:
+            print(f"  {index + 1}/{spec.calls} calls")
+
+    write_database(database or os.path.join(root, "oreka.db"), calls, spec)
+    with open(os.path.join(root, "manifest.json"), 'w') as f:
+        json.dump({
+            'spec': asdict(spec),
+            'calls': [dict(asdict(c), expected_verdict=c.expected_verdict) for c in calls]
+        }, f, indent=2)
+    return calls
+
+
+def load_manifest(root: str) -> dict:
+    """manifest.json of a generated corpus, keyed by orkuid under 'by_orkuid'"""
+    with open(os.path.join(root, "manifest.json")) as f:
+        manifest = json.load(f)
+    manifest['by_orkuid'] = {call['orkuid']: call for call in manifest['calls']}
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic telephony corpus")
+    parser.add_argument('root', help='Output directory (YYYY/MM/DD/HH/<orkuid>.wav underneath)')
+    parser.add_argument('--calls', type=int, default=200, help='Recordings to generate')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus seed')
+    parser.add_argument('--start-date', default='2024-06-03', help='First day (YYYY-MM-DD)')
+    parser.add_argument('--days', type=int, default=5, help='Days to spread calls over')
+    parser.add_argument('--median', type=float, default=150.0, help='Median conversation seconds')
+    parser.add_argument('--sigma', type=float, default=0.9, help='Lognormal sigma of durations')
+    parser.add_argument('--min', type=float, default=8.0, help='Shortest conversation seconds')
+    parser.add_argument('--max', type=float, default=1800.0, help='Longest conversation seconds')
+    parser.add_argument('--mix', help='Kind shares, e.g. conversation=0.7,hold=0.1,'
+                                      'voicemail=0.1,silence=0.1')
+    parser.add_argument('--hold', type=float, default=0.2,
+                        help='Share of conversations with a hold segment')
+    parser.add_argument('--pcm', type=float, default=0.1, help='Share written as 16-bit PCM')
+    parser.add_argument('--users', type=int, default=12, help='orkuser rows')
+    parser.add_argument('--db', help='SQLite path (default: <root>/oreka.db)')
+    args = parser.parse_args()
+
+    spec = CorpusSpec(calls=args.calls, seed=args.seed, start_date=args.start_date, days=args.days,
+                      duration_median=args.median, duration_sigma=args.sigma,
+                      min_duration=args.min, max_duration=args.max, hold_probability=args.hold,
+                      ulaw_ratio=1.0 - args.pcm, users=args.users)
+    if args.mix:
+        spec.mix = {k: float(v) for k, v in (part.split('=') for part in args.mix.split(','))}
+        unknown = set(spec.mix) - set(KINDS)
+        if unknown:
+            parser.error(f"Unknown call kinds: {', '.join(sorted(unknown))}")
+
+    start = time.time()
+    print(f"Generating {spec.calls} calls (seed {spec.seed}) under {args.root}...")
+    calls = generate_corpus(args.root, spec, args.db, progress=True)
+    elapsed = time.time() - start
+
+    audio = sum(c.duration for c in calls)
+    kinds = {}
+    for call in calls:
+        kinds[call.kind] = kinds.get(call.kind, 0) + 1
+    print(f"Wrote {len(calls)} recordings, {audio / 3600:.2f}h of audio in {elapsed:.1f}s")
+    print(f"Kinds: {', '.join(f'{n} {k}' for k, n in sorted(kinds.items()))}")
+    print(f"Database: {args.db or os.path.join(args.root, 'oreka.db')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
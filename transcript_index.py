@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Full-text search over transcript segments (SQLite FTS5)
+Transcripts only exist as files on disk, so searching what was said means
+grepping thousands of files. This keeps a local inverted index of every
+transcript line with its call's orkuid, timestamp, user and loan numbers. Hits are ranked
+by BM25 among the newest RANK_WINDOW matching segments.
+
+The pipeline adds each transcript as soon as it is written; the catch-up job
+indexes whatever call_transcripts_v2 gained since its last run (for hosts
+that do not share the index file with the pipeline).
+
+Segment rowids are <transcript id> * SEGMENT_SLOTS + <line number>, so a
+re-transcribed call replaces its segments with one range delete.
+
+Usage:
+    get_index().add(orkuid, segments, call_timestamp, user_name, loan_numbers)
+    get_index().search('"appraisal waiver"', start="2024-06-01")
+
+    python transcript_index.py              # index new transcripts
+    python transcript_index.py --rebuild    # re-index everything
+    python transcript_index.py --search "appraisal waiver"
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+INDEX_PATH = os.environ.get('TRANSCRIPT_INDEX_PATH', 'transcript_index.db')
+TRANSCRIPT_ROOT = os.environ.get('TRANSCRIPT_ROOT', 'C:/transcripts')
+SEGMENT_SLOTS = 1 << 16
+# BM25 ranks only the newest this-many matching segments, so a word that is
+# in every other call costs about the same as a rare phrase
+RANK_WINDOW = int(os.environ.get('TRANSCRIPT_RANK_WINDOW', 10000))
+SYNC_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY,
+    orkuid TEXT NOT NULL UNIQUE,
+    call_ts TEXT,
+    user_name TEXT,
+    loan_numbers TEXT,
+    segment_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_transcripts_call_ts ON transcripts(call_ts);
+CREATE INDEX IF NOT EXISTS idx_transcripts_user ON transcripts(user_name);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS segments USING fts5(
+    text,
+    start UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+
+CREATE TABLE IF NOT EXISTS index_state (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Anything that looks like FTS5 query syntax is passed through as written
+FTS_OPERATORS = ('"', '*', ' AND ', ' OR ', ' NOT ', 'NEAR(', '^')
+
+Segment = Union[str, Tuple[Optional[float], str]]
+
+
+def match_expression(query: str) -> str:
+    """FTS5 MATCH string: plain words become quoted terms that must all match"""
+    query = query.strip()
+    if any(op in query for op in FTS_OPERATORS):
+        return query
+    terms = [term.replace('"', '') for term in query.split()]
+    return " ".join(f'"{term}"' for term in terms if term)
+
+
+def _timestamp_text(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d 00:00:00')
+    return str(value)
+
+
+class TranscriptIndex:
+    """One SQLite connection to the index (use one instance per thread)"""
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        # WAL lets the API read while the pipeline or catch-up job writes
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    # Writes
+    def add(self, orkuid: str, segments: Iterable[Segment], call_timestamp=None,
+            user_name: Optional[str] = None, loan_numbers: Optional[Sequence[str]] = None,
+            commit: bool = True) -> int:
+        """Index (or re-index) one transcript; segments are lines or (start, text)"""
+        rows = []
+        for segment in segments:
+            start, text = (None, segment) if isinstance(segment, str) else segment
+            text = text.strip()
+            if text:
+                rows.append((start, text))
+        if len(rows) > SEGMENT_SLOTS:
+            tail = " ".join(text for _, text in rows[SEGMENT_SLOTS - 1:])
+            rows = rows[:SEGMENT_SLOTS - 1] + [(rows[SEGMENT_SLOTS - 1][0], tail)]
+
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            INSERT INTO transcripts (orkuid, call_ts, user_name, loan_numbers)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(orkuid) DO UPDATE SET
+                call_ts = COALESCE(excluded.call_ts, call_ts),
+                user_name = COALESCE(excluded.user_name, user_name),
+                loan_numbers = COALESCE(excluded.loan_numbers, loan_numbers)
+        """, (orkuid, _timestamp_text(call_timestamp), user_name,
+              ",".join(loan_numbers) if loan_numbers else None))
+        cursor.execute("SELECT id, segment_count FROM transcripts WHERE orkuid = ?", (orkuid,))
+        row = cursor.fetchone()
+        base = row['id'] * SEGMENT_SLOTS
+
+        if row['segment_count']:
+            cursor.execute("DELETE FROM segments WHERE rowid BETWEEN ? AND ?",
+                           (base, base + row['segment_count'] - 1))
+        cursor.executemany("INSERT INTO segments (rowid, text, start) VALUES (?, ?, ?)",
+                           [(base + seq, text, start) for seq, (start, text) in enumerate(rows)])
+        cursor.execute("UPDATE transcripts SET segment_count = ? WHERE id = ?", (len(rows), row['id']))
+        if commit:
+            self.conn.commit()
+        return len(rows)
+
+    def remove(self, orkuid: str):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id, segment_count FROM transcripts WHERE orkuid = ?", (orkuid,))
+        row = cursor.fetchone()
+        if row:
+            base = row['id'] * SEGMENT_SLOTS
+            cursor.execute("DELETE FROM segments WHERE rowid BETWEEN ? AND ?",
+                           (base, base + max(row['segment_count'], 1) - 1))
+            cursor.execute("DELETE FROM transcripts WHERE id = ?", (row['id'],))
+            self.conn.commit()
+
+    def optimize(self):
+        """Merge FTS segments (after a bulk load)"""
+        self.conn.execute("INSERT INTO segments (segments) VALUES ('optimize')")
+        self.conn.commit()
+
+    def get_state(self, name: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM index_state WHERE name = ?", (name,)).fetchone()
+        return row['value'] if row else None
+
+    def set_state(self, name: str, value: str):
+        self.conn.execute("REPLACE INTO index_state (name, value) VALUES (?, ?)", (name, value))
+        self.conn.commit()
+
+    # Reads
+    def search(self, query: str, start=None, end=None, orkuid: Optional[str] = None,
+               user_name: Optional[str] = None, limit: int = 20, offset: int = 0,
+               facets: bool = False) -> dict:
+        """Ranked segment hits with highlighted snippets.
+
+        start/end bound the call timestamp (dates or 'YYYY-MM-DD[ HH:MM:SS]'
+        strings; a bare end date is inclusive). facets adds hit counts per day
+        over every match, which costs a full scan of the matches. Raises
+        ValueError on a query FTS5 cannot parse.
+        """
+        match = match_expression(query)
+        if not match:
+            raise ValueError("Empty query")
+
+        filters = ""
+        params = [match]
+        if start:
+            filters += " AND t.call_ts >= ?"
+            params.append(_timestamp_text(start))
+        if end:
+            if isinstance(end, date) and not isinstance(end, datetime):
+                end = end + timedelta(days=1)
+                filters += " AND t.call_ts < ?"
+            else:
+                filters += " AND t.call_ts <= ?"
+            params.append(_timestamp_text(end))
+        if orkuid:
+            # One call's segments are a rowid range, which FTS5 can seek to
+            filters += (f" AND segments.rowid BETWEEN (SELECT id FROM transcripts WHERE orkuid = ?) * {SEGMENT_SLOTS}"
+                        f" AND (SELECT id FROM transcripts WHERE orkuid = ?) * {SEGMENT_SLOTS} + {SEGMENT_SLOTS - 1}")
+            params.extend([orkuid, orkuid])
+        if user_name:
+            filters += " AND t.user_name = ?"
+            params.append(user_name)
+
+        started = time.perf_counter()
+        try:
+            hits = self.conn.execute(f"""
+                SELECT
+                    t.orkuid,
+                    t.call_ts,
+                    t.user_name,
+                    t.loan_numbers,
+                    segments.rowid - t.id * {SEGMENT_SLOTS} as seq,
+                    segments.start,
+                    snippet(segments, 0, '<mark>', '</mark>', '…', 16) as snippet,
+                    bm25(segments) as score
+                FROM segments
+                JOIN transcripts t ON t.id = segments.rowid / {SEGMENT_SLOTS}
+                WHERE segments MATCH ? {filters}
+                  AND segments.rowid >= (
+                      SELECT COALESCE(MIN(rowid), 0) FROM (
+                          SELECT segments.rowid as rowid
+                          FROM segments
+                          JOIN transcripts t ON t.id = segments.rowid / {SEGMENT_SLOTS}
+                          WHERE segments MATCH ? {filters}
+                          ORDER BY segments.rowid DESC
+                          LIMIT {RANK_WINDOW}
+                      )
+                  )
+                ORDER BY score
+                LIMIT ? OFFSET ?
+            """, params + params + [limit, offset]).fetchall()
+
+            by_day = []
+            if facets:
+                by_day = self.conn.execute(f"""
+                    SELECT substr(t.call_ts, 1, 10) as day, COUNT(DISTINCT t.id) as calls, COUNT(*) as hits
+                    FROM segments
+                    JOIN transcripts t ON t.id = segments.rowid / {SEGMENT_SLOTS}
+                    WHERE segments MATCH ? {filters}
+                    GROUP BY day
+                    ORDER BY day DESC
+                    LIMIT 31
+                """, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query: {e}")
+
+        return {
+            'query': query,
+            'match': match,
+            'hits': [
+                {
+                    'orkuid': row['orkuid'],
+                    'call_timestamp': row['call_ts'],
+                    'user_name': row['user_name'],
+                    'loan_numbers': row['loan_numbers'].split(",") if row['loan_numbers'] else [],
+                    'segment': row['seq'],
+                    'start': row['start'],
+                    'snippet': row['snippet'],
+                    'score': round(-row['score'], 4)
+                }
+                for row in hits
+            ],
+            'facets': {'by_day': [dict(row) for row in by_day]},
+            'took_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def stats(self) -> dict:
+        row = self.conn.execute(
+            "SELECT COUNT(*) as transcripts, COALESCE(SUM(segment_count), 0) as segments FROM transcripts"
+        ).fetchone()
+        return {
+            'transcripts': row['transcripts'],
+            'segments': row['segments'],
+            'watermark': self.get_state('catch_up'),
+            'size_mb': round(os.path.getsize(self.path) / 1024 / 1024, 1) if os.path.exists(self.path) else 0
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+_local = threading.local()
+
+
+def get_index() -> TranscriptIndex:
+    """This thread's index connection, opened on first use"""
+    index = getattr(_local, 'index', None)
+    if index is None:
+        index = _local.index = TranscriptIndex()
+    return index
+
+
+def read_transcript(transcript_path: str) -> Optional[List[str]]:
+    """Lines of a transcript file (None if it is not on this host)"""
+    # Pipeline paths are relative to TRANSCRIPT_ROOT; quick-scan ones to the working directory
+    for path in (os.path.join(TRANSCRIPT_ROOT, transcript_path.lstrip('/')), transcript_path):
+        if os.path.exists(path):
+            with open(path, encoding='utf-8', errors='replace') as f:
+                return f.read().splitlines()
+    return None
+
+
+def catch_up(index: TranscriptIndex, rebuild: bool = False) -> dict:
+    """Index transcripts written or updated since the last run"""
+    from loan_db import get_db_connection
+
+    watermark = None if rebuild else index.get_state('catch_up')
+    last_orkuid = ''
+    counts = {'indexed': 0, 'missing': 0, 'segments': 0}
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        while True:
+            condition = ""
+            params = []
+            if watermark:
+                condition = " AND (ct.updated_at > %s OR (ct.updated_at = %s AND ct.orkuid > %s))"
+                params = [watermark, watermark, last_orkuid]
+            cursor.execute(f"""
+                SELECT
+                    ct.orkuid,
+                    ct.transcript_path,
+                    ct.loan_numbers,
+                    ct.updated_at,
+                    t.timestamp,
+                    (SELECT MAX(l.user_name) FROM loan_number_index l WHERE l.orkuid = ct.orkuid) as user_name
+                FROM call_transcripts_v2 ct
+                LEFT JOIN orktape t ON t.orkUid = ct.orkuid
+                WHERE ct.transcript_path IS NOT NULL AND ct.transcript_path != ''
+                  AND ct.updated_at IS NOT NULL {condition}
+                ORDER BY ct.updated_at, ct.orkuid
+                LIMIT %s
+            """, params + [SYNC_BATCH])
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            for row in rows:
+                lines = read_transcript(row['transcript_path'])
+                if lines is None:
+                    counts['missing'] += 1
+                    continue
+                try:
+                    loans = json.loads(row['loan_numbers']) if row['loan_numbers'] else []
+                except ValueError:
+                    loans = []
+                counts['segments'] += index.add(row['orkuid'], lines, row['timestamp'],
+                                                row['user_name'], loans, commit=False)
+                counts['indexed'] += 1
+
+            watermark = _timestamp_text(rows[-1]['updated_at'])
+            last_orkuid = rows[-1]['orkuid']
+            index.conn.commit()
+            index.set_state('catch_up', watermark)
+            print(f"  indexed {counts['indexed']} transcripts (up to {watermark})")
+    finally:
+        cursor.close()
+        conn.close()
+
+    if rebuild:
+        index.optimize()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the transcript full-text index")
+    parser.add_argument('--rebuild', action='store_true', help='Re-index every transcript')
+    parser.add_argument('--search', help='Run a query against the index instead')
+    parser.add_argument('--stats', action='store_true', help='Show index size')
+    args = parser.parse_args()
+
+    index = TranscriptIndex()
+    try:
+        if args.search:
+            result = index.search(args.search)
+            for hit in result['hits']:
+                print(f"{hit['call_timestamp']}  {hit['orkuid']}  {hit['snippet']}")
+            print(f"\n{len(result['hits'])} hits in {result['took_ms']}ms")
+            return
+        if args.stats:
+            print(index.stats())
+            return
+
+        start = time.time()
+        counts = catch_up(index, rebuild=args.rebuild)
+        print(f"✓ Indexed {counts['indexed']} transcripts ({counts['segments']} segments, "
+              f"{counts['missing']} files missing) in {time.time() - start:.1f}s")
+    except Exception as e:
+        print(f"❌ Transcript indexing failed: {e}")
+        sys.exit(1)
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
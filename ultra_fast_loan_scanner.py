@@ -12,6 +12,8 @@ import time
 import pymysql
 import subprocess
 from faster_whisper import WhisperModel
+from scream_numbers import normalize_spoken_numbers
+from loan_rollups import refresh_after_ingest
 from datetime import datetime
 import wave
 import numpy as np
@@ -88,8 +90,9 @@ class UltraFastLoanScanner:
             
             # Extract loan numbers
             loans = set()
+            loan_text = normalize_spoken_numbers(text_30s)
             for pattern in self.loan_patterns:
-                for match in pattern.findall(text_30s):
+                for match in pattern.findall(loan_text):
                     if isinstance(match, tuple):
                         match = match[0]
                     if match.isdigit() and 7 <= len(match) <= 10:
@@ -122,8 +125,9 @@ class UltraFastLoanScanner:
         
         # Extract all loan numbers
         loans = set()
+        loan_text = normalize_spoken_numbers(full_text)
         for pattern in self.loan_patterns:
-            for match in pattern.findall(full_text):
+            for match in pattern.findall(loan_text):
                 if isinstance(match, tuple):
                     match = match[0]
                 if match.isdigit() and 7 <= len(match) <= 10:
@@ -188,6 +192,7 @@ class UltraFastLoanScanner:
                         loan, orkuid, rec.get('target_user'),
                         rec['timestamp'], rec['timestamp'], rec['duration']
                     ))
+                refresh_after_ingest(self.cursor, rec['timestamp'], all_loans, rec.get('target_user'))
                 
                 self.db_conn.commit()
             
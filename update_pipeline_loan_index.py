@@ -4,7 +4,12 @@ Update the SCREAM pipeline to populate loan_number_index
 This makes loan numbers immediately searchable
 """
 
+import json
+
+from loan_rollups import refresh_after_ingest
+
 # Add this function to scream_hybrid_pipeline.py after save_to_database()
+# (together with the imports above)
 
 def update_loan_index(self, orkuid, loan_numbers, call_info):
     """Update the loan number search index"""
@@ -81,6 +86,9 @@ def update_loan_index(self, orkuid, loan_numbers, call_info):
                 call_info.get('timestamp')
             ))
         
+        # Drop cached API results for these loans and refresh the analytics rollups
+        refresh_after_ingest(self.cursor, call_info.get('timestamp'), loan_numbers, user_name)
+        
         self.db_conn.commit()
         print("   ✓ Loan index updated")
         